@@ -4,21 +4,51 @@ GPU SuperCluster Calculator API
 Secure backend service for TCO calculations with JWT authentication
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, send_file
 from flask_cors import CORS
+from werkzeug.http import unquote_etag
 import hashlib
+import ipaddress
 import time
+import math
 import os
 import jwt
 import json
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from functools import wraps
 from user_database import init_user_database, get_user_database
+from password_hashing import DUMMY_PASSWORD_HASH, PasswordHasher, PasswordHasherBusy
+from scenario_database import init_scenario_database, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from job_database import init_job_database
+from tco_engine import (
+    normalize_calculation_params, calculate_results, pricing_tables_fingerprint,
+    get_pricing_catalog, reload_pricing_catalog, watch_pricing_catalog, add_pricing_reload_listener,
+    ResultCache, calculation_cache_key, SingleFlight,
+    IncrementalCalculator,
+    BATCH_MAX_CONFIGS, evaluate_batch,
+    SWEEP_DEFAULT_CHUNK, SWEEP_MAX_CHUNK, SWEEP_RESULT_FIELDS,
+    plan_sweep, iter_sweep_chunks, sweep_chunk_to_ndjson,
+    MONTE_CARLO_PARALLEL_THRESHOLD, parse_monte_carlo_request, run_monte_carlo,
+    SENSITIVITY_DEFAULT_DELTA, run_sensitivity,
+    OPTIMIZER_DEFAULT_TOP_K, OPTIMIZER_MAX_TOP_K, optimize_configurations,
+    LOCATION_INDEX_REFERENCE_SIZES, LocationCostIndex,
+    network_topology, calculate_network_costs,
+    CASHFLOW_MAX_BATCH_CELLS, parse_cashflow_options, cashflow_periods, cashflow_chunk_rows,
+    build_calculation_columns, calculate_tco_columns, calculate_cashflow_columns, format_cashflow_results,
+    parse_storage_growth_options, run_storage_growth,
+    EXPORT_FORMATS, EXPORT_MAX_CONFIGS, ExportStore, arrow_available, check_export_format, export_key,
+    iter_batch_export_chunks, iter_sweep_export_chunks,
+    JOB_MAX_ACTIVE_PER_USER, JOB_EVENT_HEARTBEAT, JobQueue, JobEventHub,
+    PLANNING_MODELS, PLANNING_MAX_BATCH, PlanningCalculator,
+)
 
 app = Flask(__name__)
 
 # Configure CORS for your domain only
-CORS(app, origins=['http://localhost:3000', 'http://localhost:3025', 'https://yourdomain.com'])
+CORS(app, origins=['http://localhost:3000', 'http://localhost:3025', 'https://yourdomain.com'],
+     expose_headers=['X-Pricing-Version'])
 
 # Secret keys
 API_SECRET = os.environ.get('CALCULATOR_API_SECRET', 'change-this-secret-key-in-production')
@@ -49,10 +79,53 @@ except Exception as e:
     print(f"❌ Failed to initialize user database: {e}")
     raise
 
+# Password hashes are memory-hard, so they run on a bounded pool rather than
+# on every request thread at once; see password_hashing.py
+password_hasher = PasswordHasher()
+
+def password_hashing_busy():
+    """503 response for when the password hashing pool is saturated"""
+    response = jsonify({'error': 'Server busy. Try again shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+# Saved scenarios live next to users.db, deduplicated by content hash
+try:
+    scenario_db = init_scenario_database()
+    print("✅ Scenario database initialized successfully")
+except Exception as e:
+    print(f"❌ Failed to initialize scenario database: {e}")
+    raise
+
+# Calculation jobs are shared by all workers through jobs.db
+try:
+    job_db = init_job_database()
+    print("✅ Job database initialized successfully")
+except Exception as e:
+    print(f"❌ Failed to initialize job database: {e}")
+    raise
+
 # Rate limiting (simple implementation)
 request_times = {}
 RATE_LIMIT = 10  # requests per minute
 
+# Failed-login throttling
+# A failed login used to sleep for a second on the request thread, so a
+# credential-stuffing burst parked every worker and starved other traffic.
+# Failures are counted per client IP and per username instead. From the
+# LOGIN_FREE_FAILURES-th failure a key is locked out for LOGIN_BACKOFF_BASE
+# seconds, doubling with each further failure up to LOGIN_BACKOFF_MAX, and
+# attempts during a lockout get an immediate 429 with Retry-After. A count is
+# forgotten LOGIN_FAILURE_WINDOW seconds after its last failure, and a
+# successful login clears the username's count.
+LOGIN_FREE_FAILURES = 3
+LOGIN_BACKOFF_BASE = 1.0
+LOGIN_BACKOFF_MAX = 300.0
+LOGIN_FAILURE_WINDOW = 900.0
+LOGIN_THROTTLE_MAX_KEYS = 100000
+login_failures = OrderedDict()  # ('ip', address) or ('user', username) -> (failures, last failure, locked until)
+login_failures_lock = threading.Lock()
+
 # Login logging
 LOGIN_LOG_FILE = 'login_access.log'
 login_attempts = []  # In-memory log for quick access
@@ -120,6 +193,48 @@ def check_rate_limit(client_ip):
         request_times[client_ip] = [current_time]
     return True
 
+def rate_limit_retry_after(client_ip):
+    """Seconds until check_rate_limit() lets client_ip through again"""
+    times = request_times.get(client_ip)
+    if not times:
+        return 0.0
+    return max(0.0, 60 - (time.time() - times[0]))
+
+def login_retry_after(client_ip, username):
+    """Seconds until a login for username from client_ip may be attempted, 0 if it may now"""
+    now = time.time()
+    wait = 0.0
+    with login_failures_lock:
+        for key in (('ip', client_ip), ('user', username)):
+            entry = login_failures.get(key)
+            if entry is not None:
+                wait = max(wait, entry[2] - now)
+    return wait
+
+def record_login_failure(client_ip, username):
+    """Count a failed login against the client IP and the username, extending their lockouts"""
+    now = time.time()
+    with login_failures_lock:
+        for key in (('ip', client_ip), ('user', username)):
+            failures, last, _ = login_failures.pop(key, (0, now, 0.0))
+            failures = failures + 1 if now - last <= LOGIN_FAILURE_WINDOW else 1
+            locked_until = 0.0
+            if failures >= LOGIN_FREE_FAILURES:
+                exponent = min(failures - LOGIN_FREE_FAILURES, 16)
+                locked_until = now + min(LOGIN_BACKOFF_BASE * 2 ** exponent, LOGIN_BACKOFF_MAX)
+            login_failures[key] = (failures, now, locked_until)
+
+        # Oldest failure first: forget counts past the window, then bound the table
+        while login_failures:
+            _, (_, last, _) = next(iter(login_failures.items()))
+            if now - last <= LOGIN_FAILURE_WINDOW and len(login_failures) <= LOGIN_THROTTLE_MAX_KEYS:
+                break
+            login_failures.popitem(last=False)
+
+def clear_login_failures(username):
+    with login_failures_lock:
+        login_failures.pop(('user', username), None)
+
 # JWT Authentication functions
 def generate_token(username, role):
     """Generate JWT token for authenticated user"""
@@ -131,16 +246,99 @@ def generate_token(username, role):
     }
     return jwt.encode(payload, JWT_SECRET, algorithm='HS256')
 
+# Verified token cache
+# Every authenticated request runs verify_token, including the activity ping
+# the dashboard sends on each tab click. Verified claims are kept, keyed by the
+# SHA-256 of the token, until the token's exp, together with the users_version
+# counter (see user_database.py) read when they were last checked against the
+# user's record: the token must name an active account holding the claimed
+# role, created no later than the token was issued (not a deleted account of
+# the same name). A repeat verification is a dictionary lookup plus one read
+# of that counter; the account is checked again only once the counter has
+# moved, i.e. after some worker changed a user. The /api/users handlers also
+# evict the user's tokens directly, so a demoted, disabled or deleted user's
+# tokens stop working everywhere at once.
+TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get('TOKEN_CACHE_MAX_ENTRIES', 10000))
+token_cache = OrderedDict()  # token digest -> (exp, claims, users_version when checked)
+token_cache_lock = threading.Lock()
+token_cache_counters = {'hits': 0, 'misses': 0, 'rechecks': 0, 'evictions': 0, 'expirations': 0,
+                        'invalidations': 0, 'revoked': 0}
+
 def verify_token(token):
     """Verify JWT token and return user info"""
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-        return payload
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
+    key = hashlib.sha256(token.encode()).hexdigest()
+    now = time.time()
+    # Read before checking: a write landing in between leaves the entry tagged
+    # with the old version, so the next request checks the account again
+    version = user_db.users_version()
+    payload = None
+    with token_cache_lock:
+        entry = token_cache.get(key)
+        if entry is not None and entry[0] > now:
+            token_cache.move_to_end(key)
+            token_cache_counters['hits'] += 1
+            if entry[2] == version:
+                return entry[1]
+            token_cache_counters['rechecks'] += 1
+            payload = entry[1]
+        else:
+            if entry is not None:
+                del token_cache[key]
+                token_cache_counters['expirations'] += 1
+            token_cache_counters['misses'] += 1
+
+    if payload is None:
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            return None
+        except jwt.InvalidTokenError:
+            return None
+
+    if not token_matches_account(payload):
+        with token_cache_lock:
+            token_cache.pop(key, None)
+            token_cache_counters['revoked'] += 1
         return None
 
+    if isinstance(payload.get('exp'), (int, float)):
+        with token_cache_lock:
+            token_cache[key] = (payload['exp'], payload, version)
+            while len(token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+                token_cache.popitem(last=False)
+                token_cache_counters['evictions'] += 1
+    return payload
+
+def evict_user_tokens(username):
+    """Drop a user's cached tokens after changing the account"""
+    with token_cache_lock:
+        keys = [key for key, (_, claims, _) in token_cache.items() if claims.get('username') == username]
+        for key in keys:
+            del token_cache[key]
+        token_cache_counters['invalidations'] += len(keys)
+
+def token_matches_account(claims):
+    """Whether verified claims still match the user's current record"""
+    username, issued_at = claims.get('username'), claims.get('iat')
+    if not isinstance(username, str) or not isinstance(issued_at, (int, float)):
+        return False
+    user = user_db.get_user(username)
+    if user is None or not user.get('is_active', True) or user['role'] != claims.get('role'):
+        return False
+    # iat has whole seconds; a token issued in the account's first second counts
+    created_at = datetime.fromisoformat(user['created_at'].replace('Z', '+00:00'))
+    return issued_at >= int(created_at.timestamp())
+
+def token_cache_stats():
+    with token_cache_lock:
+        lookups = token_cache_counters['hits'] + token_cache_counters['misses']
+        return {
+            'entries': len(token_cache),
+            'maxEntries': TOKEN_CACHE_MAX_ENTRIES,
+            **token_cache_counters,
+            'hitRate': round(token_cache_counters['hits'] / lookups, 4) if lookups else 0.0
+        }
+
 def require_auth(f):
     """Decorator to require authentication"""
     @wraps(f)
@@ -172,17 +370,21 @@ def require_admin(f):
 # Authentication endpoints
 def get_client_ip():
     """Get real client IP address, handling proxies"""
-    # Check for forwarded IP headers (common with proxies/load balancers)
-    if 'X-Forwarded-For' in request.headers:
-        # X-Forwarded-For can contain multiple IPs, get the first one
-        ip = request.headers['X-Forwarded-For'].split(',')[0].strip()
-        return ip
-    elif 'X-Real-IP' in request.headers:
-        return request.headers['X-Real-IP']
-    elif 'CF-Connecting-IP' in request.headers:  # Cloudflare
-        return request.headers['CF-Connecting-IP']
-    else:
-        return request.remote_addr
+    # The login throttle and rate limit key on this, so it must not come from
+    # anything the client controls. nginx appends to X-Forwarded-For whatever
+    # the client sent, but sets X-Real-IP from the connection's $remote_addr;
+    # trust that only from a proxy on this host or the private network.
+    if 'X-Real-IP' in request.headers and is_trusted_proxy(request.remote_addr):
+        return request.headers['X-Real-IP'].strip()
+    return request.remote_addr
+
+def is_trusted_proxy(address):
+    """Whether a peer address can be a reverse proxy of ours (loopback or private)"""
+    try:
+        ip = ipaddress.ip_address(address)
+    except (TypeError, ValueError):
+        return False
+    return ip.is_loopback or ip.is_private
 
 @app.route('/api/login', methods=['POST'])
 def login():
@@ -191,46 +393,70 @@ def login():
     
     # Rate limiting
     if not check_rate_limit(client_ip):
-        return jsonify({'error': 'Rate limit exceeded. Try again later.'}), 429
+        response = jsonify({'error': 'Rate limit exceeded. Try again later.'})
+        response.headers['Retry-After'] = str(max(1, math.ceil(rate_limit_retry_after(client_ip))))
+        return response, 429
     
     data = request.get_json()
-    if not data or 'username' not in data or 'password' not in data:
+    if not data or not isinstance(data.get('username'), str) or not isinstance(data.get('password'), str):
         return jsonify({'error': 'Username and password required'}), 400
     
     username = data['username']
     password = data['password']
     user_agent = request.headers.get('User-Agent', 'Unknown')
     
-    # Check user exists
-    user = user_db.get_user(username)
-    if not user:
-        log_login_attempt(client_ip, username, False, user_agent)
-        time.sleep(1)  # Prevent timing attacks
-        return jsonify({'error': 'Invalid credentials'}), 401
-    
-    # Check if user is active
-    if not user.get('is_active', True):
+    # Locked out after repeated failures: refuse without checking anything
+    retry_after = login_retry_after(client_ip, username)
+    if retry_after > 0:
         log_login_attempt(client_ip, username, False, user_agent)
-        time.sleep(1)
-        return jsonify({'error': 'Account is disabled'}), 401
+        response = jsonify({'error': 'Too many failed login attempts. Try again later.'})
+        response.headers['Retry-After'] = str(math.ceil(retry_after))
+        return response, 429
     
-    # Check if user account has expired
-    if user.get('expires_at'):
+    # Check user exists, is active and has not expired
+    user = user_db.get_user(username)
+    error = None
+    if not user:
+        error = 'Invalid credentials'
+    elif not user.get('is_active', True):
+        error = 'Account is disabled'
+    elif user.get('expires_at'):
         expires_at = datetime.fromisoformat(user['expires_at'].replace('Z', '+00:00'))
         if datetime.now(timezone.utc) > expires_at:
-            log_login_attempt(client_ip, username, False, user_agent)
-            time.sleep(1)
-            return jsonify({'error': 'Account has expired'}), 401
+            error = 'Account has expired'
+    
+    if error:
+        # Pay for a password verification anyway, so timing does not reveal which usernames exist
+        try:
+            password_hasher.verify(password, DUMMY_PASSWORD_HASH)
+        except PasswordHasherBusy:
+            return password_hashing_busy()
+        log_login_attempt(client_ip, username, False, user_agent)
+        record_login_failure(client_ip, username)
+        return jsonify({'error': error}), 401
     
     # Verify password
-    password_hash = hashlib.sha256(password.encode()).hexdigest()
-    if password_hash != user['password_hash']:
+    try:
+        password_ok, rehash = password_hasher.verify(password, user['password_hash'])
+    except PasswordHasherBusy:
+        return password_hashing_busy()
+    if not password_ok:
         log_login_attempt(client_ip, username, False, user_agent)
-        time.sleep(1)  # Prevent timing attacks
+        record_login_failure(client_ip, username)
         return jsonify({'error': 'Invalid credentials'}), 401
     
+    # Upgrade a legacy or outdated hash now that the password is known, unless
+    # an admin reset it in the meantime; if the pool is busy, the next login will
+    if rehash:
+        try:
+            user_db.update_password(username, password_hasher.hash(password),
+                                    expected_hash=user['password_hash'])
+        except PasswordHasherBusy:
+            pass
+    
     # Log successful login
     log_login_attempt(client_ip, username, True, user_agent)
+    clear_login_failures(username)
     
     # Update last login time
     user_db.update_user(username, last_login=datetime.now(timezone.utc).isoformat())
@@ -342,150 +568,6 @@ def reset_logs():
     except Exception as e:
         return jsonify({'error': f'Failed to reset logs: {str(e)}'}), 500
 
-# GPU specifications (hidden from client)
-GPU_SPECS = {
-    'gb200': {
-        'power': 1200,
-        'price': 70000,
-        'cooling_options': ['liquid'],
-        'network_ports': 18,
-        'memory': 192
-    },
-    'gb300': {
-        'power': 1400,
-        'price': 85000,
-        'cooling_options': ['liquid'],
-        'network_ports': 18,
-        'memory': 288
-    },
-    'h100-sxm': {
-        'power': 700,
-        'price': 30000,
-        'cooling_options': ['air', 'liquid'],
-        'network_ports': 18,
-        'memory': 80
-    },
-    'h100-pcie': {
-        'power': 350,
-        'price': 25000,
-        'cooling_options': ['air'],
-        'network_ports': 2,
-        'memory': 80
-    }
-}
-
-# Region rates (hidden from client)
-# Legacy region rates - kept for backward compatibility
-REGION_RATES = {
-    'us-east': {'name': 'US East', 'rate': 0.10},
-    'us-west': {'name': 'US West', 'rate': 0.12},
-    'eu-west': {'name': 'Europe West', 'rate': 0.15},
-    'apac': {'name': 'Asia Pacific', 'rate': 0.18}
-}
-
-# Location-based electricity rates (Q3 2025 data)
-# This is a subset of the most commonly used locations for data centers
-ELECTRICITY_RATES = {
-    # US States (Industrial rates preferred for data centers)
-    'Texas (Industrial)': 0.0660,
-    'Virginia': 0.1047,
-    'California (Industrial)': 0.2531,
-    'Washington (Industrial)': 0.0699,
-    'Oregon': 0.1129,
-    'North Carolina': 0.0971,
-    'Georgia': 0.1270,
-    'Ohio': 0.1153,
-    'Illinois': 0.1366,
-    'Arizona (Industrial)': 0.0944,
-    
-    # International - Western Europe
-    'Germany': 0.273,  # 0.251 EUR converted to USD
-    'France': 0.166,   # 0.153 EUR converted to USD
-    'Netherlands': 0.226, # 0.208 EUR converted to USD
-    'Finland': 0.105,  # 0.097 EUR converted to USD
-    'United Kingdom': 0.308, # 0.243 GBP converted to USD
-    'Sweden': 0.179,   # Already in USD
-    'Austria': 0.292,  # 0.269 EUR converted to USD
-    'Belgium': 0.262,  # 0.241 EUR converted to USD
-    'Denmark': 0.307,  # From DKK conversion
-    'Italy': 0.370,    # 0.340 EUR converted to USD
-    'Spain': 0.149,    # 0.137 EUR converted to USD
-    'Portugal': 0.162, # 0.149 EUR converted to USD
-    'Greece': 0.275,   # 0.253 EUR converted to USD
-    
-    # Eastern Europe EEA Countries
-    'Bulgaria': 0.136,     # 0.125 EUR converted to USD
-    'Croatia': 0.158,      # 0.145 EUR converted to USD
-    'Czech Republic': 0.179, # 0.165 EUR converted to USD
-    'Estonia': 0.150,      # 0.138 EUR converted to USD
-    'Hungary': 0.125,      # 0.115 EUR converted to USD
-    'Latvia': 0.165,       # 0.152 EUR converted to USD
-    'Lithuania': 0.161,    # 0.148 EUR converted to USD
-    'Poland': 0.172,       # 0.158 EUR converted to USD
-    'Romania': 0.154,      # 0.142 EUR converted to USD
-    'Slovakia': 0.190,     # 0.175 EUR converted to USD
-    'Slovenia': 0.176,     # 0.162 EUR converted to USD
-    
-    # Western/Central Europe
-    'Ireland': 0.310,      # 0.285 EUR converted to USD
-    'Luxembourg': 0.212,   # 0.195 EUR converted to USD
-    
-    # Mediterranean
-    'Cyprus': 0.300,       # 0.276 EUR converted to USD
-    'Malta': 0.147,        # 0.135 EUR converted to USD
-    
-    # Nordic/EFTA Countries
-    'Iceland': 0.097,      # 0.089 EUR converted to USD
-    'Norway': 0.103,       # 0.095 EUR converted to USD
-    'Liechtenstein': 0.201, # 0.185 EUR converted to USD
-    
-    # Other International
-    'Canada': 0.135,       # 0.182 CAD converted to USD
-    
-    # Legacy region mappings for backward compatibility
-    'us-texas': 0.0660,
-    'us-virginia': 0.1047,
-    'us-california': 0.2531,
-    'europe': 0.166,  # France rate as European average
-    'asia': 0.179,    # Sweden rate as placeholder
-}
-
-def get_electricity_rate(location):
-    """Get electricity rate for a location, with fallback to legacy regions"""
-    if location in ELECTRICITY_RATES:
-        return ELECTRICITY_RATES[location]
-    
-    # Try legacy region rates
-    if location in REGION_RATES:
-        return REGION_RATES[location]['rate']
-    
-    # Default fallback (US Virginia commercial rate)
-    return 0.1047
-
-# Storage vendors (hidden from client)
-STORAGE_VENDORS = {
-    'vast': {'hot_per_gb': 0.02, 'warm_per_gb': 0.01, 'cold_per_gb': 0.005, 'archive_per_gb': 0.002},
-    'weka': {'hot_per_gb': 0.025, 'warm_per_gb': 0.012, 'cold_per_gb': 0.006, 'archive_per_gb': 0.0025},
-    'pfs': {'hot_per_gb': 0.018, 'warm_per_gb': 0.009, 'cold_per_gb': 0.0045, 'archive_per_gb': 0.0018},
-    'ceph': {'hot_per_gb': 0.015, 'warm_per_gb': 0.008, 'cold_per_gb': 0.004, 'archive_per_gb': 0.0015}
-}
-
-# Network costs (hidden from client)
-NETWORK_COSTS = {
-    'infiniband': {
-        'switch': 120000,
-        'cable': 500,
-        'transceiver': 1500,
-        'per_gpu_bandwidth': 400
-    },
-    'ethernet': {
-        'switch': 80000,
-        'cable': 200,
-        'transceiver': 800,
-        'per_gpu_bandwidth': 400
-    }
-}
-
 def validate_request(data):
     """Validate API request with signature"""
     if 'signature' not in data:
@@ -497,6 +579,59 @@ def validate_request(data):
     
     return data['signature'] == expected_sig
 
+# Calculation result cache
+# The dashboard recalculates on every input change, so identical parameter sets
+# arrive over and over. Results are cached on the canonical hash of the
+# normalized parameters and dropped whenever the pricing tables change.
+CALC_CACHE_MAX_ENTRIES = int(os.environ.get('CALC_CACHE_MAX_ENTRIES', 4096))
+CALC_CACHE_TTL_SECONDS = float(os.environ.get('CALC_CACHE_TTL_SECONDS', 600))
+PRICING_CHECK_INTERVAL = 1.0  # seconds between pricing table fingerprint checks
+
+calculation_cache = ResultCache(
+    CALC_CACHE_MAX_ENTRIES,
+    CALC_CACHE_TTL_SECONDS,
+    version_fn=pricing_tables_fingerprint,
+    version_check_interval=PRICING_CHECK_INTERVAL
+)
+
+# Concurrent misses for the same parameters share one calculation; the others
+# wait up to CALC_COALESCE_TIMEOUT seconds for it
+CALC_COALESCE_TIMEOUT = float(os.environ.get('CALC_COALESCE_TIMEOUT', 30))
+calculation_flight = SingleFlight(CALC_COALESCE_TIMEOUT)
+
+def cached_calculation(cache_key, params):
+    """Results for normalized parameters from the cache, a concurrent identical request, or a new calculation
+
+    Returns:
+        (results, 'HIT', 'SHARED' or 'MISS')
+
+    Raises:
+        TimeoutError: If an identical calculation in progress did not finish in time
+    """
+    results = calculation_cache.get(cache_key)
+    if results is not None:
+        return results, 'HIT'
+
+    # A pricing reload mid-calculation clears the cache; don't refill it with
+    # old prices afterwards, or share them with callers arriving after the reload
+    pricing_version = pricing_tables_fingerprint()
+
+    def calculate_and_cache():
+        results = calculate_results(params)
+        if pricing_tables_fingerprint() == pricing_version:
+            calculation_cache.put(cache_key, results)
+        return results
+
+    results, shared = calculation_flight.do((pricing_version, cache_key), calculate_and_cache)
+    return results, 'SHARED' if shared else 'MISS'
+
+# Component sub-results behind /api/calculate/incremental, dropped on the same
+# pricing changes as the result cache
+incremental_calculator = IncrementalCalculator(
+    version_fn=pricing_tables_fingerprint,
+    version_check_interval=PRICING_CHECK_INTERVAL
+)
+
 @app.route('/api/calculate', methods=['POST'])
 @require_auth
 def calculate():
@@ -512,165 +647,860 @@ def calculate():
         return jsonify({'error': 'Invalid request'}), 403
     
     try:
-        # Extract parameters
-        gpu_model = data.get('gpuModel', 'h100-sxm')
-        num_gpus = int(data.get('numGPUs', 1000))
-        cooling_type = data.get('coolingType', 'air')
-        region = data.get('region', 'us-east')
-        utilization = int(data.get('utilization', 90))
-        depreciation = int(data.get('depreciation', 4))
-        storage_capacity = int(data.get('storageCapacity', 50))
-        storage_vendor = data.get('storageVendor', 'vast')
-        
-        # Validate inputs
-        if gpu_model not in GPU_SPECS:
-            return jsonify({'error': 'Invalid GPU model'}), 400
-        if num_gpus < 1000 or num_gpus > 200000:
-            return jsonify({'error': 'GPU count must be between 1000 and 200000'}), 400
-        # Get specifications
-        spec = GPU_SPECS[gpu_model]
-        region_rate = get_electricity_rate(region)
-        
-        # Core calculations
-        gpu_capex = spec['price'] * num_gpus
-        
-        # Power calculations
-        pue_factor = 1.1 if cooling_type == 'liquid' else 1.5
-        total_power_mw = (spec['power'] * num_gpus * pue_factor) / 1_000_000
-        
-        # Storage calculations
-        storage_costs = calculate_storage_costs(
-            storage_capacity, 
-            storage_vendor,
-            data.get('hotPercent', 20),
-            data.get('warmPercent', 35),
-            data.get('coldPercent', 35),
-            data.get('archivePercent', 10)
-        )
-        
-        # Network calculations
-        network_costs = calculate_network_costs(
-            num_gpus,
-            data.get('fabricType', 'infiniband'),
-            data.get('oversubscription', '1:1')
-        )
-        
-        # Total CAPEX
-        total_capex = (
-            gpu_capex +
-            storage_costs['capex'] +
-            network_costs['capex'] +
-            gpu_capex * 0.15  # Infrastructure
-        )
-        
-        # Annual OPEX
-        annual_power_cost = total_power_mw * 1000 * region_rate * 8760
-        annual_opex = (
-            annual_power_cost +
-            storage_costs['opex'] +
-            network_costs['opex'] +
-            total_capex * 0.03  # Maintenance
-        )
-        
-        # Cost per GPU hour
-        annual_gpu_hours = num_gpus * 8760 * (utilization / 100)
-        cost_per_hour = (total_capex / depreciation + annual_opex) / annual_gpu_hours
-        
-        # 10-year TCO
-        tco_10year = total_capex + (annual_opex * 10)
-        
-        return jsonify({
-            'success': True,
-            'results': {
-                'totalCapex': round(total_capex),
-                'annualOpex': round(annual_opex),
-                'costPerHour': round(cost_per_hour, 2),
-                'totalPowerMW': round(total_power_mw, 1),
-                'pueValue': pue_factor,
-                'storageGbMonth': round(storage_costs['gb_month'], 4),
-                'networkBandwidth': round(network_costs['bandwidth'], 1),
-                'tco10year': round(tco_10year),
-                'breakdown': {
-                    'capex': {
-                        'gpu': gpu_capex,
-                        'storage': storage_costs['capex'],
-                        'network': network_costs['capex'],
-                        'infrastructure': gpu_capex * 0.15
-                    },
-                    'opex': {
-                        'power': annual_power_cost,
-                        'storage': storage_costs['opex'],
-                        'network': network_costs['opex'],
-                        'maintenance': total_capex * 0.03
-                    }
-                }
-            }
-        })
+        params = normalize_calculation_params(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
     
+    # Serve repeated parameter sets from the result cache
+    try:
+        results, cache_status = cached_calculation(calculation_cache_key(params), params)
+    except TimeoutError:
+        return jsonify({'error': 'Calculation timed out'}), 504
     except Exception as e:
         app.logger.error(f"Calculation error: {str(e)}")
         return jsonify({'error': 'Calculation failed'}), 500
-
-def calculate_storage_costs(capacity_pb, vendor, hot_pct, warm_pct, cold_pct, archive_pct):
-    """Calculate storage costs (hidden implementation)"""
-    vendor_rates = STORAGE_VENDORS.get(vendor, STORAGE_VENDORS['vast'])
-    
-    capacity_gb = capacity_pb * 1_000_000
     
-    # Calculate tier capacities
-    hot_gb = capacity_gb * (hot_pct / 100)
-    warm_gb = capacity_gb * (warm_pct / 100)
-    cold_gb = capacity_gb * (cold_pct / 100)
-    archive_gb = capacity_gb * (archive_pct / 100)
-    
-    # Monthly costs
-    monthly_cost = (
-        hot_gb * vendor_rates['hot_per_gb'] +
-        warm_gb * vendor_rates['warm_per_gb'] +
-        cold_gb * vendor_rates['cold_per_gb'] +
-        archive_gb * vendor_rates['archive_per_gb']
+    response = jsonify({
+        'success': True,
+        'results': results
+    })
+    response.headers['X-Cache'] = cache_status
+    return response
+
+def json_signature(payload):
+    """Signature over the canonical JSON encoding of a request payload"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256((canonical + API_SECRET).encode()).hexdigest()
+
+def validate_json_signature(data):
+    """Validate a request signed over the canonical JSON of every field except the signature"""
+    if 'signature' not in data:
+        return False
+    return data['signature'] == json_signature({k: v for k, v in data.items() if k != 'signature'})
+
+def validate_batch_request(data):
+    """Validate a batch request signed over the canonical JSON of its configs
+
+    Requests carrying options besides configs (such as cashflow) are signed over
+    every field except the signature instead.
+    """
+    if 'signature' not in data or 'configs' not in data:
+        return False
+
+    if set(data) == {'configs', 'signature'}:
+        return data['signature'] == json_signature(data['configs'])
+    return validate_json_signature(data)
+
+def require_signed_json(validate=validate_json_signature):
+    """Decorator to rate-limit a request and require a signed JSON object body
+
+    Apply after require_auth. The body is available as request.signed_data.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not check_rate_limit(request.remote_addr):
+                return jsonify({'error': 'Rate limit exceeded'}), 429
+
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict) or not validate(data):
+                return jsonify({'error': 'Invalid request'}), 403
+
+            request.signed_data = data
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+@app.route('/api/calculate/batch', methods=['POST'])
+@require_auth
+@require_signed_json(validate_batch_request)
+def calculate_batch():
+    """Price many configurations in one request (counts once against the rate limit)"""
+    data = request.signed_data
+
+    configs = data['configs']
+    if not isinstance(configs, list) or not configs:
+        return jsonify({'error': 'configs must be a non-empty array'}), 400
+    if len(configs) > BATCH_MAX_CONFIGS:
+        return jsonify({'error': f'Batch size limited to {BATCH_MAX_CONFIGS} configurations'}), 413
+
+    cashflow = None
+    if 'cashflow' in data:
+        try:
+            cashflow = parse_cashflow_options(data['cashflow'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if len(configs) * len(cashflow_periods(cashflow)) > CASHFLOW_MAX_BATCH_CELLS:
+            return jsonify({'error': f'Cash-flow timelines limited to {CASHFLOW_MAX_BATCH_CELLS} configuration-periods per batch'}), 413
+
+    try:
+        started = time.perf_counter()
+        entries = evaluate_batch(configs, cashflow)
+        elapsed = time.perf_counter() - started
+    except Exception as e:
+        app.logger.error(f"Batch calculation error: {str(e)}")
+        return jsonify({'error': 'Calculation failed'}), 500
+
+    succeeded = sum(1 for entry in entries if entry['success'])
+
+    return jsonify({
+        'success': True,
+        'count': len(entries),
+        'succeeded': succeeded,
+        'failed': len(entries) - succeeded,
+        'elapsedMs': round(elapsed * 1000, 2),
+        'configsPerSecond': round(len(entries) / elapsed) if elapsed > 0 else None,
+        'results': entries
+    })
+
+@app.route('/api/calculate/sweep', methods=['POST'])
+@require_auth
+@require_signed_json()
+def calculate_sweep():
+    """Stream a parameter sweep as NDJSON: a meta line, one line per point, a summary line"""
+    data = request.signed_data
+
+    try:
+        chunk_size = int(data.get('chunkSize', SWEEP_DEFAULT_CHUNK))
+        if chunk_size < 1 or chunk_size > SWEEP_MAX_CHUNK:
+            raise ValueError(f'chunkSize must be between 1 and {SWEEP_MAX_CHUNK}')
+        base_params, axes, total = plan_sweep(data)
+        cashflow = parse_cashflow_options(data['cashflow']) if 'cashflow' in data else None
+        if cashflow is not None:
+            chunk_size = min(chunk_size, cashflow_chunk_rows(cashflow))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        started = time.perf_counter()
+        yield json.dumps({'meta': {
+            'total': total,
+            'chunkSize': chunk_size,
+            'axes': {axis['field']: len(axis['labels']) for axis in axes},
+            'fields': [axis['field'] for axis in axes] + [key for key, _, _ in SWEEP_RESULT_FIELDS]
+                      + (['cashflow'] if cashflow is not None else []),
+            **({'cashflow': cashflow} if cashflow is not None else {}),
+        }}) + '\n'
+
+        try:
+            for labels, outputs in iter_sweep_chunks(base_params, axes, total, chunk_size, cashflow):
+                yield sweep_chunk_to_ndjson(labels, outputs)
+        except Exception as e:
+            app.logger.error(f"Sweep calculation error: {str(e)}")
+            yield json.dumps({'error': 'Calculation failed'}) + '\n'
+            return
+
+        elapsed = time.perf_counter() - started
+        yield json.dumps({'summary': {
+            'rows': total,
+            'elapsedMs': round(elapsed * 1000, 2),
+            'pointsPerSecond': round(total / elapsed) if elapsed > 0 else None,
+        }}) + '\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'}
     )
-    
-    # CAPEX (storage hardware)
-    capex = capacity_gb * 0.10  # $0.10/GB hardware cost
-    
+
+# Finished exports are spooled to disk and served with byte-range support
+export_store = ExportStore()
+
+@app.route('/api/calculate/export', methods=['POST'])
+@require_auth
+@require_signed_json()
+def create_export():
+    """Write batch or sweep results to a CSV, NDJSON or Arrow IPC file for download"""
+    data = request.signed_data
+    payload = {k: v for k, v in data.items() if k != 'signature'}
+
+    fmt = data.get('format', 'csv')
+    try:
+        check_export_format(fmt)
+        if ('configs' in data) == ('axes' in data):
+            raise ValueError('Send either configs (batch) or base and axes (sweep)')
+        if 'configs' in data:
+            configs = data['configs']
+            if not isinstance(configs, list) or not configs:
+                raise ValueError('configs must be a non-empty array')
+            if len(configs) > EXPORT_MAX_CONFIGS:
+                return jsonify({'error': f'Exports limited to {EXPORT_MAX_CONFIGS} configurations'}), 413
+            params_list = []
+            for i, config in enumerate(configs):
+                try:
+                    params_list.append(normalize_calculation_params(config))
+                except ValueError as e:
+                    raise ValueError(f'configs[{i}]: {e}')
+            source = 'batch'
+        else:
+            base_params, axes, total = plan_sweep(data)
+            source = 'sweep'
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    if fmt == 'arrow' and not arrow_available():
+        return jsonify({'error': 'Arrow export requires pyarrow on the server'}), 501
+
+    username = request.user['username']
+    pricing_version = get_pricing_catalog().version
+    export_id = export_key(payload, fmt, username, pricing_tables_fingerprint())
+    export = export_store.get(export_id)
+    cached = export is not None
+    if not cached:
+        if source == 'batch':
+            chunks = iter_batch_export_chunks(params_list)
+        else:
+            chunks = iter_sweep_export_chunks(base_params, axes, total)
+        try:
+            export = export_store.create(export_id, fmt, chunks, username,
+                                         source=source, pricingVersion=pricing_version)
+        except Exception as e:
+            app.logger.error(f"Export error: {str(e)}")
+            return jsonify({'error': 'Export failed'}), 500
+
+    return jsonify({
+        'success': True,
+        'cached': cached,
+        'exportId': export_id,
+        'format': fmt,
+        'source': export['source'],
+        'rows': export['rows'],
+        'bytes': export['bytes'],
+        'pricingVersion': export['pricingVersion'],
+        'expiresAt': datetime.fromtimestamp(export['expiresAt'], timezone.utc).isoformat(),
+        'url': f'/api/calculate/export/{export_id}'
+    }), 200 if cached else 201
+
+@app.route('/api/calculate/export/<export_id>', methods=['GET'])
+@require_auth
+def download_export(export_id):
+    """Download an export; Range and If-Range requests resume interrupted downloads"""
+    export = export_store.get(export_id)
+    if export is None or (export['owner'] != request.user['username'] and request.user['role'] != 'admin'):
+        return jsonify({'error': 'Export not found or expired'}), 404
+
+    mimetype, extension = EXPORT_FORMATS[export['format']]
+    return send_file(
+        export['path'],
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=f'tco-{export["source"]}-{export_id[:12]}.{extension}',
+        conditional=True,
+        etag=export_id,
+        max_age=0
+    )
+
+# Long sweeps and Monte Carlo runs go through the job queue instead of holding
+# a request (and a worker) open; jobs run in separate processes on this box
+job_queue = JobQueue(job_db)
+job_queue.start()
+job_events = JobEventHub(job_db)
+
+def job_response(job):
+    """Client view of a job record"""
+    expires = job['expires']
     return {
-        'capex': capex,
-        'opex': monthly_cost * 12,  # Annual
-        'gb_month': monthly_cost / capacity_gb if capacity_gb > 0 else 0
+        'jobId': job['job_id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'message': job['message'],
+        'error': job['error'],
+        'cancelRequested': job['cancel_requested'],
+        'coalesced': job['leader_id'] is not None,
+        'timeLimit': job['time_limit'],
+        'createdAt': job['created_at'],
+        'startedAt': job['started_at'],
+        'finishedAt': job['finished_at'],
+        'expiresAt': datetime.fromtimestamp(expires, timezone.utc).isoformat() if expires else None,
+        'url': f'/api/jobs/{job["job_id"]}'
     }
 
-def calculate_network_costs(num_gpus, fabric_type, oversubscription):
-    """Calculate network costs (hidden implementation)"""
-    fabric = NETWORK_COSTS.get(fabric_type, NETWORK_COSTS['infiniband'])
-    
-    # Parse oversubscription ratio
-    ratio = 1.0
-    if ':' in oversubscription:
-        parts = oversubscription.split(':')
-        ratio = float(parts[1]) / float(parts[0]) if float(parts[0]) > 0 else 1.0
-    
-    # Calculate required switches
-    ports_per_switch = 64
-    gpu_ports_needed = num_gpus / ratio
-    num_switches = int((gpu_ports_needed / ports_per_switch) + 0.5)
-    
-    # Calculate costs
-    switch_cost = num_switches * fabric['switch']
-    cable_cost = num_gpus * fabric['cable']
-    transceiver_cost = num_gpus * 2 * fabric['transceiver']  # 2 per GPU
-    
-    total_capex = switch_cost + cable_cost + transceiver_cost
-    
-    # Calculate bandwidth
-    bandwidth_tbps = (num_gpus * fabric['per_gpu_bandwidth']) / 1000
-    
+def get_user_job(job_id, with_result=False):
+    """The job if it exists, is unexpired and belongs to the caller (or the caller is an admin)"""
+    job = job_db.get_job(job_id, with_result)
+    if job is None or (job['username'] != request.user['username'] and request.user['role'] != 'admin'):
+        return None
+    return job
+
+@app.route('/api/jobs', methods=['POST'])
+@require_auth
+@require_signed_json()
+def submit_job():
+    """Queue a sweep or Monte Carlo job and return its id immediately"""
+    data = request.signed_data
+
+    username = request.user['username']
+    if job_db.count_active_jobs(username) >= JOB_MAX_ACTIVE_PER_USER:
+        return jsonify({'error': f'At most {JOB_MAX_ACTIVE_PER_USER} queued or running jobs per user'}), 429
+
+    try:
+        job = job_queue.submit(username, data.get('kind'), data.get('params'), data.get('timeLimit'))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify({'success': True, 'job': job_response(job)})
+    response.headers['Location'] = f'/api/jobs/{job["job_id"]}'
+    return response, 202
+
+@app.route('/api/jobs', methods=['GET'])
+@require_auth
+def list_jobs():
+    """List the caller's unexpired jobs, newest first"""
+    jobs = job_db.list_user_jobs(request.user['username'])
+    return jsonify({'success': True, 'jobs': [job_response(job) for job in jobs]})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@require_auth
+def get_job_status(job_id):
+    """Status and progress of a job"""
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    return jsonify({'success': True, 'job': job_response(job)})
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+@require_auth
+def get_job_result(job_id):
+    """Result of a succeeded job; sweep results point at their export file"""
+    job = get_user_job(job_id, with_result=True)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    if job['status'] != 'succeeded':
+        return jsonify({'error': f'Job is {job["status"]}', 'job': job_response(job)}), 409
+
+    result = job['result']
+    if 'export' in result:
+        result['export']['url'] = f'/api/calculate/export/{result["export"]["exportId"]}'
+    return jsonify({'success': True, 'job': job_response(job), 'result': result})
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+@require_auth
+def stream_job_events(job_id):
+    """Server-Sent Events stream of a job's progress, ending when the job finishes"""
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    if job_events.at_capacity():
+        return jsonify({'error': 'Too many open event streams'}), 503
+
+    def generate():
+        # Subscribed inside the generator so a stream that never starts never leaks;
+        # a client disconnect surfaces as GeneratorExit at the next yield
+        if not job_events.subscribe(job_id):
+            yield 'event: error\ndata: {"error": "Too many open event streams"}\n\n'
+            return
+        try:
+            yield 'retry: 3000\n\n'
+            version = 0
+            while True:
+                latest, payload, finished = job_events.wait(job_id, version, JOB_EVENT_HEARTBEAT)
+                if latest == version:
+                    yield ': heartbeat\n\n'
+                    continue
+                version = latest
+                if payload is None:
+                    yield 'event: error\ndata: {"error": "Unknown or expired job"}\n\n'
+                    return
+                yield f'event: {"done" if finished else "progress"}\nid: {version}\ndata: {payload}\n\n'
+                if finished:
+                    return
+        finally:
+            job_events.unsubscribe(job_id)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+@require_auth
+def cancel_job(job_id):
+    """Cancel a queued job or stop a running one"""
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    if not job_queue.cancel(job_id):
+        return jsonify({'error': f'Job is {job["status"]}', 'job': job_response(job)}), 409
+    return jsonify({'success': True, 'job': job_response(job_db.get_job(job_id))}), 202
+
+@app.route('/api/calculate/cashflow', methods=['POST'])
+@require_auth
+@require_signed_json()
+def calculate_cashflow():
+    """Year-by-year (or monthly) cash-flow timeline with NPV, IRR and depreciation"""
+    data = request.signed_data
+
+    try:
+        params = normalize_calculation_params(data.get('config') or {})
+        options = parse_cashflow_options(data.get('cashflow'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        cols = build_calculation_columns([params])
+        outputs = calculate_tco_columns(cols)
+        timeline = format_cashflow_results(calculate_cashflow_columns(cols, outputs, options), options)[0]
+    except Exception as e:
+        app.logger.error(f"Cash-flow calculation error: {str(e)}")
+        return jsonify({'error': 'Calculation failed'}), 500
+
+    return jsonify({
+        'success': True,
+        'options': options,
+        'results': calculate_results(params),
+        'cashflow': timeline
+    })
+
+@app.route('/api/calculate/topology', methods=['POST'])
+@require_auth
+@require_signed_json()
+def calculate_topology():
+    """Per-tier switch, link and optic counts of the fat-tree fabric for one configuration"""
+    data = request.signed_data
+
+    try:
+        params = normalize_calculation_params(data.get('config') or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    args = (params['numGPUs'], params['fabricType'], params['oversubscription'])
+    network = calculate_network_costs(*args)
+
+    return jsonify({
+        'success': True,
+        'numGPUs': params['numGPUs'],
+        'fabricType': params['fabricType'],
+        'oversubscription': params['oversubscription'],
+        'topology': network_topology(*args).to_dict(),
+        'networkCapex': round(network['capex']),
+        'networkOpex': round(network['opex'])
+    })
+
+@app.route('/api/calculate/incremental', methods=['POST'])
+@require_auth
+@require_signed_json()
+def calculate_incremental():
+    """Recalculate a previous result with a parameter delta, re-running only the affected components
+
+    Send {config} to start and get a resultId, then {resultId, delta} for each
+    change; both are signed over every field except the signature.
+    """
+    data = request.signed_data
+
+    try:
+        if 'resultId' in data:
+            outcome = incremental_calculator.recalculate(data['resultId'], data.get('delta') or {})
+            if outcome is None:
+                return jsonify({'error': 'Unknown or expired resultId'}), 404
+        else:
+            params = normalize_calculation_params(data.get('config') or {})
+            outcome = incremental_calculator.evaluate(params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Incremental calculation error: {str(e)}")
+        return jsonify({'error': 'Calculation failed'}), 500
+
+    result_id, results, recomputed = outcome
+    return jsonify({
+        'success': True,
+        'resultId': result_id,
+        'results': results,
+        'recomputed': recomputed
+    })
+
+@app.route('/api/calculate/storage-growth', methods=['POST'])
+@require_auth
+@require_signed_json()
+def calculate_storage_growth():
+    """Month-by-month storage tiers, step purchases and per-vendor costs as data grows"""
+    data = request.signed_data
+
+    try:
+        params = normalize_calculation_params(data.get('config') or {})
+        options = parse_storage_growth_options(data.get('storage'), params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        simulation = run_storage_growth(params, options)
+    except Exception as e:
+        app.logger.error(f"Storage growth simulation error: {str(e)}")
+        return jsonify({'error': 'Calculation failed'}), 500
+
+    return jsonify({
+        'success': True,
+        'options': options,
+        'storage': simulation
+    })
+
+# Service-tier, storage and service-mix planning models shared with the
+# dashboard, each configuration evaluated once and served from this cache
+planning_calculator = PlanningCalculator()
+
+@app.route('/api/calculate/planning/<model>', methods=['POST'])
+@require_auth
+@require_signed_json()
+def calculate_planning(model):
+    """Evaluate a dashboard planning model for one configuration ("config") or a batch ("configs")"""
+    if model not in PLANNING_MODELS:
+        return jsonify({'error': 'Unknown planning model'}), 404
+
+    data = request.signed_data
+
+    if 'configs' in data:
+        configs = data['configs']
+        if not isinstance(configs, list) or not configs:
+            return jsonify({'error': 'configs must be a non-empty array'}), 400
+        if len(configs) > PLANNING_MAX_BATCH:
+            return jsonify({'error': f'Batch size limited to {PLANNING_MAX_BATCH} configurations'}), 413
+
+        try:
+            started = time.perf_counter()
+            entries = planning_calculator.evaluate_batch(model, configs)
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            app.logger.error(f"Planning batch error: {str(e)}")
+            return jsonify({'error': 'Calculation failed'}), 500
+
+        succeeded = sum(1 for entry in entries if entry['success'])
+
+        return jsonify({
+            'success': True,
+            'model': model,
+            'count': len(entries),
+            'succeeded': succeeded,
+            'failed': len(entries) - succeeded,
+            'cacheHits': sum(1 for entry in entries if entry.get('cached')),
+            'elapsedMs': round(elapsed * 1000, 2),
+            'results': entries
+        })
+
+    try:
+        results, cached = planning_calculator.evaluate(model, data.get('config'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Planning calculation error: {str(e)}")
+        return jsonify({'error': 'Calculation failed'}), 500
+
+    response = jsonify({
+        'success': True,
+        'model': model,
+        'results': results
+    })
+    response.headers['X-Cache'] = 'HIT' if cached else 'MISS'
+    return response
+
+@app.route('/api/calculate/montecarlo', methods=['POST'])
+@require_auth
+@require_signed_json()
+def calculate_monte_carlo():
+    """Return P10/P50/P90 TCO outcomes under uncertain price, power rate, utilization and PUE"""
+    data = request.signed_data
+
+    try:
+        params, distributions, samples, seed = parse_monte_carlo_request(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Runs big enough to need several processes go to the job queue: its
+    # processes are fresh interpreters, whereas a pool forked from this
+    # threaded process could inherit a lock held by a request thread
+    if samples >= MONTE_CARLO_PARALLEL_THRESHOLD:
+        username = request.user['username']
+        if job_db.count_active_jobs(username) >= JOB_MAX_ACTIVE_PER_USER:
+            return jsonify({'error': f'At most {JOB_MAX_ACTIVE_PER_USER} queued or running jobs per user'}), 429
+        body = {k: v for k, v in data.items() if k != 'signature'}
+        body['seed'] = seed
+        try:
+            job = job_queue.submit(username, 'montecarlo', body)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        response = jsonify({'success': True, 'job': job_response(job)})
+        response.headers['Location'] = f'/api/jobs/{job["job_id"]}'
+        return response, 202
+
+    try:
+        started = time.perf_counter()
+        summary, parallel = run_monte_carlo(params, distributions, samples, seed, parallel=False)
+        elapsed = time.perf_counter() - started
+    except Exception as e:
+        app.logger.error(f"Monte Carlo error: {str(e)}")
+        return jsonify({'error': 'Calculation failed'}), 500
+
+    return jsonify({
+        'success': True,
+        'samples': samples,
+        'seed': seed,
+        'parallel': parallel,
+        'elapsedMs': round(elapsed * 1000, 2),
+        'distributions': distributions,
+        'deterministic': calculate_results(params),
+        'results': summary
+    })
+
+@app.route('/api/calculate/sensitivity', methods=['POST'])
+@require_auth
+@require_signed_json()
+def calculate_sensitivity():
+    """Tornado analysis of costPerHour and tco10year for one configuration"""
+    data = request.signed_data
+
+    try:
+        params = normalize_calculation_params(data.get('config') or {})
+        delta_percent = float(data.get('deltaPercent', SENSITIVITY_DEFAULT_DELTA))
+        if not math.isfinite(delta_percent) or delta_percent <= 0 or delta_percent >= 100:
+            raise ValueError('deltaPercent must be between 0 and 100')
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        baseline, sensitivities = run_sensitivity(params, delta_percent)
+    except Exception as e:
+        app.logger.error(f"Sensitivity error: {str(e)}")
+        return jsonify({'error': 'Calculation failed'}), 500
+
+    return jsonify({
+        'success': True,
+        'deltaPercent': delta_percent,
+        'baseline': baseline,
+        'sensitivities': sensitivities
+    })
+
+@app.route('/api/calculate/optimize', methods=['POST'])
+@require_auth
+@require_signed_json()
+def calculate_optimize():
+    """Find the cheapest cost-per-GPU-hour configurations under power, bandwidth, budget and region constraints"""
+    data = request.signed_data
+
+    try:
+        params = normalize_calculation_params(data.get('config') or {})
+        constraints = data.get('constraints') or {}
+        if not isinstance(constraints, dict):
+            raise ValueError('constraints must be an object')
+        try:
+            top_k = int(data.get('topK', OPTIMIZER_DEFAULT_TOP_K))
+        except OverflowError:
+            raise ValueError('topK must be an integer')
+        if top_k < 1 or top_k > OPTIMIZER_MAX_TOP_K:
+            raise ValueError(f'topK must be between 1 and {OPTIMIZER_MAX_TOP_K}')
+
+        started = time.perf_counter()
+        results, search = optimize_configurations(params, constraints, top_k)
+        elapsed = time.perf_counter() - started
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Optimizer error: {str(e)}")
+        return jsonify({'error': 'Optimization failed'}), 500
+
+    return jsonify({
+        'success': True,
+        'count': len(results),
+        'elapsedMs': round(elapsed * 1000, 2),
+        'search': search,
+        'results': results
+    })
+
+# Precomputed location cost index, built at startup and rebuilt on pricing changes
+location_cost_index = LocationCostIndex(pricing_tables_fingerprint, PRICING_CHECK_INTERVAL)
+location_cost_index.refresh()
+
+# Pricing catalog reloads: derived results are dropped and the index rebuilt
+# as soon as a new catalog is swapped in, off the request path
+add_pricing_reload_listener(lambda catalog: calculation_cache.clear())
+add_pricing_reload_listener(lambda catalog: incremental_calculator.store.clear())
+add_pricing_reload_listener(lambda catalog: location_cost_index.refresh())
+watch_pricing_catalog()
+
+@app.after_request
+def add_pricing_version(response):
+    """Tag API responses with the pricing catalog version they were priced under"""
+    if request.path.startswith('/api/'):
+        response.headers['X-Pricing-Version'] = get_pricing_catalog().version
+    return response
+
+@app.route('/api/pricing/version', methods=['GET'])
+@require_auth
+def get_pricing_version():
+    """Active pricing catalog version, digest and load time"""
+    catalog = get_pricing_catalog()
+    return jsonify({
+        'version': catalog.version,
+        'digest': catalog.digest,
+        'loadedAt': catalog.loaded_at
+    })
+
+@app.route('/api/pricing/reload', methods=['POST'])
+@require_auth
+@require_admin
+def reload_pricing():
+    """Reload the pricing catalog file now instead of on the watcher's next check - admin only"""
+    try:
+        reloaded = reload_pricing_catalog(force=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    catalog = get_pricing_catalog()
+    log_user_activity(get_client_ip(), request.user['username'], 'pricing',
+                      f'Reloaded pricing catalog {catalog.version}', request.headers.get('User-Agent', 'Unknown'))
+    return jsonify({
+        'reloaded': reloaded,
+        'version': catalog.version,
+        'digest': catalog.digest,
+        'loadedAt': catalog.loaded_at
+    })
+
+@app.route('/api/locations/cost-index', methods=['GET'])
+@require_auth
+def get_location_cost_index():
+    """Ranked location costs; filter with ?gpuModel=&coolingType=&numGPUs= for a single slice"""
+    gpu_model = request.args.get('gpuModel')
+    if gpu_model is None:
+        key = None
+    else:
+        cooling_type = request.args.get('coolingType', 'air')
+        try:
+            size = int(request.args.get('numGPUs', 10000))
+        except ValueError:
+            return jsonify({'error': 'numGPUs must be an integer'}), 400
+        key = (gpu_model, cooling_type, size)
+
+    entry = location_cost_index.get(key)
+    if entry is None:
+        sizes = ', '.join(str(s) for s in LOCATION_INDEX_REFERENCE_SIZES)
+        return jsonify({'error': f'No index slice for that GPU model and cooling type; numGPUs must be one of: {sizes}'}), 404
+
+    etag, body = entry
+    headers = {'ETag': etag, 'Cache-Control': 'private, max-age=300'}
+    # GET revalidation uses weak comparison, and "*" matches any tag
+    if request.if_none_match.contains_weak(unquote_etag(etag)[0]):
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
+
+def scenario_response(scenario, source):
+    """Client view of a stored scenario"""
     return {
-        'capex': total_capex,
-        'opex': total_capex * 0.05,  # 5% annual maintenance
-        'bandwidth': bandwidth_tbps
+        'id': scenario['scenario_id'],
+        'name': scenario.get('name', ''),
+        'savedAt': scenario.get('saved_at'),
+        'config': scenario['config'],
+        'results': scenario['results'],
+        'source': source
     }
 
+@app.route('/api/scenarios', methods=['POST'])
+@require_auth
+@require_signed_json()
+def save_scenario():
+    """Save a configuration and its results; identical content is stored once across users"""
+    data = request.signed_data
+
+    name = data.get('name', '')
+    if not isinstance(name, str) or len(name) > 200:
+        return jsonify({'error': 'name must be a string of at most 200 characters'}), 400
+    try:
+        params = normalize_calculation_params(data.get('config') or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Reuse stored or cached results for this content before calculating
+    scenario_id = calculation_cache_key(params)
+    pricing_version = pricing_tables_fingerprint()
+    stored = scenario_db.get_scenario(scenario_id)
+    if stored is not None and stored['pricing_version'] == pricing_version:
+        results, source = stored['results'], 'stored'
+    else:
+        try:
+            results, cache_status = cached_calculation(scenario_id, params)
+        except TimeoutError:
+            return jsonify({'error': 'Calculation timed out'}), 504
+        except Exception as e:
+            app.logger.error(f"Scenario calculation error: {str(e)}")
+            return jsonify({'error': 'Calculation failed'}), 500
+        source = 'cache' if cache_status == 'HIT' else 'calculated'
+
+    scenario, deduplicated = scenario_db.save_scenario(
+        request.user['username'], scenario_id, params, results, pricing_version, name.strip()
+    )
+    return jsonify({
+        'success': True,
+        'deduplicated': deduplicated,
+        'scenario': scenario_response(scenario, source)
+    })
+
+@app.route('/api/scenarios', methods=['GET'])
+@require_auth
+def list_scenarios():
+    """List the caller's saved scenarios, newest first, with keyset pagination"""
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        before = request.args.get('cursor')
+        before = int(before) if before else None
+    except ValueError:
+        return jsonify({'error': 'limit and cursor must be integers'}), 400
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+
+    entries, next_cursor = scenario_db.list_user_scenarios(request.user['username'], limit, before)
+    return jsonify({
+        'scenarios': [{
+            'id': entry['scenario_id'],
+            'name': entry['name'],
+            'savedAt': entry['saved_at'],
+            'config': entry['config']
+        } for entry in entries],
+        'nextCursor': next_cursor
+    })
+
+@app.route('/api/scenarios/<scenario_id>', methods=['GET'])
+@require_auth
+def open_scenario(scenario_id):
+    """Open a saved scenario, serving stored results unless pricing has changed since"""
+    scenario = scenario_db.get_user_scenario(request.user['username'], scenario_id)
+    if scenario is None:
+        return jsonify({'error': 'Scenario not found'}), 404
+
+    source = 'stored'
+    pricing_version = pricing_tables_fingerprint()
+    if scenario['pricing_version'] != pricing_version:
+        source = 'recalculated'
+        try:
+            scenario['results'] = calculate_results(normalize_calculation_params(scenario['config']))
+        except Exception as e:
+            app.logger.error(f"Scenario recalculation error: {str(e)}")
+            return jsonify({'error': 'Calculation failed'}), 500
+        scenario_db.update_results(scenario_id, scenario['results'], pricing_version)
+
+    response = jsonify({'success': True, 'scenario': scenario_response(scenario, source)})
+    response.headers['X-Cache'] = 'HIT' if source == 'stored' else 'MISS'
+    return response
+
+@app.route('/api/scenarios/<scenario_id>', methods=['DELETE'])
+@require_auth
+def delete_scenario(scenario_id):
+    """Remove a scenario from the caller's list"""
+    if not scenario_db.delete_user_scenario(request.user['username'], scenario_id):
+        return jsonify({'error': 'Scenario not found'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/calculate/cache/stats', methods=['GET'])
+@require_auth
+def get_calculation_cache_stats():
+    """Get calculation result cache counters - admin only"""
+    if request.user['role'] != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    return jsonify({
+        'cache': calculation_cache.stats(),
+        'coalescing': calculation_flight.stats(),
+        'tokens': token_cache_stats(),
+        'incremental': incremental_calculator.stats(),
+        'planning': planning_calculator.stats()
+    })
+
 @app.route('/api/health', methods=['GET'])
 def health():
     return jsonify({'status': 'healthy'})
@@ -746,7 +1576,10 @@ def create_user():
         expires_at = (datetime.now(timezone.utc) + timedelta(days=expires_days)).isoformat()
     
     # Create user
-    password_hash = hashlib.sha256(password.encode()).hexdigest()
+    try:
+        password_hash = password_hasher.hash(password)
+    except PasswordHasherBusy:
+        return password_hashing_busy()
     success = user_db.create_user(
         username=username,
         password_hash=password_hash,
@@ -821,6 +1654,7 @@ def update_user(username):
     # Apply the updates to the database
     if update_data:
         user_db.update_user(username, **update_data)
+        evict_user_tokens(username)
     
     # Log the action
     client_ip = get_client_ip()
@@ -856,8 +1690,12 @@ def reset_user_password(username):
         return jsonify({'error': 'Password must be at least 8 characters'}), 400
     
     # Update password
-    password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+    try:
+        password_hash = password_hasher.hash(new_password)
+    except PasswordHasherBusy:
+        return password_hashing_busy()
     user_db.update_password(username, password_hash)
+    evict_user_tokens(username)
     
     # Log the action
     client_ip = get_client_ip()
@@ -883,6 +1721,7 @@ def delete_user(username):
     
     # Delete user
     user_db.delete_user(username)
+    evict_user_tokens(username)
     
     # Log the action
     client_ip = get_client_ip()
@@ -901,7 +1740,12 @@ def get_database_stats():
     
     try:
         stats = user_db.get_database_stats()
-        return jsonify({'stats': stats})
+        return jsonify({
+            'stats': stats,
+            'scenarios': scenario_db.get_database_stats(),
+            'jobs': {**job_db.get_database_stats(), 'queue': job_queue.stats(), 'events': job_events.stats()},
+            'passwords': password_hasher.stats()
+        })
     except Exception as e:
         return jsonify({'error': f'Failed to get database stats: {str(e)}'}), 500
 
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Job Database Management Module
+Provides the SQLite job table shared by the API workers and the calculation job processes
+"""
+
+import sqlite3
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Jobs move queued -> running -> succeeded | failed | cancelled. Every API worker
+# and every job process opens the same file, so the table is the only shared
+# state: a worker claims the oldest queued job inside an IMMEDIATE transaction
+# (at most one claimant wins, and the running count is checked in the same
+# transaction so the pool bound holds box-wide), and a finished job is written
+# by whichever side gets there first, guarded on status = 'running'.
+#
+# Identical jobs share one run. A job submitted while an active job with the
+# same spec_key exists is created as its follower (leader_id set): it is never
+# claimed itself, moves to running with its leader, and receives the leader's
+# progress and outcome in the same statements that write the leader's. A
+# follower is only attached to a leader whose time limit is at least its own,
+# and it still fails on its own limit. Cancelling a follower detaches it;
+# cancelling a queued leader hands the run to its oldest follower, and a
+# running leader with followers is marked cancelled while its process carries
+# on for them.
+#
+# Timestamps used for limits and expiry are epoch seconds; the *_at text
+# columns are ISO strings for display, as in the other databases.
+JOB_ACTIVE_STATUSES = ('queued', 'running')
+JOB_FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+class JobDatabase:
+    """Manages calculation job persistence using SQLite"""
+
+    def __init__(self, db_path: str = "/app/data/jobs.db"):
+        """Initialize the job database
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+
+        # Ensure the data directory exists
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        # Initialize the database
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """Initialize the database schema"""
+        with self._connect() as conn:
+            # Progress writes from job processes never block status reads
+            conn.execute("PRAGMA journal_mode = WAL")
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    spec TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    message TEXT NOT NULL DEFAULT '',
+                    partial TEXT,
+                    result TEXT,
+                    error TEXT,
+                    time_limit REAL NOT NULL,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    pid INTEGER,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    started REAL,
+                    expires REAL,
+                    spec_key TEXT,
+                    leader_id TEXT
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_username ON jobs(username, created_at)
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_spec_key ON jobs(spec_key, status)
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_leader ON jobs(leader_id, status)
+            """)
+
+            conn.commit()
+            logger.info("Job database schema initialized")
+
+    def create_job(self, job_id: str, username: str, kind: str, spec: Dict[str, Any],
+                   time_limit: float, spec_key: Optional[str] = None) -> Dict[str, Any]:
+        """Queue a new job, following an active job with the same spec_key if there is one
+
+        Args:
+            job_id: Unique job id
+            username: The submitting user
+            kind: Job kind (see tco_engine.jobs.JOB_KINDS)
+            spec: Validated job parameters
+            time_limit: Seconds the job may run before it is stopped
+            spec_key: Identity of the computation (see tco_engine.jobs.job_spec_key),
+                or None to never share a run
+
+        Returns:
+            The queued job; leader_id is set if it shares another job's run
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            leader = None
+            if spec_key is not None:
+                leader = conn.execute("""
+                    SELECT job_id, status, progress, message, partial, started_at, started FROM jobs
+                    WHERE spec_key = ? AND leader_id IS NULL AND status IN ('queued', 'running')
+                      AND cancel_requested = 0 AND time_limit >= ?
+                    ORDER BY created_at LIMIT 1
+                """, (spec_key, time_limit)).fetchone()
+            if leader is None:
+                conn.execute("""
+                    INSERT INTO jobs (job_id, username, kind, spec, time_limit, created_at, spec_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (job_id, username, kind, json.dumps(spec), time_limit,
+                      datetime.now(timezone.utc).isoformat(), spec_key))
+            else:
+                conn.execute("""
+                    INSERT INTO jobs (job_id, username, kind, spec, time_limit, created_at, spec_key,
+                                      leader_id, status, progress, message, partial, started_at, started)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (job_id, username, kind, json.dumps(spec), time_limit,
+                      datetime.now(timezone.utc).isoformat(), spec_key, leader['job_id'], leader['status'],
+                      leader['progress'], leader['message'], leader['partial'], leader['started_at'],
+                      leader['started']))
+            conn.commit()
+        finally:
+            conn.close()
+
+        if leader is None:
+            logger.info(f"Queued {kind} job {job_id} for {username}")
+        else:
+            logger.info(f"Queued {kind} job {job_id} for {username} on the run of job {leader['job_id']}")
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str, with_result: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a job by id
+
+        Args:
+            job_id: The job to look up
+            with_result: Also decode the stored result
+
+        Returns:
+            Job dictionary or None if not found or expired
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ? AND (expires IS NULL OR expires > ?)",
+                (job_id, time.time())
+            ).fetchone()
+
+            if row:
+                return self._decode(row, with_result)
+
+            return None
+
+    def list_user_jobs(self, username: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """List a user's unexpired jobs, newest first"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT * FROM jobs WHERE username = ? AND (expires IS NULL OR expires > ?)
+                ORDER BY created_at DESC LIMIT ?
+            """, (username, time.time(), limit)).fetchall()
+
+        return [self._decode(row) for row in rows]
+
+    def count_active_jobs(self, username: str) -> int:
+        """Number of a user's queued or running jobs"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE username = ? AND status IN ('queued', 'running')",
+                (username,)
+            )
+            return cursor.fetchone()[0]
+
+    def claim_job(self, max_running: int) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job as running, if fewer than max_running are
+
+        Returns:
+            The claimed job (with its spec) or None
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            running = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'running' AND leader_id IS NULL"
+            ).fetchone()[0]
+            row = None
+            if running < max_running:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' AND leader_id IS NULL ORDER BY created_at LIMIT 1"
+                ).fetchone()
+            if row is not None:
+                conn.execute("""
+                    UPDATE jobs SET status = 'running', started_at = ?, started = ?
+                    WHERE (job_id = ? OR leader_id = ?) AND status = 'queued'
+                """, (datetime.now(timezone.utc).isoformat(), time.time(), row['job_id'], row['job_id']))
+            conn.commit()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return {**self._decode(row), 'status': 'running'}
+
+    def set_pid(self, job_id: str, pid: int):
+        """Record the process running a job"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET pid = ? WHERE job_id = ?", (pid, job_id))
+            conn.commit()
+
+    def update_progress(self, job_id: str, progress: float, message: str = '',
+                        partial: Optional[Dict[str, Any]] = None) -> bool:
+        """Record a running job's progress (0-1) and best results so far, for it and its followers
+
+        Returns:
+            True if updated, False if neither the job nor a follower is still running
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET progress = ?, message = ?, partial = COALESCE(?, partial)
+                WHERE (job_id = ? OR leader_id = ?) AND status = 'running'
+            """, (progress, message, json.dumps(partial) if partial is not None else None, job_id, job_id))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def finish_job(self, job_id: str, status: str, ttl_seconds: float,
+                   result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> bool:
+        """Record a running job's outcome, for it and its running followers; records expire ttl_seconds later
+
+        Returns:
+            True if recorded, False if the job and its followers had already finished
+        """
+        if status not in JOB_FINISHED_STATUSES:
+            raise ValueError(f"Invalid job status: {status}")
+
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, expires = ?,
+                                progress = CASE WHEN ? = 'succeeded' THEN 1 ELSE progress END
+                WHERE (job_id = ? OR leader_id = ?) AND status = 'running'
+            """, (status, json.dumps(result) if result is not None else None, error,
+                  datetime.now(timezone.utc).isoformat(), time.time() + ttl_seconds,
+                  status, job_id, job_id))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def cancel_job(self, job_id: str, ttl_seconds: float) -> bool:
+        """Cancel a queued job, or flag a running one for its supervisor to stop
+
+        A job sharing its run with others is cancelled on its own and the run
+        continues for the rest.
+
+        Returns:
+            True if the job was still active
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status, leader_id FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None or row['status'] not in JOB_ACTIVE_STATUSES:
+                conn.rollback()
+                return False
+
+            followers = []
+            if row['leader_id'] is None:
+                followers = [r['job_id'] for r in conn.execute("""
+                    SELECT job_id FROM jobs WHERE leader_id = ? AND status IN ('queued', 'running')
+                    ORDER BY created_at
+                """, (job_id,))]
+
+            if row['status'] == 'running' and row['leader_id'] is None and not followers:
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+            else:
+                if followers and row['status'] == 'queued':
+                    # Nothing has run yet: the oldest follower leads the run instead
+                    conn.execute("UPDATE jobs SET leader_id = NULL WHERE job_id = ?", (followers[0],))
+                    conn.execute("UPDATE jobs SET leader_id = ? WHERE leader_id = ?", (followers[0], job_id))
+                conn.execute("""
+                    UPDATE jobs SET status = 'cancelled', finished_at = ?, expires = ?
+                    WHERE job_id = ?
+                """, (datetime.now(timezone.utc).isoformat(), time.time() + ttl_seconds, job_id))
+            conn.commit()
+            return True
+        finally:
+            conn.close()
+
+    def has_running_followers(self, job_id: str) -> bool:
+        """Whether any job still running shares this job's run"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM jobs WHERE leader_id = ? AND status = 'running' LIMIT 1", (job_id,)
+            ).fetchone()
+            return row is not None
+
+    def get_running_jobs(self) -> List[Dict[str, Any]]:
+        """Running jobs with their pid, start time, time limit, cancel flag and leader"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT job_id, kind, pid, started, time_limit, cancel_requested, leader_id
+                FROM jobs WHERE status = 'running'
+            """).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def get_job_states(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Status, progress and partial results of several unexpired jobs in one query
+
+        Returns:
+            {job_id: state} for the jobs that exist; partial stays JSON text
+        """
+        if not job_ids:
+            return {}
+        placeholders = ', '.join('?' * len(job_ids))
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT job_id, status, progress, message, partial, error, started, time_limit
+                FROM jobs WHERE job_id IN ({placeholders}) AND (expires IS NULL OR expires > ?)
+            """, (*job_ids, time.time())).fetchall()
+
+        return {row['job_id']: dict(row) for row in rows}
+
+    def purge_expired_jobs(self) -> int:
+        """Delete finished jobs past their expiry
+
+        Returns:
+            Number of jobs deleted
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE expires IS NOT NULL AND expires <= ?",
+                (time.time(),)
+            )
+            conn.commit()
+
+        if cursor.rowcount:
+            logger.info(f"Purged {cursor.rowcount} expired jobs")
+        return cursor.rowcount
+
+    def get_database_stats(self) -> Dict[str, Any]:
+        """Get database statistics
+
+        Returns:
+            Dictionary with database statistics
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+            by_status = {status: count for status, count in cursor.fetchall()}
+
+            # Get database file size
+            db_size = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+
+            return {
+                'total_jobs': sum(by_status.values()),
+                'jobs_by_status': by_status,
+                'database_size_bytes': db_size,
+                'database_path': self.db_path
+            }
+
+    @staticmethod
+    def _decode(row: sqlite3.Row, with_result: bool = False) -> Dict[str, Any]:
+        job = dict(row)
+        job['spec'] = json.loads(job['spec'])
+        job['partial'] = json.loads(job['partial']) if job['partial'] is not None else None
+        result = job.pop('result')
+        if with_result:
+            job['result'] = json.loads(result) if result is not None else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        return job
+
+
+# Global database instance (will be initialized when the module is imported)
+job_db = None
+
+def init_job_database(db_path: str = "/app/data/jobs.db") -> JobDatabase:
+    """Initialize the global job database instance
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        JobDatabase instance
+    """
+    global job_db
+    job_db = JobDatabase(db_path)
+    return job_db
+
+def get_job_database() -> JobDatabase:
+    """Get the global job database instance
+
+    Returns:
+        JobDatabase instance
+
+    Raises:
+        RuntimeError: If database hasn't been initialized
+    """
+    if job_db is None:
+        raise RuntimeError("Job database not initialized. Call init_job_database() first.")
+    return job_db
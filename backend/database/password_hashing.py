@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Password Hashing Module
+Salted, memory-hard password hashes computed on a bounded thread pool
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Passwords are stored as scrypt hashes, or PBKDF2-SHA256 where the Python
+# build lacks hashlib.scrypt, in a self-describing format:
+#
+#   scrypt$<n>$<r>$<p>$<salt>$<hash>
+#   pbkdf2_sha256$<iterations>$<salt>$<hash>
+#
+# with base64 salt and hash. One hash costs around a hundred milliseconds of
+# CPU and, for scrypt, 32 MiB of memory, so it never runs on the request
+# thread directly: every hash and verification goes to a pool of
+# PASSWORD_HASH_WORKERS threads (hashlib releases the GIL while it works), so
+# a login burst can use at most that many cores per process. At most
+# PASSWORD_HASH_MAX_PENDING requests may be queued or running; beyond that,
+# and after waiting PASSWORD_HASH_TIMEOUT seconds, PasswordHasherBusy is
+# raised so the caller can answer 503 instead of piling up threads.
+#
+# Hashes written before this module are unsalted SHA-256 hex. They still
+# verify (in constant time, padded to the cost of a current hash) and report
+# needs_rehash, so the login that proves the password can replace the hash;
+# see UserDatabase.update_password(expected_hash=...).
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 1) // 4)))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600000
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+SCRYPT_AVAILABLE = hasattr(hashlib, 'scrypt')
+
+# Verified in place of a real hash when the account does not exist or cannot
+# log in, so the response takes as long as a wrong password would and does not
+# reveal which usernames exist. It costs the same as a current hash and matches
+# no password.
+DUMMY_PASSWORD_HASH = (
+    f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${base64.b64encode(bytes(SALT_BYTES)).decode()}$"
+    if SCRYPT_AVAILABLE else
+    f"pbkdf2_sha256${PBKDF2_ITERATIONS}${base64.b64encode(bytes(SALT_BYTES)).decode()}$"
+) + base64.b64encode(bytes(HASH_BYTES)).decode()
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated"""
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # scrypt needs 128 * n * r bytes; leave headroom above OpenSSL's 32 MiB default
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, dklen=HASH_BYTES,
+                          maxmem=256 * n * r)
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations, dklen=HASH_BYTES)
+
+def is_legacy_hash(stored_hash: str) -> bool:
+    """Whether a stored hash is the old unsalted SHA-256 hex"""
+    return '$' not in stored_hash
+
+def compute_password_hash(password: str) -> str:
+    """Hash a password with the current scheme and a fresh salt (CPU-heavy; see PasswordHasher)"""
+    salt = secrets.token_bytes(SALT_BYTES)
+    if SCRYPT_AVAILABLE:
+        digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+    digest = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(digest)}"
+
+def check_password_hash(password: str, stored_hash: str) -> bool:
+    """Check a password against a stored hash of any supported scheme (CPU-heavy; see PasswordHasher)"""
+    if is_legacy_hash(stored_hash):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored_hash)
+
+    scheme, *fields = stored_hash.split('$')
+    try:
+        if scheme == 'scrypt':
+            n, r, p, salt, digest = fields
+            computed = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+        elif scheme == 'pbkdf2_sha256':
+            iterations, salt, digest = fields
+            computed = _pbkdf2(password, base64.b64decode(salt), int(iterations))
+        else:
+            logger.error(f"Unknown password hash scheme: {scheme}")
+            return False
+        return hmac.compare_digest(computed, base64.b64decode(digest))
+    except ValueError:
+        logger.error(f"Malformed {scheme} password hash")
+        return False
+
+def needs_rehash(stored_hash: str) -> bool:
+    """Whether a stored hash should be replaced by one with the current scheme and parameters"""
+    if is_legacy_hash(stored_hash):
+        return True
+    if SCRYPT_AVAILABLE:
+        return not stored_hash.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+    return not stored_hash.startswith(f"pbkdf2_sha256${PBKDF2_ITERATIONS}$")
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded thread pool"""
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING,
+                 timeout: float = PASSWORD_HASH_TIMEOUT):
+        """Initialize the hasher
+
+        Args:
+            workers: Threads computing hashes, i.e. the most cores hashing may use
+            max_pending: Most hashes queued or running at once
+            timeout: Seconds a caller waits for its hash before giving up
+        """
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.hashes = 0
+        self.verifications = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy('Password hashing is at capacity')
+        with self._lock:
+            self._pending += 1
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.busy_seconds += time.perf_counter() - started
+
+        def release(_):
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+        future = self._executor.submit(timed)
+        future.add_done_callback(release)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            # The work still finishes and frees its slot; only this caller stops waiting
+            future.cancel()
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy('Timed out waiting for password hashing')
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the current scheme
+
+        Raises:
+            PasswordHasherBusy: If the pool is saturated
+        """
+        result = self._run(compute_password_hash, password)
+        with self._lock:
+            self.hashes += 1
+        return result
+
+    def verify(self, password: str, stored_hash: str) -> Tuple[bool, bool]:
+        """Check a password against a stored hash
+
+        Returns:
+            (password matches, stored hash should be replaced)
+
+        Raises:
+            PasswordHasherBusy: If the pool is saturated
+        """
+        if is_legacy_hash(stored_hash):
+            # A single SHA-256, padded with a dummy verification so that a
+            # legacy account answers no faster than any other
+            matches = check_password_hash(password, stored_hash)
+            self._run(check_password_hash, password, DUMMY_PASSWORD_HASH)
+        else:
+            matches = self._run(check_password_hash, password, stored_hash)
+        with self._lock:
+            self.verifications += 1
+        return matches, matches and needs_rehash(stored_hash)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'scheme': 'scrypt' if SCRYPT_AVAILABLE else 'pbkdf2_sha256',
+                'workers': self.workers,
+                'maxPending': self.max_pending,
+                'pending': self._pending,
+                'hashes': self.hashes,
+                'verifications': self.verifications,
+                'rejected': self.rejected,
+                'busySeconds': round(self.busy_seconds, 3)
+            }
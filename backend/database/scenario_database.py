@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Scenario Database Management Module
+Provides content-addressed storage of saved cluster configurations and their results
+"""
+
+import sqlite3
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A scenario is keyed by the content hash of its normalized configuration, so
+# the same design saved by many users is stored once. Each user's saved copies
+# are rows in user_scenarios pointing at it; listings page through those rows
+# by their id (keyset pagination), newest first.
+#
+# Stored results carry the pricing version they were computed under. Opening a
+# scenario whose version is current serves the stored results without
+# recalculating; otherwise the caller recalculates and refreshes the row.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class ScenarioDatabase:
+    """Manages saved scenario persistence using SQLite"""
+
+    def __init__(self, db_path: str = "/app/data/scenarios.db"):
+        """Initialize the scenario database
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+
+        # Ensure the data directory exists
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        # Initialize the database
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _init_database(self):
+        """Initialize the database schema"""
+        with self._connect() as conn:
+            # Readers never block the writer, so opens stay fast while users save
+            conn.execute("PRAGMA journal_mode = WAL")
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS scenarios (
+                    scenario_id TEXT PRIMARY KEY,
+                    config TEXT NOT NULL,
+                    results TEXT NOT NULL,
+                    pricing_version TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS user_scenarios (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT NOT NULL,
+                    scenario_id TEXT NOT NULL REFERENCES scenarios(scenario_id),
+                    name TEXT NOT NULL DEFAULT '',
+                    saved_at TEXT NOT NULL,
+                    UNIQUE (username, scenario_id)
+                )
+            """)
+
+            # Keyset pagination walks (username, id) backwards
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_user_scenarios_username_id
+                ON user_scenarios(username, id)
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_user_scenarios_scenario
+                ON user_scenarios(scenario_id)
+            """)
+
+            conn.commit()
+            logger.info("Scenario database schema initialized")
+
+    def save_scenario(self, username: str, scenario_id: str, config: Dict[str, Any],
+                      results: Dict[str, Any], pricing_version: str,
+                      name: str = '') -> Tuple[Dict[str, Any], bool]:
+        """Save a scenario for a user, reusing the stored copy of identical content
+
+        Args:
+            username: The saving user
+            scenario_id: Content hash of the normalized configuration
+            config: Normalized configuration
+            results: Calculation results for the configuration
+            pricing_version: Pricing fingerprint the results were computed under
+            name: Display name for this user's copy
+
+        Returns:
+            (saved scenario entry, True if the content was already stored)
+        """
+        now = datetime.now(timezone.utc).isoformat()
+
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                INSERT OR IGNORE INTO scenarios (scenario_id, config, results, pricing_version,
+                                                 created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                scenario_id, json.dumps(config, sort_keys=True), json.dumps(results),
+                pricing_version, now, now
+            ))
+            deduplicated = cursor.rowcount == 0
+
+            # Refresh results computed under an older pricing version
+            if deduplicated:
+                conn.execute("""
+                    UPDATE scenarios SET results = ?, pricing_version = ?, updated_at = ?
+                    WHERE scenario_id = ? AND pricing_version != ?
+                """, (json.dumps(results), pricing_version, now, scenario_id, pricing_version))
+
+            conn.execute("""
+                INSERT INTO user_scenarios (username, scenario_id, name, saved_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (username, scenario_id) DO UPDATE SET name = excluded.name
+            """, (username, scenario_id, name, now))
+            conn.commit()
+
+        if not deduplicated:
+            logger.info(f"Stored scenario {scenario_id[:12]} for {username}")
+
+        return self.get_user_scenario(username, scenario_id), deduplicated
+
+    def get_scenario(self, scenario_id: str) -> Optional[Dict[str, Any]]:
+        """Get a stored scenario by content hash
+
+        Args:
+            scenario_id: The content hash to look up
+
+        Returns:
+            Scenario dictionary (config and results decoded) or None if not found
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute(
+                "SELECT * FROM scenarios WHERE scenario_id = ?",
+                (scenario_id,)
+            )
+            row = cursor.fetchone()
+
+            if row:
+                return self._decode(row)
+
+            return None
+
+    def get_user_scenario(self, username: str, scenario_id: str) -> Optional[Dict[str, Any]]:
+        """Get a scenario as saved by a user
+
+        Args:
+            username: The owning user
+            scenario_id: The content hash to look up
+
+        Returns:
+            Scenario dictionary with the user's name and saved_at, or None if
+            the user has not saved it
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute("""
+                SELECT s.*, u.id AS entry_id, u.name, u.saved_at
+                FROM user_scenarios u JOIN scenarios s ON s.scenario_id = u.scenario_id
+                WHERE u.username = ? AND u.scenario_id = ?
+            """, (username, scenario_id))
+            row = cursor.fetchone()
+
+            if row:
+                return self._decode(row)
+
+            return None
+
+    def list_user_scenarios(self, username: str, limit: int = DEFAULT_PAGE_SIZE,
+                            before: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """List a user's saved scenarios, newest first
+
+        Args:
+            username: The owning user
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            before: Cursor from the previous page; only older entries are returned
+
+        Returns:
+            (scenario entries without results, cursor for the next page or None)
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = """
+            SELECT u.id AS entry_id, u.scenario_id, u.name, u.saved_at, s.config
+            FROM user_scenarios u JOIN scenarios s ON s.scenario_id = u.scenario_id
+            WHERE u.username = ?
+        """
+        values: List[Any] = [username]
+        if before is not None:
+            query += " AND u.id < ?"
+            values.append(before)
+        query += " ORDER BY u.id DESC LIMIT ?"
+        values.append(limit + 1)
+
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(query, values).fetchall()
+
+        entries = [self._decode(row) for row in rows[:limit]]
+        next_cursor = entries[-1]['entry_id'] if len(rows) > limit else None
+        return entries, next_cursor
+
+    def update_results(self, scenario_id: str, results: Dict[str, Any], pricing_version: str) -> bool:
+        """Replace a scenario's stored results after recalculating them
+
+        Args:
+            scenario_id: The content hash
+            results: Fresh calculation results
+            pricing_version: Pricing fingerprint they were computed under
+
+        Returns:
+            True if updated successfully, False if the scenario is not stored
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE scenarios SET results = ?, pricing_version = ?, updated_at = ?
+                WHERE scenario_id = ?
+            """, (json.dumps(results), pricing_version, datetime.now(timezone.utc).isoformat(), scenario_id))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def delete_user_scenario(self, username: str, scenario_id: str) -> bool:
+        """Remove a scenario from a user's list, dropping its content once nobody has it saved
+
+        Args:
+            username: The owning user
+            scenario_id: The content hash
+
+        Returns:
+            True if deleted successfully, False if the user had not saved it
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM user_scenarios WHERE username = ? AND scenario_id = ?",
+                (username, scenario_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+
+            conn.execute("""
+                DELETE FROM scenarios WHERE scenario_id = ?
+                AND NOT EXISTS (SELECT 1 FROM user_scenarios WHERE scenario_id = ?)
+            """, (scenario_id, scenario_id))
+            conn.commit()
+
+            logger.info(f"Deleted scenario {scenario_id[:12]} for {username}")
+            return True
+
+    def get_database_stats(self) -> Dict[str, Any]:
+        """Get database statistics
+
+        Returns:
+            Dictionary with database statistics
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("SELECT COUNT(*) FROM scenarios")
+            total_scenarios = cursor.fetchone()[0]
+
+            cursor = conn.execute("SELECT COUNT(*), COUNT(DISTINCT username) FROM user_scenarios")
+            saved_entries, users = cursor.fetchone()
+
+            # Get database file size
+            db_size = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+
+            return {
+                'total_scenarios': total_scenarios,
+                'saved_entries': saved_entries,
+                'users_with_scenarios': users,
+                'deduplicated_entries': saved_entries - total_scenarios,
+                'database_size_bytes': db_size,
+                'database_path': self.db_path
+            }
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+        scenario = dict(row)
+        for field in ('config', 'results'):
+            if field in scenario:
+                scenario[field] = json.loads(scenario[field])
+        return scenario
+
+
+# Global database instance (will be initialized when the module is imported)
+scenario_db = None
+
+def init_scenario_database(db_path: str = "/app/data/scenarios.db") -> ScenarioDatabase:
+    """Initialize the global scenario database instance
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        ScenarioDatabase instance
+    """
+    global scenario_db
+    scenario_db = ScenarioDatabase(db_path)
+    return scenario_db
+
+def get_scenario_database() -> ScenarioDatabase:
+    """Get the global scenario database instance
+
+    Returns:
+        ScenarioDatabase instance
+
+    Raises:
+        RuntimeError: If database hasn't been initialized
+    """
+    if scenario_db is None:
+        raise RuntimeError("Scenario database not initialized. Call init_scenario_database() first.")
+    return scenario_db
@@ -5,9 +5,13 @@ Provides persistent user storage using SQLite for the NullSector Calculator API
 """
 
 import sqlite3
+import copy
 import hashlib
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Any
 import logging
@@ -16,16 +20,42 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# get_user runs on every login and on each admin action, and the mutations
+# below used to call it again before writing. Users are cached in process for
+# USER_CACHE_TTL seconds (0 disables the cache), at most USER_CACHE_MAX_ENTRIES
+# of them, unknown usernames included. Every write through this class drops
+# the user's entry. For the other workers, and for any other writer, triggers
+# bump the single-row users_version counter on each insert, delete or change
+# to a user's password, role, expiry, status or metadata; a lookup reads the
+# counter over one long-lived connection and drops the whole cache when it has
+# moved, so a role change is never served stale. last_login does not bump it,
+# so it may lag in other workers until the entry expires.
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 60))
+USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES', 1024))
+
 class UserDatabase:
     """Manages user data persistence using SQLite"""
     
-    def __init__(self, db_path: str = "/app/data/users.db"):
+    def __init__(self, db_path: str = "/app/data/users.db", cache_ttl: float = USER_CACHE_TTL,
+                 cache_max_entries: int = USER_CACHE_MAX_ENTRIES):
         """Initialize the user database
         
         Args:
             db_path: Path to the SQLite database file
+            cache_ttl: Seconds a looked-up user is served from memory (0 disables caching)
+            cache_max_entries: Most users kept in memory
         """
         self.db_path = db_path
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self._cache = OrderedDict()  # username -> (expires at, user data or None)
+        self._cache_version = None
+        self._cache_lock = threading.Lock()
+        self._version_conn = None
+        self._version_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_invalidations = 0
         
         # Ensure the data directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
@@ -65,6 +95,23 @@ class UserDatabase:
                 )
             """)
             
+            # Change counter for invalidating the user caches of every process
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    version INTEGER NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO users_version (id, version) VALUES (0, 0)")
+            for trigger, event in (('insert', 'INSERT'), ('delete', 'DELETE'),
+                                   ('update', 'UPDATE OF password_hash, role, expires_at, is_active, metadata')):
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS users_version_{trigger} AFTER {event} ON users
+                    BEGIN
+                        UPDATE users_version SET version = version + 1;
+                    END
+                """)
+            
             conn.commit()
             logger.info("Database schema initialized")
     
@@ -143,6 +190,22 @@ class UserDatabase:
                 
                 logger.info(f"Migrated {len(initial_users)} initial users to database")
     
+    def _read_version(self) -> int:
+        """Read the users_version counter, reusing one connection across threads"""
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._version_conn.execute("SELECT version FROM users_version WHERE id = 0").fetchone()[0]
+    
+    def users_version(self) -> int:
+        """Counter that moves whenever any worker or writer changes a user (not last_login)"""
+        return self._read_version()
+    
+    def _invalidate(self, username: str):
+        """Drop a user's cached entry after writing it"""
+        with self._cache_lock:
+            self._cache.pop(username, None)
+    
     def get_user(self, username: str) -> Optional[Dict[str, Any]]:
         """Get a user by username
         
@@ -152,6 +215,37 @@ class UserDatabase:
         Returns:
             User data dictionary or None if not found
         """
+        if self.cache_ttl <= 0:
+            return self._load_user(username)
+        
+        # Read before loading: a write landing in between leaves the entry
+        # tagged with the old version, so the next lookup discards it
+        version = self._read_version()
+        now = time.monotonic()
+        with self._cache_lock:
+            if version != self._cache_version:
+                if self._cache:
+                    self.cache_invalidations += 1
+                self._cache.clear()
+                self._cache_version = version
+            entry = self._cache.get(username)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(username)
+                self.cache_hits += 1
+                return copy.deepcopy(entry[1])
+            self.cache_misses += 1
+        
+        user_data = self._load_user(username)
+        with self._cache_lock:
+            if version == self._cache_version:
+                self._cache[username] = (now + self.cache_ttl, user_data)
+                self._cache.move_to_end(username)
+                while len(self._cache) > self.cache_max_entries:
+                    self._cache.popitem(last=False)
+        return copy.deepcopy(user_data)
+    
+    def _load_user(self, username: str) -> Optional[Dict[str, Any]]:
+        """Read a user from the database"""
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(
@@ -225,6 +319,7 @@ class UserDatabase:
                     expires_at, last_login, int(is_active), json.dumps(metadata)
                 ))
                 conn.commit()
+                self._invalidate(username)
                 
                 if not is_migration:
                     logger.info(f"Created user: {username} (role: {role})")
@@ -246,9 +341,6 @@ class UserDatabase:
         Returns:
             True if updated successfully, False if user not found
         """
-        if not self.get_user(username):
-            return False
-        
         # Build the update query dynamically
         update_fields = []
         values = []
@@ -267,37 +359,51 @@ class UserDatabase:
             values.append(json.dumps(kwargs['metadata']))
         
         if not update_fields:
-            return True  # Nothing to update
+            return self.user_exists(username)  # Nothing to update
         
         values.append(username)  # For the WHERE clause
         
         with sqlite3.connect(self.db_path) as conn:
             query = f"UPDATE users SET {', '.join(update_fields)} WHERE username = ?"
-            conn.execute(query, values)
+            cursor = conn.execute(query, values)
             conn.commit()
+            self._invalidate(username)
+            
+            if cursor.rowcount == 0:
+                return False
             
             logger.info(f"Updated user: {username}")
             return True
     
-    def update_password(self, username: str, password_hash: str) -> bool:
+    def update_password(self, username: str, password_hash: str,
+                        expected_hash: Optional[str] = None) -> bool:
         """Update a user's password hash
         
         Args:
             username: The username
             password_hash: New password hash
+            expected_hash: Only update if this is still the stored hash, so
+                rehashing a password on login never overwrites a reset made meanwhile
             
         Returns:
-            True if updated successfully, False if user not found
+            True if updated successfully, False if user not found or the hash changed
         """
-        if not self.get_user(username):
-            return False
-        
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "UPDATE users SET password_hash = ? WHERE username = ?",
-                (password_hash, username)
-            )
+            if expected_hash is None:
+                cursor = conn.execute(
+                    "UPDATE users SET password_hash = ? WHERE username = ?",
+                    (password_hash, username)
+                )
+            else:
+                cursor = conn.execute(
+                    "UPDATE users SET password_hash = ? WHERE username = ? AND password_hash = ?",
+                    (password_hash, username, expected_hash)
+                )
             conn.commit()
+            self._invalidate(username)
+            
+            if cursor.rowcount == 0:
+                return False
             
             logger.info(f"Updated password for user: {username}")
             return True
@@ -311,12 +417,13 @@ class UserDatabase:
         Returns:
             True if deleted successfully, False if user not found
         """
-        if not self.get_user(username):
-            return False
-        
         with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM users WHERE username = ?", (username,))
+            cursor = conn.execute("DELETE FROM users WHERE username = ?", (username,))
             conn.commit()
+            self._invalidate(username)
+            
+            if cursor.rowcount == 0:
+                return False
             
             logger.info(f"Deleted user: {username}")
             return True
@@ -384,7 +491,26 @@ class UserDatabase:
                 'inactive_users': total_users - active_users,
                 'role_counts': role_counts,
                 'database_size_bytes': db_size,
-                'database_path': self.db_path
+                'database_path': self.db_path,
+                'cache': self.get_cache_stats()
+            }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get user cache statistics
+        
+        Returns:
+            Dictionary with user cache statistics
+        """
+        with self._cache_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'entries': len(self._cache),
+                'maxEntries': self.cache_max_entries,
+                'ttlSeconds': self.cache_ttl,
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'invalidations': self.cache_invalidations,
+                'hitRate': round(self.cache_hits / lookups, 4) if lookups else 0.0
             }
 
 
@@ -0,0 +1,183 @@
+"""
+TCO Engine
+Pure GPU cluster TCO calculation engine, independent of Flask and the user database
+
+Attributes are resolved lazily so `import tco_engine` stays cheap: importing
+the scalar path (pricing catalog, normalize_calculation_params,
+calculate_results) does not import NumPy, which loads only when the cooling
+table or a price curve set is first built, and each vectorized submodule loads
+on first use.
+
+    from tco_engine import ClusterConfig, calculate_tco
+    calculate_tco(ClusterConfig(gpu_model='gb200', num_gpus=[10000, 50000], cooling_type='liquid'))
+"""
+
+from importlib import import_module
+
+# Public name -> defining submodule
+_EXPORTS = {
+    # Pricing catalog; the table names resolve to the active catalog on every access
+    'GPU_SPECS': 'pricing',
+    'REGION_RATES': 'pricing',
+    'ELECTRICITY_RATES': 'pricing',
+    'LEGACY_LOCATION_KEYS': 'pricing',
+    'STORAGE_VENDORS': 'pricing',
+    'STORAGE_HARDWARE_PER_GB': 'pricing',
+    'NETWORK_COSTS': 'pricing',
+    'get_electricity_rate': 'pricing',
+    'pricing_tables_fingerprint': 'pricing',
+    'PricingCatalog': 'pricing',
+    'load_pricing_catalog': 'pricing',
+    'get_pricing_catalog': 'pricing',
+    'set_pricing_catalog': 'pricing',
+    'reload_pricing_catalog': 'pricing',
+    'watch_pricing_catalog': 'pricing',
+    'add_pricing_reload_listener': 'pricing',
+    # Hourly price curves
+    'LOAD_PROFILES': 'price_curves',
+    'PriceCurveSet': 'price_curves',
+    'load_price_curves': 'price_curves',
+    'get_price_curves': 'price_curves',
+    'set_price_curves': 'price_curves',
+    'write_price_curves': 'price_curves',
+    # Cooling model
+    'COOLING_PUE_MODELS': 'cooling',
+    'LOCATION_CLIMATES': 'cooling',
+    'CoolingTable': 'cooling',
+    'get_cooling_table': 'cooling',
+    'location_pue': 'cooling',
+    'hourly_pue': 'cooling',
+    # Scalar model
+    'INTEGER_PARAMS': 'model',
+    'PERCENT_PARAMS': 'model',
+    'normalize_calculation_params': 'model',
+    'calculate_results': 'model',
+    'MODEL_COMPONENTS': 'model',
+    'evaluate_components': 'model',
+    'calculate_storage_costs': 'model',
+    'calculate_network_costs': 'model',
+    'parse_oversubscription': 'model',
+    'network_topology': 'model',
+    # Fabric topology
+    'FatTreeTopology': 'topology',
+    'size_fat_tree': 'topology',
+    # Vectorized model
+    'build_calculation_columns': 'vectorized',
+    'calculate_storage_costs_vectorized': 'vectorized',
+    'calculate_network_costs_vectorized': 'vectorized',
+    'fat_tree_counts_vectorized': 'vectorized',
+    'energy_hours_vectorized': 'vectorized',
+    'pue_columns': 'vectorized',
+    'calculate_tco_columns': 'vectorized',
+    'format_calculation_results': 'vectorized',
+    # Typed API
+    'ClusterConfig': 'core',
+    'TCOResult': 'core',
+    'calculate_tco': 'core',
+    # Cash-flow timelines
+    'CASHFLOW_OPTIONS': 'cashflow',
+    'CASHFLOW_MAX_BATCH_CELLS': 'cashflow',
+    'parse_cashflow_options': 'cashflow',
+    'cashflow_periods': 'cashflow',
+    'cashflow_chunk_rows': 'cashflow',
+    'calculate_cashflow_columns': 'cashflow',
+    'format_cashflow_results': 'cashflow',
+    'solve_irr': 'cashflow',
+    # Storage growth simulation
+    'STORAGE_TIERS': 'storage_growth',
+    'STORAGE_GROWTH_OPTIONS': 'storage_growth',
+    'parse_storage_growth_options': 'storage_growth',
+    'simulate_storage_growth': 'storage_growth',
+    'format_storage_growth': 'storage_growth',
+    'run_storage_growth': 'storage_growth',
+    # Result caching
+    'ResultCache': 'cache',
+    'calculation_cache_key': 'cache',
+    'SINGLE_FLIGHT_TIMEOUT': 'singleflight',
+    'SingleFlight': 'singleflight',
+    # Incremental recalculation
+    'IncrementalCalculator': 'incremental',
+    'dirty_components': 'incremental',
+    # Batch, sweep and analysis services
+    'BATCH_MAX_CONFIGS': 'batch',
+    'evaluate_batch': 'batch',
+    'SWEEP_MAX_POINTS': 'sweep',
+    'SWEEP_DEFAULT_CHUNK': 'sweep',
+    'SWEEP_MAX_CHUNK': 'sweep',
+    'SWEEP_RESULT_FIELDS': 'sweep',
+    'plan_sweep': 'sweep',
+    'iter_sweep_chunks': 'sweep',
+    'sweep_chunk_to_ndjson': 'sweep',
+    'EXPORT_FORMATS': 'export',
+    'EXPORT_MAX_CONFIGS': 'export',
+    'EXPORT_RESULT_FIELDS': 'export',
+    'ExportStore': 'export',
+    'arrow_available': 'export',
+    'check_export_format': 'export',
+    'export_key': 'export',
+    'iter_batch_export_chunks': 'export',
+    'iter_sweep_export_chunks': 'export',
+    'write_export': 'export',
+    'JOB_KINDS': 'jobs',
+    'JOB_MAX_ACTIVE_PER_USER': 'jobs',
+    'JOB_RESULT_TTL_SECONDS': 'jobs',
+    'JobQueue': 'jobs',
+    'JOB_EVENT_HEARTBEAT': 'jobs',
+    'JobEventHub': 'jobs',
+    'job_event': 'jobs',
+    'job_spec_key': 'jobs',
+    'parse_job_request': 'jobs',
+    'MONTE_CARLO_DEFAULT_SAMPLES': 'montecarlo',
+    'MONTE_CARLO_MAX_SAMPLES': 'montecarlo',
+    'MONTE_CARLO_PARALLEL_THRESHOLD': 'montecarlo',
+    'MONTE_CARLO_INPUTS': 'montecarlo',
+    'parse_distribution': 'montecarlo',
+    'parse_distributions': 'montecarlo',
+    'parse_monte_carlo_request': 'montecarlo',
+    'new_monte_carlo_seed': 'montecarlo',
+    'run_monte_carlo': 'montecarlo',
+    'SENSITIVITY_DEFAULT_DELTA': 'sensitivity',
+    'run_sensitivity': 'sensitivity',
+    'OPTIMIZER_DEFAULT_TOP_K': 'optimizer',
+    'OPTIMIZER_MAX_TOP_K': 'optimizer',
+    'optimize_configurations': 'optimizer',
+    'LOCATION_INDEX_REFERENCE_SIZES': 'location_index',
+    'LocationCostIndex': 'location_index',
+    # Dashboard planning models
+    'DEFAULT_SERVICE_TIERS': 'service_tiers',
+    'calculate_storage_requirements': 'service_tiers',
+    'calculate_infrastructure_requirements': 'service_tiers',
+    'validate_service_tiers': 'service_tiers',
+    'recommended_storage_architecture': 'service_tiers',
+    'calculate_enhanced_tco': 'service_tiers',
+    'calculate_roi_metrics': 'service_tiers',
+    'plan_service_tiers': 'service_tiers',
+    'calculate_enhanced_storage': 'storage_planning',
+    'analyze_infrastructure_capabilities': 'service_mix',
+    'derive_optimal_service_mix': 'service_mix',
+    'identify_service_constraints': 'service_mix',
+    'infer_workload_distribution': 'service_mix',
+    'derive_service_mix': 'service_mix',
+    'PLANNING_MODELS': 'planning',
+    'PLANNING_MAX_BATCH': 'planning',
+    'PlanningCalculator': 'planning',
+}
+
+__all__ = list(_EXPORTS)
+
+# Swapped on every catalog reload, so never bound into this namespace
+_CATALOG_TABLES = ('GPU_SPECS', 'REGION_RATES', 'ELECTRICITY_RATES', 'LEGACY_LOCATION_KEYS',
+                   'STORAGE_VENDORS', 'STORAGE_HARDWARE_PER_GB', 'NETWORK_COSTS')
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'tco_engine' has no attribute {name!r}")
+    value = getattr(import_module(f'.{_EXPORTS[name]}', __name__), name)
+    if name not in _CATALOG_TABLES:
+        globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,46 @@
+"""
+Batch Evaluation
+Price many raw configurations at once, reporting invalid rows individually
+"""
+
+from .model import normalize_calculation_params
+from .vectorized import build_calculation_columns, calculate_tco_columns, format_calculation_results
+from .cashflow import calculate_cashflow_columns, cashflow_chunk_rows, format_cashflow_results
+
+BATCH_MAX_CONFIGS = 10000
+
+def evaluate_batch(configs, cashflow=None):
+    """Price a list of raw configurations, returning one entry per input in order
+
+    Invalid rows are reported individually and never fail the rest of the batch.
+    Pass parse_cashflow_options() output as cashflow to attach a timeline to each row.
+    """
+    entries = [None] * len(configs)
+    valid_indices = []
+    valid_params = []
+
+    for i, config in enumerate(configs):
+        try:
+            valid_params.append(normalize_calculation_params(config))
+            valid_indices.append(i)
+        except ValueError as e:
+            entries[i] = {'index': i, 'success': False, 'error': str(e)}
+
+    if valid_params:
+        cols = build_calculation_columns(valid_params)
+        outputs = calculate_tco_columns(cols)
+        for i, result in zip(valid_indices, format_calculation_results(outputs)):
+            entries[i] = {'index': i, 'success': True, 'results': result}
+
+        if cashflow is not None:
+            step = cashflow_chunk_rows(cashflow)
+            for start in range(0, len(valid_indices), step):
+                rows = slice(start, start + step)
+                chunk_cols = {key: value[rows] for key, value in cols.items()}
+                chunk_outputs = {key: value[rows] for key, value in outputs.items()}
+                timelines = format_cashflow_results(
+                    calculate_cashflow_columns(chunk_cols, chunk_outputs, cashflow), cashflow)
+                for i, timeline in zip(valid_indices[rows], timelines):
+                    entries[i]['cashflow'] = timeline
+
+    return entries
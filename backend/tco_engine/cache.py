@@ -0,0 +1,92 @@
+"""
+Result Cache
+Thread-safe LRU + TTL cache for calculation results
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry TTL and version-based invalidation"""
+    
+    def __init__(self, max_entries, ttl_seconds, version_fn=None, version_check_interval=0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version_fn = version_fn
+        self.version_check_interval = version_check_interval
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._version = version_fn() if version_fn else None
+        self._version_checked_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    def _check_version(self, now):
+        """Clear the cache if the tracked version moved (caller holds the lock)"""
+        if self.version_fn is None or now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        version = self.version_fn()
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+            self.invalidations += 1
+    
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(now)
+            self._entries[key] = (now + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'version': self._version
+            }
+
+def calculation_cache_key(params):
+    """Canonical hash of normalized calculation parameters"""
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
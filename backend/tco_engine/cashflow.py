@@ -0,0 +1,263 @@
+"""
+Cash-Flow Timeline
+Year-by-year (or month-by-month) capex, opex, depreciation, NPV and IRR
+"""
+
+import math
+
+import numpy as np
+
+# A timeline has one column per period. Column 0 is the day-one deployment
+# (initial capex only); columns 1..P are the operating years or months. Every
+# quantity is an (n, P + 1) array, so thousands of configurations are priced
+# with a handful of broadcast operations and no per-year Python loop.
+CASHFLOW_MAX_YEARS = 30
+CASHFLOW_IRR_ITERATIONS = 64
+CASHFLOW_IRR_BOUNDS = (-0.99, 10.0)
+CASHFLOW_CHUNK_CELLS = 262_144  # rows x periods computed at once, bounding memory
+CASHFLOW_MAX_BATCH_CELLS = 2_000_000  # rows x periods returned in one batch response
+
+# Request option -> (default, minimum, maximum); rates are percent per year
+CASHFLOW_OPTIONS = {
+    'years': (10, 1, CASHFLOW_MAX_YEARS),
+    'discountRate': (8.0, 0.0, 100.0),
+    'powerEscalation': (0.0, -50.0, 100.0),
+    'opexEscalation': (0.0, -50.0, 100.0),
+    'hardwarePriceChange': (0.0, -90.0, 100.0),
+    'refreshYears': (0, 0, CASHFLOW_MAX_YEARS),
+    'revenuePerGpuHour': (None, 0.0, 1000.0),
+}
+
+# (timeline key, column) pairs reported per period
+CASHFLOW_SERIES = (
+    ('capex', 'capex'),
+    ('power', 'power'),
+    ('storage', 'storage'),
+    ('network', 'network'),
+    ('maintenance', 'maintenance'),
+    ('opex', 'opex'),
+    ('cost', 'cost'),
+    ('revenue', 'revenue'),
+    ('net', 'net'),
+    ('cumulative', 'cumulative'),
+    ('discountedCumulative', 'discounted_cumulative'),
+    ('depreciation', 'depreciation'),
+    ('bookValue', 'book_value'),
+)
+
+def parse_cashflow_options(options):
+    """Validate cash-flow options, filling defaults
+
+    Options: years, monthly, discountRate, powerEscalation, opexEscalation,
+    hardwarePriceChange (percent per year), refreshYears (0 = never refresh)
+    and revenuePerGpuHour (enables net cash flow, IRR and payback).
+
+    Raises:
+        ValueError: If an option is unknown, non-numeric or out of range
+    """
+    if options is None:
+        options = {}
+    if not isinstance(options, dict):
+        raise ValueError('cashflow must be an object')
+
+    unknown = set(options) - set(CASHFLOW_OPTIONS) - {'monthly'}
+    if unknown:
+        raise ValueError(f'Unknown cashflow option {sorted(unknown)[0]}')
+
+    monthly = options.get('monthly', False)
+    if not isinstance(monthly, bool):
+        raise ValueError('monthly must be true or false')
+
+    parsed = {'monthly': monthly}
+    for name, (default, low, high) in CASHFLOW_OPTIONS.items():
+        value = options.get(name, default)
+        if value is None:
+            parsed[name] = None
+            continue
+        try:
+            value = int(value) if isinstance(default, int) else float(value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f'{name} must be a number')
+        if not math.isfinite(value) or value < low or value > high:
+            raise ValueError(f'{name} must be between {low} and {high}')
+        parsed[name] = value
+
+    return parsed
+
+def cashflow_periods(options):
+    """Period labels: year (or month) numbers, 0 being the deployment date"""
+    per_year = 12 if options['monthly'] else 1
+    return list(range(options['years'] * per_year + 1))
+
+def cashflow_chunk_rows(options):
+    """Rows per calculate_cashflow_columns() call that keep memory within CASHFLOW_CHUNK_CELLS"""
+    return max(1, CASHFLOW_CHUNK_CELLS // len(cashflow_periods(options)))
+
+def _tranche_book_value(amount, start, end, life, periods):
+    """Straight-line book value of capex bought at start and retired at end"""
+    age = periods - start[:, None]
+    remaining = np.clip(1 - age / life[:, None], 0, 1)
+    live = (age >= 0) & (periods < end[:, None])
+    return np.where(live, amount[:, None] * remaining, 0.0)
+
+def solve_irr(net, periods_per_year):
+    """Annual IRR of each row of net cash flows by vectorized bisection
+
+    Rows whose net present value does not change sign over CASHFLOW_IRR_BOUNDS
+    (for example, never paying back) get NaN.
+    """
+    years = np.arange(net.shape[1]) / periods_per_year
+
+    def npv(rate):
+        return (net * (1 + rate)[:, None] ** -years).sum(axis=1)
+
+    low = np.full(net.shape[0], CASHFLOW_IRR_BOUNDS[0])
+    high = np.full(net.shape[0], CASHFLOW_IRR_BOUNDS[1])
+    npv_low = npv(low)
+    solvable = np.sign(npv_low) != np.sign(npv(high))
+
+    for _ in range(CASHFLOW_IRR_ITERATIONS):
+        mid = (low + high) / 2
+        npv_mid = npv(mid)
+        same = np.sign(npv_mid) == np.sign(npv_low)
+        low = np.where(same, mid, low)
+        npv_low = np.where(same, npv_mid, npv_low)
+        high = np.where(same, high, mid)
+
+    return np.where(solvable, (low + high) / 2, np.nan)
+
+def calculate_cashflow_columns(cols, outputs, options):
+    """Build cash-flow timelines for every row of a calculate_tco_columns() result
+
+    Args:
+        cols: Input columns from build_calculation_columns()
+        outputs: calculate_tco_columns(cols)
+        options: parse_cashflow_options() output
+
+    Returns:
+        Dict of (n, P + 1) timeline arrays keyed as in CASHFLOW_SERIES, plus
+        per-row arrays npv_cost, npv, irr, payback_years and residual_value
+    """
+    n = np.broadcast(*(np.atleast_1d(value) for value in outputs.values())).shape[0]
+
+    def row(value):
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (n,))
+
+    per_year = 12 if options['monthly'] else 1
+    periods = np.arange(options['years'] * per_year + 1, dtype=np.float64)
+    operating = periods > 0
+    year_index = np.ceil(periods / per_year)  # 0 for deployment, 1.. for operating years
+    fraction = np.where(operating, 1 / per_year, 0.0)
+
+    def escalation(percent):
+        return (1 + percent / 100) ** np.maximum(year_index - 1, 0)
+
+    def opex(annual, percent):
+        return row(annual)[:, None] * (fraction * escalation(percent))[None, :]
+
+    power = opex(outputs['annual_power_cost'], options['powerEscalation'])
+    storage = opex(outputs['storage_opex'], options['opexEscalation'])
+    network = opex(outputs['network_opex'], options['opexEscalation'])
+    maintenance = opex(outputs['maintenance_opex'], options['opexEscalation'])
+    opex_total = power + storage + network + maintenance
+
+    # Capex: everything on day one, then GPU, network and infrastructure again in
+    # the last period of each refresh year, repriced by hardwarePriceChange
+    total_capex = row(outputs['total_capex'])
+    refreshable = row(outputs['gpu_capex'] + outputs['network_capex'] + outputs['infrastructure_capex'])
+    life = row(cols['depreciation']) * per_year
+    last = float(periods[-1])
+
+    refresh = options['refreshYears']
+    refresh_years = list(range(refresh, options['years'], refresh)) if refresh else []
+    starts = [0.0] + [float(year * per_year) for year in refresh_years]
+
+    capex = np.zeros((n, len(periods)))
+    capex[:, 0] = total_capex
+    book_value = _tranche_book_value(
+        total_capex - refreshable, np.zeros(n), np.full(n, last + 1), life, periods)
+
+    for k, start in enumerate(starts):
+        end = starts[k + 1] if k + 1 < len(starts) else last + 1
+        amount = refreshable if k == 0 else refreshable * (1 + options['hardwarePriceChange'] / 100) ** refresh_years[k - 1]
+        if k:
+            capex[:, int(start)] += amount
+        book_value += _tranche_book_value(amount, np.full(n, start), np.full(n, end), life, periods)
+
+    # Depreciation is the drop in book value, including write-off of hardware retired early
+    previous = np.concatenate([np.zeros((n, 1)), book_value[:, :-1]], axis=1)
+    depreciation = capex - (book_value - previous)
+
+    cost = capex + opex_total
+    if options['revenuePerGpuHour'] is not None:
+        gpu_hours = row(cols['num_gpus'] * 8760 * cols['utilization'] / 100)
+        revenue = gpu_hours[:, None] * (fraction * options['revenuePerGpuHour'])[None, :]
+    else:
+        revenue = np.zeros_like(cost)
+    net = revenue - cost
+
+    discount = (1 + options['discountRate'] / 100) ** -(periods / per_year)
+    cumulative = np.cumsum(cost, axis=1)
+
+    result = {
+        'capex': capex,
+        'power': power,
+        'storage': storage,
+        'network': network,
+        'maintenance': maintenance,
+        'opex': opex_total,
+        'cost': cost,
+        'revenue': revenue,
+        'net': net,
+        'cumulative': cumulative,
+        'discounted_cumulative': np.cumsum(cost * discount, axis=1),
+        'depreciation': depreciation,
+        'book_value': book_value,
+        'npv_cost': (cost * discount).sum(axis=1),
+        'residual_value': book_value[:, -1],
+        'npv': np.full(n, np.nan),
+        'irr': np.full(n, np.nan),
+        'payback_years': np.full(n, np.nan),
+    }
+
+    if options['revenuePerGpuHour'] is not None:
+        net_cumulative = np.cumsum(net, axis=1)
+        paid_back = net_cumulative >= 0
+        first = np.argmax(paid_back, axis=1)
+        result['npv'] = (net * discount).sum(axis=1)
+        result['irr'] = solve_irr(net, per_year)
+        result['payback_years'] = np.where(paid_back.any(axis=1), first / per_year, np.nan)
+
+    return result
+
+def _optional(value, decimals=None):
+    return None if np.isnan(value) else round(value, decimals)
+
+def format_cashflow_summary(cashflow, i):
+    """Per-row NPV/IRR/payback figures for row i of calculate_cashflow_columns() output"""
+    return {
+        'npvCost': round(cashflow['npv_cost'][i].item()),
+        'npv': _optional(cashflow['npv'][i].item()),
+        'irr': _optional(cashflow['irr'][i].item() * 100, 2),
+        'paybackYears': _optional(cashflow['payback_years'][i].item(), 2),
+        'residualValue': round(cashflow['residual_value'][i].item()),
+        'totalCost': round(cashflow['cumulative'][i, -1].item()),
+    }
+
+def format_cashflow_results(cashflow, options):
+    """Per-row dicts with the summary figures and whole-dollar timeline series"""
+    series = {key: np.rint(cashflow[column]).astype(np.int64).tolist()
+              for key, column in CASHFLOW_SERIES}
+    if options['revenuePerGpuHour'] is None:
+        series.pop('revenue')
+        series.pop('net')
+
+    periods = cashflow_periods(options)
+    results = []
+    for i in range(len(cashflow['npv_cost'])):
+        entry = format_cashflow_summary(cashflow, i)
+        entry['period'] = 'month' if options['monthly'] else 'year'
+        entry['periods'] = periods
+        entry['timeline'] = {key: values[i] for key, values in series.items()}
+        results.append(entry)
+    return results
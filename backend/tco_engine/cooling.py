@@ -0,0 +1,229 @@
+"""
+Cooling Model
+Hourly PUE from per-location ambient temperature profiles and the cooling type
+"""
+
+import threading
+
+from .price_curves import (
+    HOURS_PER_YEAR, flat_energy_hours, get_price_curves, location_energy_hours, step_load_energy_hours
+)
+
+# Each location's 8760-hour dry-bulb temperature profile is synthesized from
+# its climate normals: an annual mean, a seasonal half-range (coldest around
+# mid-January) and a diurnal half-range (coldest at 03:00, warmest at 15:00).
+# Hourly PUE is piecewise linear in temperature: flat while the site can cool
+# for free, rising by `slope` per degree above `free_cooling_c`, capped at `max`.
+#
+# The whole (locations x cooling types x 8760) PUE cube is built in one
+# broadcast and reduced once to a per-location summary, so single calculations
+# only do a dictionary lookup. Locations without climate data keep the legacy
+# constant PUE.
+COOLING_TYPES = ('air', 'liquid')
+LEGACY_PUE = {'air': 1.5, 'liquid': 1.1}
+
+COOLING_PUE_MODELS = {
+    'air': {'base': 1.38, 'free_cooling_c': 12.0, 'slope': 0.022, 'max': 1.9},
+    'liquid': {'base': 1.07, 'free_cooling_c': 20.0, 'slope': 0.006, 'max': 1.22},
+}
+
+# Location -> (annual mean, seasonal half-range, diurnal half-range) in deg C
+LOCATION_CLIMATES = {
+    # US States
+    'Texas (Industrial)': (20.5, 9.5, 6.0),
+    'Virginia': (13.5, 11.0, 6.0),
+    'California (Industrial)': (17.0, 6.0, 7.0),
+    'Washington (Industrial)': (11.0, 7.0, 5.0),
+    'Oregon': (12.0, 7.0, 6.0),
+    'North Carolina': (15.5, 10.0, 6.5),
+    'Georgia': (17.5, 9.5, 6.0),
+    'Ohio': (11.0, 12.0, 5.5),
+    'Illinois': (10.5, 13.0, 5.5),
+    'Arizona (Industrial)': (23.5, 10.0, 8.0),
+
+    # European Union
+    'Germany': (10.0, 9.0, 4.5),
+    'France': (12.0, 8.0, 5.0),
+    'Netherlands': (10.5, 7.0, 4.0),
+    'Finland': (5.5, 12.0, 4.0),
+    'United Kingdom': (10.0, 6.5, 4.0),
+    'Sweden': (7.0, 10.5, 4.0),
+    'Austria': (9.5, 10.0, 5.0),
+    'Belgium': (10.5, 7.5, 4.0),
+    'Denmark': (8.5, 8.5, 3.5),
+    'Italy': (15.0, 9.5, 5.5),
+    'Spain': (15.0, 9.0, 6.5),
+    'Portugal': (17.0, 6.0, 5.0),
+    'Greece': (18.5, 9.5, 5.0),
+    'Bulgaria': (11.0, 11.5, 6.0),
+    'Croatia': (12.5, 10.5, 5.0),
+    'Czech Republic': (8.5, 10.0, 5.0),
+    'Estonia': (6.0, 11.0, 4.0),
+    'Hungary': (11.0, 11.5, 5.5),
+    'Latvia': (6.5, 11.0, 4.0),
+    'Lithuania': (7.0, 11.0, 4.5),
+    'Poland': (8.5, 10.5, 5.0),
+    'Romania': (10.5, 12.0, 6.0),
+    'Slovakia': (10.0, 11.0, 5.5),
+    'Slovenia': (11.0, 10.0, 5.5),
+    'Ireland': (10.0, 5.0, 3.5),
+    'Luxembourg': (9.5, 8.5, 4.5),
+    'Cyprus': (20.0, 9.5, 6.0),
+    'Malta': (19.5, 7.0, 3.5),
+
+    # Nordic/EFTA Countries
+    'Iceland': (5.0, 5.5, 2.5),
+    'Norway': (6.5, 8.5, 3.5),
+    'Liechtenstein': (10.0, 9.0, 5.0),
+
+    # Other International
+    'Canada': (7.0, 14.0, 5.0),
+
+    # Legacy regions without a named counterpart
+    'us-west': (16.0, 6.0, 7.0),
+    'eu-west': (10.5, 6.5, 4.0),
+    'apac': (27.5, 1.0, 4.0),
+    'asia': (27.5, 1.0, 4.0),
+}
+
+# Legacy keys sharing a named location's climate; each still gets its own row so
+# it lines up with its own price curve
+CLIMATE_ALIASES = {
+    'us-texas': 'Texas (Industrial)',
+    'us-virginia': 'Virginia',
+    'us-california': 'California (Industrial)',
+    'us-east': 'Virginia',
+    'europe': 'France',
+}
+
+LOCATION_CLIMATES.update({alias: LOCATION_CLIMATES[name] for alias, name in CLIMATE_ALIASES.items()})
+
+CLIMATE_LOCATIONS = list(LOCATION_CLIMATES)
+CLIMATE_ROWS = {name: row for row, name in enumerate(CLIMATE_LOCATIONS)}
+
+def cooling_index(cooling_type):
+    """Index into COOLING_TYPES; anything but liquid is priced as air, as before"""
+    return 1 if cooling_type == 'liquid' else 0
+
+def climate_row(location):
+    """Row of a location in the cooling table, or -1 when it has no climate data"""
+    return CLIMATE_ROWS.get(location, -1)
+
+def hourly_temperatures(climates):
+    """(len(climates), 8760) float64 dry-bulb temperatures from climate normals"""
+    import numpy as np
+
+    normals = np.asarray(climates, dtype=np.float64).reshape(-1, 3)
+    hours = np.arange(HOURS_PER_YEAR, dtype=np.float64)
+    seasonal = -np.cos(2 * np.pi * (hours / 24 - 15) / 365)
+    diurnal = -np.cos(2 * np.pi * (hours % 24 - 3) / 24)
+    return (normals[:, 0:1] + normals[:, 1:2] * seasonal[None, :] + normals[:, 2:3] * diurnal[None, :])
+
+def hourly_pue(temperatures, cooling_type):
+    """PUE for every hour of a temperature array under one cooling type"""
+    import numpy as np
+
+    model = COOLING_PUE_MODELS[COOLING_TYPES[cooling_index(cooling_type)]]
+    excess = np.maximum(np.asarray(temperatures) - model['free_cooling_c'], 0)
+    return np.minimum(model['base'] + model['slope'] * excess, model['max'])
+
+class CoolingTable:
+    """Hourly PUE for every climate location and cooling type, with annual summaries
+
+    Energy is priced hour by hour, so where a location also has a price curve
+    the summary carries a coincidence factor: mean(pue * price) over mean(pue)
+    * mean(price). It is 1 for flat prices and above 1 when hot hours are the
+    expensive ones.
+    """
+
+    def __init__(self, price_curves=None):
+        import numpy as np
+
+        # (locations, cooling types, 8760) PUE cube
+        temperatures = hourly_temperatures([LOCATION_CLIMATES[name] for name in CLIMATE_LOCATIONS])
+        pue = np.stack([hourly_pue(temperatures, cooling) for cooling in COOLING_TYPES], axis=1)
+
+        # Hourly prices aligned to the climate rows, ones where prices are flat
+        prices = np.ones((len(CLIMATE_LOCATIONS), HOURS_PER_YEAR))
+        if price_curves is not None:
+            for row, name in enumerate(CLIMATE_LOCATIONS):
+                curve = price_curves.row(name)
+                if curve >= 0:
+                    prices[row] = price_curves.prices[curve] / price_curves.means[curve]
+
+        self.price_curves = price_curves
+        self.effective = (pue * prices[:, None, :]).reshape(-1, HOURS_PER_YEAR)
+        self.mean = pue.mean(axis=2)
+        self.peak = pue.max(axis=2)
+        self.coincidence = self.effective.mean(axis=1).reshape(self.mean.shape) / self.mean
+
+        # Plain-float copies for the scalar path
+        self.summary = [list(zip(mean, peak, coincidence)) for mean, peak, coincidence in
+                        zip(self.mean.tolist(), self.peak.tolist(), self.coincidence.tolist())]
+        self._lock = threading.Lock()
+        self._sorted = None
+
+    @property
+    def sorted_effective(self):
+        """Each (location, cooling) pue * price curve sorted ascending, rows location-major"""
+        with self._lock:
+            if self._sorted is None:
+                import numpy as np
+                self._sorted = np.sort(self.effective, axis=1)
+        return self._sorted
+
+    def price_aware_energy_hours(self, pairs, utilization):
+        """(len(utilization), len(pairs)) energy hours when busy hours are the cheapest to cool and power
+
+        pairs are location-major rows, climate_row * len(COOLING_TYPES) + cooling.
+        """
+        import numpy as np
+
+        pairs = np.asarray(pairs, dtype=np.int64)
+        curves = self.sorted_effective[pairs]
+        return step_load_energy_hours(curves, self.mean.reshape(-1)[pairs], utilization)
+
+_cooling_table = None
+_cooling_table_lock = threading.Lock()
+
+def get_cooling_table():
+    """The process-wide cooling table, rebuilt when the active price curve set changes"""
+    global _cooling_table
+    curves = get_price_curves()
+    table = _cooling_table
+    if table is None or table.price_curves is not curves:
+        with _cooling_table_lock:
+            if _cooling_table is None or _cooling_table.price_curves is not curves:
+                _cooling_table = CoolingTable(curves)
+            table = _cooling_table
+    return table
+
+def cooling_fingerprint():
+    """Climate and PUE model tables, folded into the pricing fingerprint"""
+    return (LOCATION_CLIMATES, COOLING_PUE_MODELS, LEGACY_PUE)
+
+def location_pue(location, cooling_type):
+    """(annual PUE, peak PUE, climate row) for a location and cooling type"""
+    row = climate_row(location)
+    if row < 0:
+        pue = LEGACY_PUE[COOLING_TYPES[cooling_index(cooling_type)]]
+        return pue, pue, -1
+    mean, peak, _ = get_cooling_table().summary[row][cooling_index(cooling_type)]
+    return mean, peak, row
+
+def site_energy_hours(price_row, climate, cooling_type, utilization, load_profile):
+    """Energy hours for one location, weighing load against hourly PUE and price (scalar path)
+
+    Power cost is then power_mw * 1000 * rate * energy_hours, with power_mw
+    taken at the annual PUE.
+    """
+    if climate < 0:
+        return location_energy_hours(price_row, utilization, load_profile)
+
+    cooling = cooling_index(cooling_type)
+    if load_profile != 'price-aware':
+        coincidence = get_cooling_table().summary[climate][cooling][2]
+        return flat_energy_hours(utilization, load_profile) * coincidence
+
+    pair = climate * len(COOLING_TYPES) + cooling
+    return float(get_cooling_table().price_aware_energy_hours([pair], [utilization])[0, 0])
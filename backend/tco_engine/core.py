@@ -0,0 +1,185 @@
+"""
+Typed Calculation API
+Dataclass inputs and outputs over the vectorized TCO model
+"""
+
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Sequence, Union
+
+import numpy as np
+
+from .pricing import get_pricing_catalog
+from .model import parse_oversubscription
+from .price_curves import LOAD_PROFILES, location_rate
+from .vectorized import calculate_tco_columns, pue_columns
+from .cooling import climate_row, cooling_index
+
+Number = Union[int, float, Sequence[float], np.ndarray]
+Label = Union[str, Sequence[str]]
+
+
+@dataclass(frozen=True)
+class ClusterConfig:
+    """Inputs to the TCO model
+
+    Every field accepts a scalar or a sequence/array. Sequences broadcast
+    against each other element-wise, so ClusterConfig(num_gpus=np.arange(1000, 200001, 1000))
+    prices 200 cluster sizes in one call. Unlike the HTTP API, numeric ranges
+    are not restricted here.
+    """
+    gpu_model: Label = 'h100-sxm'
+    num_gpus: Number = 1000
+    cooling_type: Label = 'air'
+    region: Label = 'us-east'
+    utilization: Number = 90
+    depreciation: Number = 4
+    storage_capacity: Number = 50
+    storage_vendor: Label = 'vast'
+    hot_percent: Number = 20
+    warm_percent: Number = 35
+    cold_percent: Number = 35
+    archive_percent: Number = 10
+    fabric_type: Label = 'infiniband'
+    oversubscription: Label = '1:1'
+    load_profile: Label = 'full'
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> 'ClusterConfig':
+        """Build a config from normalize_calculation_params() output
+
+        Args:
+            params: Normalized request parameters (camelCase keys)
+
+        Returns:
+            Equivalent ClusterConfig
+        """
+        return cls(
+            gpu_model=params['gpuModel'],
+            num_gpus=params['numGPUs'],
+            cooling_type=params['coolingType'],
+            region=params['region'],
+            utilization=params['utilization'],
+            depreciation=params['depreciation'],
+            storage_capacity=params['storageCapacity'],
+            storage_vendor=params['storageVendor'],
+            hot_percent=params['hotPercent'],
+            warm_percent=params['warmPercent'],
+            cold_percent=params['coldPercent'],
+            archive_percent=params['archivePercent'],
+            fabric_type=params['fabricType'],
+            oversubscription=params['oversubscription'],
+            load_profile=params['loadProfile'],
+        )
+
+    def is_scalar(self) -> bool:
+        """True when no field is a sequence or array"""
+        return all(np.ndim(getattr(self, f.name)) == 0 for f in fields(self))
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """Resolve pricing lookups into the float64 input columns of calculate_tco_columns()
+
+        Raises:
+            ValueError: If a GPU model or load profile is unknown
+        """
+        def lookup(labels, fn):
+            if np.ndim(labels) == 0:
+                return np.float64(fn(labels))
+            return np.array([fn(label) for label in labels], dtype=np.float64)
+
+        catalog = get_pricing_catalog()
+
+        def gpu(model):
+            if model not in catalog.gpu_specs:
+                raise ValueError(f'Invalid GPU model: {model}')
+            return catalog.gpu_specs[model]
+
+        def vendor(name):
+            return catalog.storage_vendors.get(name, catalog.storage_vendors['vast'])
+
+        def fabric(name):
+            return catalog.network_costs.get(name, catalog.network_costs['infiniband'])
+
+        def profile(name):
+            if name not in LOAD_PROFILES:
+                raise ValueError(f'Invalid load profile: {name}')
+            return LOAD_PROFILES.index(name)
+
+        def number(value):
+            return np.asarray(value, dtype=np.float64)
+
+        cols = {
+            'num_gpus': number(self.num_gpus),
+            'gpu_price': lookup(self.gpu_model, lambda m: gpu(m)['price']),
+            'gpu_power': lookup(self.gpu_model, lambda m: gpu(m)['power']),
+            'climate': lookup(self.region, climate_row),
+            'cooling': lookup(self.cooling_type, cooling_index),
+            'electricity_rate': lookup(self.region, lambda r: location_rate(r, catalog.electricity_rate(r))[0]),
+            'price_curve': lookup(self.region, lambda r: location_rate(r, catalog.electricity_rate(r))[1]),
+            'load_profile': lookup(self.load_profile, profile),
+            'utilization': number(self.utilization),
+            'depreciation': number(self.depreciation),
+            'storage_capacity': number(self.storage_capacity),
+            'hot_pct': number(self.hot_percent),
+            'warm_pct': number(self.warm_percent),
+            'cold_pct': number(self.cold_percent),
+            'archive_pct': number(self.archive_percent),
+            'hot_per_gb': lookup(self.storage_vendor, lambda v: vendor(v)['hot_per_gb']),
+            'warm_per_gb': lookup(self.storage_vendor, lambda v: vendor(v)['warm_per_gb']),
+            'cold_per_gb': lookup(self.storage_vendor, lambda v: vendor(v)['cold_per_gb']),
+            'archive_per_gb': lookup(self.storage_vendor, lambda v: vendor(v)['archive_per_gb']),
+            'storage_hardware_per_gb': np.float64(catalog.storage_hardware_per_gb),
+            'switch_price': lookup(self.fabric_type, lambda f: fabric(f)['switch']),
+            'cable_price': lookup(self.fabric_type, lambda f: fabric(f)['cable']),
+            'transceiver_price': lookup(self.fabric_type, lambda f: fabric(f)['transceiver']),
+            'per_gpu_bandwidth': lookup(self.fabric_type, lambda f: fabric(f)['per_gpu_bandwidth']),
+            'switch_radix': lookup(self.fabric_type, lambda f: fabric(f)['radix']),
+            'rails': lookup(self.fabric_type, lambda f: fabric(f)['rails']),
+            'oversubscription_ratio': lookup(self.oversubscription, lambda o: parse_oversubscription(str(o))),
+        }
+        cols.update(pue_columns(cols['climate'], cols['cooling']))
+        return cols
+
+
+@dataclass(frozen=True)
+class TCOResult:
+    """Outputs of the TCO model, as floats for scalar configs or arrays otherwise"""
+    gpu_capex: Any
+    storage_capex: Any
+    network_capex: Any
+    infrastructure_capex: Any
+    total_capex: Any
+    power_mw: Any
+    peak_power_mw: Any
+    pue: Any
+    energy_hours: Any
+    annual_power_cost: Any
+    storage_opex: Any
+    network_opex: Any
+    maintenance_opex: Any
+    annual_opex: Any
+    storage_gb_month: Any
+    network_bandwidth: Any
+    cost_per_hour: Any
+    tco_10year: Any
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of every output field"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+def calculate_tco(config: ClusterConfig) -> TCOResult:
+    """Price one configuration, or a whole array of them, with the TCO model
+
+    Args:
+        config: Scalar or array-valued cluster configuration
+
+    Returns:
+        TCOResult with float fields for scalar configs and broadcast arrays otherwise
+    """
+    outputs = calculate_tco_columns(config.to_columns())
+
+    if config.is_scalar():
+        return TCOResult(**{key: float(value) for key, value in outputs.items()})
+
+    shape = np.broadcast_shapes(*(np.shape(value) for value in outputs.values()))
+    return TCOResult(**{key: np.broadcast_to(value, shape) for key, value in outputs.items()})
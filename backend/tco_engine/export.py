@@ -0,0 +1,240 @@
+"""
+Columnar Export
+Batch and sweep results written chunk by chunk as CSV, NDJSON or Arrow IPC files
+"""
+
+import csv
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+
+from .model import INTEGER_PARAMS, PERCENT_PARAMS
+from .vectorized import build_calculation_columns, calculate_tco_columns
+from .sweep import SWEEP_RESULT_FIELDS, iter_sweep_chunks
+
+# Results are produced EXPORT_CHUNK_ROWS rows at a time and each chunk is
+# appended to a spool file before the next is computed, so memory is bounded
+# by one chunk whatever the size of the export. Every format carries the same
+# values: the request fields that vary, then the result columns rounded as in
+# /api/calculate (None decimals = whole dollars as int64).
+#
+# The Arrow path wraps each NumPy result column as an Arrow buffer without
+# copying it (numeric columns are contiguous and null-free), writing one record
+# batch per chunk to an IPC stream. pyarrow is only imported for Arrow exports.
+#
+# Finished files are content-addressed and immutable, so they can be served
+# with byte ranges and resumed; they expire after EXPORT_TTL_SECONDS.
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+EXPORT_CHUNK_ROWS = 65536
+EXPORT_MAX_CONFIGS = 100_000
+EXPORT_DIR = os.environ.get('EXPORT_DIR', '/app/data/exports')
+EXPORT_TTL_SECONDS = float(os.environ.get('EXPORT_TTL_SECONDS', 3600))
+
+# (column, output column, decimals) after the sweep fields
+EXPORT_RESULT_FIELDS = SWEEP_RESULT_FIELDS + (
+    ('storageGbMonth', 'storage_gb_month', 4),
+    ('networkBandwidth', 'network_bandwidth', 1),
+    ('capexGpu', 'gpu_capex', 2),
+    ('capexStorage', 'storage_capex', 2),
+    ('capexNetwork', 'network_capex', 2),
+    ('capexInfrastructure', 'infrastructure_capex', 2),
+    ('opexPower', 'annual_power_cost', 2),
+    ('opexStorage', 'storage_opex', 2),
+    ('opexNetwork', 'network_opex', 2),
+    ('opexMaintenance', 'maintenance_opex', 2),
+)
+
+def check_export_format(fmt):
+    """Validate an export format name
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'format must be one of: {", ".join(EXPORT_FORMATS)}')
+
+def arrow_available():
+    """Whether pyarrow is installed for Arrow IPC exports"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+def label_column(field, values):
+    """Typed column for a request field: int64, float64 or strings"""
+    if field in dict(INTEGER_PARAMS):
+        return np.asarray(values, dtype=np.int64)
+    if field in dict(PERCENT_PARAMS):
+        return np.asarray(values, dtype=np.float64)
+    return np.asarray([str(value) for value in values], dtype=object)
+
+def round_column(values, decimals):
+    """np.round, with near-tie values rounded by round() so columns match /api/calculate exactly"""
+    rounded = np.round(values, decimals)
+    scaled = values * 10.0 ** decimals
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if len(ties):
+        rounded[ties] = [round(value, decimals) for value in values[ties].tolist()]
+    return rounded
+
+def export_columns(labels, outputs):
+    """Ordered {column: array} for one chunk of labels and calculate_tco_columns() outputs"""
+    n = len(next(iter(labels.values())))
+    columns = {field: label_column(field, values) for field, values in labels.items()}
+    for key, column, decimals in EXPORT_RESULT_FIELDS:
+        values = np.broadcast_to(outputs[column], (n,))
+        columns[key] = np.rint(values).astype(np.int64) if decimals is None else round_column(values, decimals)
+    return columns
+
+def iter_batch_export_chunks(params_list, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield export columns for normalized configurations, chunk_rows at a time"""
+    fields = list(params_list[0])
+    for start in range(0, len(params_list), chunk_rows):
+        chunk = params_list[start:start + chunk_rows]
+        outputs = calculate_tco_columns(build_calculation_columns(chunk))
+        yield export_columns({field: [p[field] for p in chunk] for field in fields}, outputs)
+
+def iter_sweep_export_chunks(base_params, axes, total, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield export columns for a planned sweep grid, chunk_rows points at a time"""
+    for labels, outputs in iter_sweep_chunks(base_params, axes, total, chunk_rows):
+        yield export_columns(labels, outputs)
+
+def write_csv(chunks, f):
+    rows = 0
+    for i, columns in enumerate(chunks):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        if i == 0:
+            writer.writerow(columns)
+        writer.writerows(zip(*(values.tolist() for values in columns.values())))
+        f.write(buffer.getvalue().encode())
+        rows += len(next(iter(columns.values())))
+    return rows
+
+def write_ndjson(chunks, f):
+    rows = 0
+    for columns in chunks:
+        names = list(columns)
+        lines = [json.dumps(dict(zip(names, row)))
+                 for row in zip(*(values.tolist() for values in columns.values()))]
+        f.write(('\n'.join(lines) + '\n').encode())
+        rows += len(lines)
+    return rows
+
+def write_arrow(chunks, f):
+    import pyarrow as pa
+
+    writer = None
+    rows = 0
+    for columns in chunks:
+        arrays = []
+        for values in columns.values():
+            if values.dtype == object:
+                arrays.append(pa.array(values.tolist(), type=pa.string()))
+            else:
+                arrays.append(pa.array(np.ascontiguousarray(values)))  # wraps the buffer, no copy
+        batch = pa.RecordBatch.from_arrays(arrays, names=list(columns))
+        if writer is None:
+            writer = pa.ipc.new_stream(f, batch.schema)
+        writer.write_batch(batch)
+        rows += batch.num_rows
+    if writer is not None:
+        writer.close()
+    return rows
+
+EXPORT_WRITERS = {'csv': write_csv, 'ndjson': write_ndjson, 'arrow': write_arrow}
+
+def write_export(chunks, fmt, f):
+    """Write export column chunks to a binary file object, returning the row count"""
+    check_export_format(fmt)
+    return EXPORT_WRITERS[fmt](chunks, f)
+
+def export_key(payload, fmt, owner, version):
+    """Content address of an export: request payload, format, owner and pricing version"""
+    canonical = json.dumps([payload, fmt, owner, version], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+class ExportStore:
+    """Spool directory of finished export files with JSON metadata sidecars
+
+    Files and metadata are written under temporary names and renamed into
+    place, so readers (in any worker process) only ever see complete exports.
+    """
+
+    def __init__(self, directory=EXPORT_DIR, ttl_seconds=EXPORT_TTL_SECONDS):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, export_id):
+        if not (export_id.isascii() and export_id.isalnum()):
+            raise ValueError('Invalid export id')
+        base = os.path.join(self.directory, export_id)
+        return base + '.data', base + '.json'
+
+    def get(self, export_id):
+        """Metadata (with 'path') of a finished, unexpired export, or None"""
+        try:
+            data_path, meta_path = self._paths(export_id)
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta['expiresAt'] <= time.time() or not os.path.exists(data_path):
+            return None
+        return {**meta, 'path': data_path}
+
+    def create(self, export_id, fmt, chunks, owner, **extra):
+        """Write chunks as a new export file and return its metadata"""
+        check_export_format(fmt)
+        self.purge()
+        data_path, meta_path = self._paths(export_id)
+        suffix = f'.{uuid.uuid4().hex}.tmp'
+
+        started = time.perf_counter()
+        try:
+            with open(data_path + suffix, 'wb') as f:
+                rows = write_export(chunks, fmt, f)
+            os.replace(data_path + suffix, data_path)
+        finally:
+            if os.path.exists(data_path + suffix):
+                os.remove(data_path + suffix)
+
+        meta = {
+            'exportId': export_id,
+            'format': fmt,
+            'owner': owner,
+            'rows': rows,
+            'bytes': os.path.getsize(data_path),
+            'elapsedMs': round((time.perf_counter() - started) * 1000, 2),
+            'expiresAt': time.time() + self.ttl_seconds,
+            **extra,
+        }
+        with open(meta_path + suffix, 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
+        return {**meta, 'path': data_path}
+
+    def purge(self):
+        """Delete expired exports and abandoned temporary files"""
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith('.json'):
+                    with open(path) as f:
+                        expired = json.load(f)['expiresAt'] <= now
+                    if expired:
+                        os.remove(path)
+                        os.remove(path[:-len('.json')] + '.data')
+                elif name.endswith('.tmp') and os.path.getmtime(path) < now - self.ttl_seconds:
+                    os.remove(path)
+            except (OSError, ValueError, KeyError):
+                continue
@@ -0,0 +1,109 @@
+"""
+Incremental Recalculation
+Re-evaluate only the model components a parameter change touches
+"""
+
+import threading
+
+from .model import MODEL_COMPONENTS, normalize_calculation_params
+from .pricing import get_pricing_catalog
+from .cache import ResultCache, calculation_cache_key
+
+# Every evaluated configuration is stored as its component sub-results under a
+# result id (the calculation cache key of its parameters). A later request sends
+# that id plus the fields that changed; components reading none of those fields
+# and depending on no recomputed component are reused as-is. Dragging the
+# hotPercent slider, for example, re-runs storage, maintenance and the rollup
+# while GPU, power, network and infrastructure come from the stored result.
+#
+# The store is a ResultCache keyed on the pricing fingerprint, so a pricing or
+# price-curve change drops every stored result and clients resend a full config.
+# Each entry also keeps the catalog snapshot it was priced from, and nothing is
+# reused across snapshots.
+INCREMENTAL_MAX_RESULTS = 20000
+INCREMENTAL_TTL_SECONDS = 1800
+
+COMPONENT_FUNCTIONS = {name: function for name, _, _, function in MODEL_COMPONENTS}
+
+def dirty_components(changed_fields):
+    """Components that must be re-evaluated when changed_fields differ, in evaluation order"""
+    dirty = set()
+    for name, fields, deps, _ in MODEL_COMPONENTS:
+        if changed_fields.intersection(fields) or dirty.intersection(deps):
+            dirty.add(name)
+    return [name for name, _, _, _ in MODEL_COMPONENTS if name in dirty]
+
+class IncrementalCalculator:
+    """Component-level result store with delta recalculation"""
+
+    def __init__(self, version_fn=None, version_check_interval=0,
+                 max_results=INCREMENTAL_MAX_RESULTS, ttl_seconds=INCREMENTAL_TTL_SECONDS):
+        self.store = ResultCache(max_results, ttl_seconds, version_fn, version_check_interval)
+        self._lock = threading.Lock()
+        self.recalculations = 0
+        self.components_evaluated = 0
+        self.components_reused = 0
+
+    def _record(self, evaluated, reused):
+        with self._lock:
+            self.recalculations += 1
+            self.components_evaluated += evaluated
+            self.components_reused += reused
+
+    def evaluate(self, params, previous=None):
+        """Evaluate params, reusing previous = (params, nodes, catalog) where fields did not change
+
+        Returns:
+            (result id, results, recomputed component names)
+        """
+        catalog = get_pricing_catalog()
+        if previous is None or previous[2] is not catalog:
+            changed = set(params)
+            nodes = {}
+        else:
+            previous_params, previous_nodes, _ = previous
+            changed = {field for field in params if params[field] != previous_params.get(field)}
+            nodes = dict(previous_nodes)
+
+        recomputed = dirty_components(changed)
+        for name in recomputed:
+            nodes[name] = COMPONENT_FUNCTIONS[name](params, nodes, catalog)
+
+        result_id = calculation_cache_key(params)
+        self.store.put(result_id, (params, nodes, catalog))
+        self._record(len(recomputed), len(MODEL_COMPONENTS) - len(recomputed))
+        return result_id, nodes['rollup'], recomputed
+
+    def recalculate(self, result_id, delta):
+        """Apply a field delta to a stored result
+
+        Returns:
+            (result id, results, recomputed component names), or None when
+            result_id is unknown or expired
+
+        Raises:
+            ValueError: If the delta is malformed or the new parameters invalid
+        """
+        if not isinstance(delta, dict):
+            raise ValueError('delta must be an object')
+        previous = self.store.get(result_id)
+        if previous is None:
+            return None
+
+        unknown = set(delta) - set(previous[0])
+        if unknown:
+            raise ValueError(f'Unknown field {sorted(unknown)[0]}')
+        params = normalize_calculation_params({**previous[0], **delta})
+        return self.evaluate(params, previous)
+
+    def stats(self):
+        stats = self.store.stats()
+        with self._lock:
+            total = self.components_evaluated + self.components_reused
+            stats.update({
+                'recalculations': self.recalculations,
+                'componentsEvaluated': self.components_evaluated,
+                'componentsReused': self.components_reused,
+                'reuseRate': round(self.components_reused / total, 4) if total else 0.0,
+            })
+        return stats
@@ -0,0 +1,61 @@
+"""
+JavaScript Number Semantics
+The few places where the dashboard's TypeScript math and Python arithmetic disagree
+"""
+
+import math
+import re
+from decimal import Decimal, ROUND_HALF_UP
+
+# The planning models (service_tiers, storage_planning, service_mix) are ports
+# of dashboard code and must reproduce its numbers exactly. Doubles are doubles
+# in both languages, so the ports keep each expression's operation order and
+# only route these operations through here: Math.round rounds halves up where
+# round() rounds them to even, toFixed rounds the exact binary value half away
+# from zero, division by zero gives Infinity/NaN instead of raising, and
+# parseInt/parseFloat read the longest numeric prefix of a string.
+
+def js_round(x):
+    """Math.round: nearest integer, halves toward +Infinity"""
+    if not math.isfinite(x):
+        return x
+    floor = math.floor(x)
+    return floor + 1 if x - floor >= 0.5 else floor
+
+def js_to_fixed(x, digits):
+    """Number.prototype.toFixed for |x| < 1e21"""
+    if not math.isfinite(x):
+        return 'NaN' if math.isnan(x) else ('Infinity' if x > 0 else '-Infinity')
+    # -0 prints unsigned, while negatives that round to zero keep their sign
+    return str(Decimal(float(x) if x else 0.0).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+def js_div(a, b):
+    """a / b with IEEE results for a zero divisor"""
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+_INT_PREFIX = re.compile(r'\s*([+-]?\d+)')
+_FLOAT_PREFIX = re.compile(r'\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+
+def js_parse_int(text):
+    """parseInt(text) in base 10"""
+    match = _INT_PREFIX.match(text)
+    return int(match.group(1)) if match else math.nan
+
+def js_parse_float(text):
+    """parseFloat(text)"""
+    match = _FLOAT_PREFIX.match(text)
+    return float(match.group(1)) if match else math.nan
+
+def json_safe(value):
+    """Copy of a result with non-finite numbers as None, as JSON.stringify writes them"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    return value
@@ -0,0 +1,127 @@
+"""
+Location Cost Index
+Ranked, pre-serialized location costs for every GPU model and cooling option
+"""
+
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .pricing import get_pricing_catalog
+from .model import normalize_calculation_params
+from .vectorized import build_calculation_columns, calculate_tco_columns
+
+# Annual power cost and cost per GPU hour for every location x GPU model x
+# cooling option at a few reference cluster sizes. The index is built once,
+# rebuilt whenever the pricing tables change, and every slice is stored
+# pre-serialized so requests are a dictionary lookup.
+LOCATION_INDEX_REFERENCE_SIZES = (1000, 10000, 50000, 100000)
+
+def index_locations(catalog):
+    """(key, display name, rate) for every priced location, legacy aliases excluded"""
+    locations = [(key, key, rate) for key, rate in catalog.electricity_rates.items()
+                 if key not in catalog.legacy_location_keys]
+    locations += [(key, region['name'], region['rate']) for key, region in catalog.region_rates.items()
+                  if key not in catalog.electricity_rates]
+    return locations
+
+def build_location_cost_index():
+    """Compute every ranked slice of the index in one vectorized pass"""
+    catalog = get_pricing_catalog()
+    defaults = normalize_calculation_params({})
+    locations = index_locations(catalog)
+
+    slice_keys = []
+    rows = []
+    for gpu_model, spec in catalog.gpu_specs.items():
+        for cooling_type in spec['cooling_options']:
+            for size in LOCATION_INDEX_REFERENCE_SIZES:
+                slice_keys.append((gpu_model, cooling_type, size))
+                rows.extend({**defaults, 'gpuModel': gpu_model, 'coolingType': cooling_type,
+                             'numGPUs': size, 'region': key} for key, _, _ in locations)
+
+    cols = build_calculation_columns(rows)
+    outputs = calculate_tco_columns(cols)
+    rates = cols['electricity_rate'].reshape(len(slice_keys), len(locations))
+    pues = cols['pue'].reshape(len(slice_keys), len(locations))
+    power_costs = outputs['annual_power_cost'].reshape(len(slice_keys), len(locations))
+    costs_per_hour = outputs['cost_per_hour'].reshape(len(slice_keys), len(locations))
+
+    slices = {}
+    for i, key in enumerate(slice_keys):
+        order = np.argsort(costs_per_hour[i], kind='stable')
+        slices[key] = [{
+            'rank': rank + 1,
+            'location': locations[j][0],
+            'name': locations[j][1],
+            'ratePerKwh': round(rates[i, j].item(), 6),
+            'pue': round(pues[i, j].item(), 3),
+            'annualPowerCost': round(power_costs[i, j].item()),
+            'costPerHour': round(costs_per_hour[i, j].item(), 4)
+        } for rank, j in enumerate(order.tolist())]
+
+    return slices, defaults
+
+class LocationCostIndex:
+    """Pre-serialized location ranking, swapped atomically when pricing changes"""
+
+    def __init__(self, version_fn, version_check_interval=0):
+        self.version_fn = version_fn
+        self.version_check_interval = version_check_interval
+        self._build_lock = threading.Lock()
+        self._checked_at = 0.0
+        self._snapshot = None  # (version, generated_at, {slice key: (etag, body)})
+        self.builds = 0
+
+    def refresh(self, force=False):
+        """Rebuild the index if pricing changed (or unconditionally with force)"""
+        with self._build_lock:
+            version = self.version_fn()
+            if not force and self._snapshot and self._snapshot[0] == version:
+                return
+            slices, defaults = build_location_cost_index()
+            generated_at = datetime.now(timezone.utc).isoformat()
+
+            bodies = {}
+            full = {}
+            for (gpu_model, cooling_type, size), ranking in slices.items():
+                payload = {
+                    'version': version,
+                    'generatedAt': generated_at,
+                    'gpuModel': gpu_model,
+                    'coolingType': cooling_type,
+                    'numGPUs': size,
+                    'locations': ranking
+                }
+                bodies[(gpu_model, cooling_type, size)] = json.dumps(payload)
+                full.setdefault(gpu_model, {}).setdefault(cooling_type, {})[str(size)] = ranking
+            bodies[None] = json.dumps({
+                'version': version,
+                'generatedAt': generated_at,
+                'referenceSizes': list(LOCATION_INDEX_REFERENCE_SIZES),
+                'assumptions': {k: v for k, v in defaults.items()
+                                if k not in ('gpuModel', 'coolingType', 'numGPUs', 'region')},
+                'index': full
+            })
+
+            entries = {}
+            for key, body in bodies.items():
+                etag = hashlib.sha256(body.encode()).hexdigest()[:32]
+                entries[key] = (f'"{etag}"', body)
+
+            self._snapshot = (version, generated_at, entries)
+            self._checked_at = time.monotonic()
+            self.builds += 1
+
+    def get(self, key):
+        """Return (etag, body) for a slice key, or None if the slice does not exist"""
+        now = time.monotonic()
+        if self._snapshot is None or now - self._checked_at >= self.version_check_interval:
+            self._checked_at = now
+            if self._snapshot is None or self.version_fn() != self._snapshot[0]:
+                self.refresh()
+        return self._snapshot[2].get(key)
@@ -0,0 +1,286 @@
+"""
+TCO Model
+Request normalization and the scalar GPU cluster TCO formulas
+"""
+
+import math
+
+from .pricing import get_pricing_catalog
+from .topology import TRANSCEIVERS_PER_LINK, size_fat_tree
+from .price_curves import LOAD_PROFILES, location_rate
+from .cooling import location_pue, site_energy_hours
+
+# (request field, default) pairs coerced by normalize_calculation_params()
+INTEGER_PARAMS = (
+    ('numGPUs', 1000),
+    ('utilization', 90),
+    ('depreciation', 4),
+    ('storageCapacity', 50),
+)
+PERCENT_PARAMS = (
+    ('hotPercent', 20),
+    ('warmPercent', 35),
+    ('coldPercent', 35),
+    ('archivePercent', 10),
+)
+# Request fields that name catalog entries and must be strings
+CATEGORICAL_PARAMS = ('gpuModel', 'coolingType', 'region', 'storageVendor', 'fabricType', 'loadProfile')
+
+def normalize_calculation_params(data):
+    """Apply defaults and coerce a calculation request into typed parameters
+
+    Raises ValueError with a client-safe message when the input is invalid.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Configuration must be an object')
+
+    params = {
+        'gpuModel': data.get('gpuModel', 'h100-sxm'),
+        'coolingType': data.get('coolingType', 'air'),
+        'region': data.get('region', 'us-east'),
+        'storageVendor': data.get('storageVendor', 'vast'),
+        'fabricType': data.get('fabricType', 'infiniband'),
+        'oversubscription': str(data.get('oversubscription', '1:1')),
+        'loadProfile': data.get('loadProfile', 'full'),
+    }
+
+    for field in CATEGORICAL_PARAMS:
+        if not isinstance(params[field], str):
+            raise ValueError(f'{field} must be a string')
+
+    if params['gpuModel'] not in get_pricing_catalog().gpu_specs:
+        raise ValueError('Invalid GPU model')
+
+    for field, default in INTEGER_PARAMS:
+        try:
+            params[field] = int(data.get(field, default))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f'{field} must be an integer')
+
+    for field, default in PERCENT_PARAMS:
+        try:
+            params[field] = float(data.get(field, default))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f'{field} must be a number')
+        if not math.isfinite(params[field]):
+            raise ValueError(f'{field} must be a finite number')
+
+    if params['numGPUs'] < 1000 or params['numGPUs'] > 200000:
+        raise ValueError('GPU count must be between 1000 and 200000')
+    if params['utilization'] <= 0:
+        raise ValueError('utilization must be greater than 0')
+    if params['depreciation'] <= 0:
+        raise ValueError('depreciation must be greater than 0')
+
+    try:
+        ratio = parse_oversubscription(params['oversubscription'])
+    except (ValueError, IndexError, ZeroDivisionError):
+        raise ValueError('oversubscription must look like "1:1"')
+    if not (ratio > 0 and math.isfinite(ratio)):
+        raise ValueError('oversubscription must look like "1:1"')
+
+    if params['loadProfile'] not in LOAD_PROFILES:
+        raise ValueError(f'loadProfile must be one of: {", ".join(LOAD_PROFILES)}')
+
+    return params
+
+# The scalar model is a dependency graph of components. Each component reads
+# some request fields and the outputs of components before it, and returns a
+# dict of sub-results, priced from one catalog snapshot. calculate_results()
+# evaluates every component in order; incremental.IncrementalCalculator
+# re-evaluates only the components whose fields or dependencies changed.
+def gpu_component(params, nodes, catalog):
+    """GPU capex"""
+    return {'capex': catalog.gpu_specs[params['gpuModel']]['price'] * params['numGPUs']}
+
+def infrastructure_component(params, nodes, catalog):
+    """Facility capex, 15% of GPU capex"""
+    return {'capex': nodes['gpu']['capex'] * 0.15}
+
+def power_component(params, nodes, catalog):
+    """Average and peak facility draw and annual power cost"""
+    spec = catalog.gpu_specs[params['gpuModel']]
+    region_rate, price_curve = location_rate(params['region'], catalog.electricity_rate(params['region']))
+
+    # Annual PUE for average draw, the hottest hour's for peak
+    pue_factor, peak_pue, climate = location_pue(params['region'], params['coolingType'])
+    total_power_mw = (spec['power'] * params['numGPUs'] * pue_factor) / 1_000_000
+    peak_power_mw = (spec['power'] * params['numGPUs'] * peak_pue) / 1_000_000
+
+    # Energy hours weigh the load profile against hourly PUE and prices
+    energy_hours = site_energy_hours(
+        price_curve, climate, params['coolingType'], params['utilization'], params['loadProfile'])
+
+    return {
+        'power_mw': total_power_mw,
+        'peak_power_mw': peak_power_mw,
+        'pue': pue_factor,
+        'energy_hours': energy_hours,
+        'cost': total_power_mw * 1000 * region_rate * energy_hours,
+    }
+
+def storage_component(params, nodes, catalog):
+    """Storage capex and opex (see calculate_storage_costs)"""
+    return calculate_storage_costs(
+        params['storageCapacity'],
+        params['storageVendor'],
+        params['hotPercent'],
+        params['warmPercent'],
+        params['coldPercent'],
+        params['archivePercent'],
+        catalog
+    )
+
+def network_component(params, nodes, catalog):
+    """Fabric capex and opex (see calculate_network_costs)"""
+    return calculate_network_costs(params['numGPUs'], params['fabricType'], params['oversubscription'], catalog)
+
+def maintenance_component(params, nodes, catalog):
+    """Total capex and the 3% of it spent on maintenance each year"""
+    total_capex = (
+        nodes['gpu']['capex'] +
+        nodes['storage']['capex'] +
+        nodes['network']['capex'] +
+        nodes['infrastructure']['capex']
+    )
+    return {'total_capex': total_capex, 'opex': total_capex * 0.03}
+
+def rollup_component(params, nodes, catalog):
+    """Annual opex, cost per GPU hour and 10-year TCO, shaped as the API result"""
+    gpu, power, storage, network, maintenance = (
+        nodes['gpu'], nodes['power'], nodes['storage'], nodes['network'], nodes['maintenance'])
+    total_capex = maintenance['total_capex']
+
+    annual_opex = (
+        power['cost'] +
+        storage['opex'] +
+        network['opex'] +
+        maintenance['opex']
+    )
+
+    # Cost per GPU hour
+    annual_gpu_hours = params['numGPUs'] * 8760 * (params['utilization'] / 100)
+    cost_per_hour = (total_capex / params['depreciation'] + annual_opex) / annual_gpu_hours
+
+    # 10-year TCO
+    tco_10year = total_capex + (annual_opex * 10)
+
+    return {
+        'totalCapex': round(total_capex),
+        'annualOpex': round(annual_opex),
+        'costPerHour': round(cost_per_hour, 2),
+        'totalPowerMW': round(power['power_mw'], 1),
+        'peakPowerMW': round(power['peak_power_mw'], 1),
+        'pueValue': round(power['pue'], 3),
+        'storageGbMonth': round(storage['gb_month'], 4),
+        'networkBandwidth': round(network['bandwidth'], 1),
+        'tco10year': round(tco_10year),
+        'breakdown': {
+            'capex': {
+                'gpu': gpu['capex'],
+                'storage': storage['capex'],
+                'network': network['capex'],
+                'infrastructure': nodes['infrastructure']['capex']
+            },
+            'opex': {
+                'power': power['cost'],
+                'storage': storage['opex'],
+                'network': network['opex'],
+                'maintenance': maintenance['opex']
+            }
+        }
+    }
+
+# (component, request fields read, components read, function), in evaluation order
+MODEL_COMPONENTS = (
+    ('gpu', ('gpuModel', 'numGPUs'), (), gpu_component),
+    ('infrastructure', (), ('gpu',), infrastructure_component),
+    ('power', ('gpuModel', 'numGPUs', 'region', 'coolingType', 'utilization', 'loadProfile'), (), power_component),
+    ('storage', ('storageCapacity', 'storageVendor', 'hotPercent', 'warmPercent', 'coldPercent', 'archivePercent'),
+     (), storage_component),
+    ('network', ('numGPUs', 'fabricType', 'oversubscription'), (), network_component),
+    ('maintenance', (), ('gpu', 'infrastructure', 'storage', 'network'), maintenance_component),
+    ('rollup', ('numGPUs', 'utilization', 'depreciation'),
+     ('gpu', 'infrastructure', 'power', 'storage', 'network', 'maintenance'), rollup_component),
+)
+
+def evaluate_components(params, catalog=None):
+    """Evaluate every model component, returning {component: sub-results}"""
+    catalog = catalog or get_pricing_catalog()
+    nodes = {}
+    for name, _, _, function in MODEL_COMPONENTS:
+        nodes[name] = function(params, nodes, catalog)
+    return nodes
+
+def calculate_results(params):
+    """Run the TCO model for one set of normalized parameters"""
+    return evaluate_components(params)['rollup']
+
+def calculate_storage_costs(capacity_pb, vendor, hot_pct, warm_pct, cold_pct, archive_pct, catalog=None):
+    """Calculate storage costs (hidden implementation)"""
+    catalog = catalog or get_pricing_catalog()
+    vendor_rates = catalog.storage_vendors.get(vendor, catalog.storage_vendors['vast'])
+    
+    capacity_gb = capacity_pb * 1_000_000
+    
+    # Calculate tier capacities
+    hot_gb = capacity_gb * (hot_pct / 100)
+    warm_gb = capacity_gb * (warm_pct / 100)
+    cold_gb = capacity_gb * (cold_pct / 100)
+    archive_gb = capacity_gb * (archive_pct / 100)
+    
+    # Monthly costs
+    monthly_cost = (
+        hot_gb * vendor_rates['hot_per_gb'] +
+        warm_gb * vendor_rates['warm_per_gb'] +
+        cold_gb * vendor_rates['cold_per_gb'] +
+        archive_gb * vendor_rates['archive_per_gb']
+    )
+    
+    # CAPEX (storage hardware)
+    capex = capacity_gb * catalog.storage_hardware_per_gb  # hardware cost, vendor independent
+    
+    return {
+        'capex': capex,
+        'opex': monthly_cost * 12,  # Annual
+        'gb_month': monthly_cost / capacity_gb if capacity_gb > 0 else 0
+    }
+
+def parse_oversubscription(oversubscription):
+    """Parse an 'a:b' oversubscription string into the b/a port ratio"""
+    ratio = 1.0
+    if ':' in oversubscription:
+        parts = oversubscription.split(':')
+        ratio = float(parts[1]) / float(parts[0]) if float(parts[0]) > 0 else 1.0
+    return ratio
+
+def network_topology(num_gpus, fabric_type, oversubscription, catalog=None):
+    """Size the fat-tree fabric for a cluster (see topology.size_fat_tree)"""
+    catalog = catalog or get_pricing_catalog()
+    fabric = catalog.network_costs.get(fabric_type, catalog.network_costs['infiniband'])
+    ratio = parse_oversubscription(oversubscription)
+    return size_fat_tree(num_gpus, fabric['radix'], ratio, fabric['rails'])
+
+def calculate_network_costs(num_gpus, fabric_type, oversubscription, catalog=None):
+    """Calculate network costs (hidden implementation)"""
+    catalog = catalog or get_pricing_catalog()
+    fabric = catalog.network_costs.get(fabric_type, catalog.network_costs['infiniband'])
+    
+    # Size every tier of the Clos fabric
+    topology = network_topology(num_gpus, fabric_type, oversubscription, catalog)
+    
+    # Calculate costs: one cable and two transceivers per link at every tier
+    switch_cost = topology.total_switches * fabric['switch']
+    cable_cost = topology.total_links * fabric['cable']
+    transceiver_cost = topology.total_links * TRANSCEIVERS_PER_LINK * fabric['transceiver']
+    
+    total_capex = switch_cost + cable_cost + transceiver_cost
+    
+    # Calculate bandwidth
+    bandwidth_tbps = (num_gpus * fabric['per_gpu_bandwidth']) / 1000
+    
+    return {
+        'capex': total_capex,
+        'opex': total_capex * 0.05,  # 5% annual maintenance
+        'bandwidth': bandwidth_tbps
+    }
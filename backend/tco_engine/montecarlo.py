@@ -0,0 +1,194 @@
+"""
+Monte Carlo Analysis
+TCO percentiles under uncertain GPU price, electricity rate, utilization and PUE
+"""
+
+import math
+import os
+
+import numpy as np
+
+from .model import normalize_calculation_params
+from .vectorized import build_calculation_columns, calculate_tco_columns
+
+# Uncertain inputs are sampled as whole columns and pushed through
+# calculate_tco_columns(). Samples are split into fixed chunks with independent
+# seeds, so a run gives identical percentiles whether the chunks execute inline
+# or across the process pool. The pool uses forkserver rather than fork, so a
+# worker never inherits a lock held by another thread of the calling process.
+# Its workers re-import __main__, so the API hands runs that would use it to
+# the job queue, whose job processes are fresh interpreters (jobs.py).
+MONTE_CARLO_DEFAULT_SAMPLES = 100_000
+MONTE_CARLO_MAX_SAMPLES = 10_000_000
+MONTE_CARLO_CHUNK = 250_000
+MONTE_CARLO_PARALLEL_THRESHOLD = 1_000_000
+MONTE_CARLO_WORKERS = int(os.environ.get('MONTE_CARLO_WORKERS', min(os.cpu_count() or 1, 8)))
+
+# Sampled input -> (input column, lower clip, upper clip)
+MONTE_CARLO_INPUTS = {
+    'gpuPrice': ('gpu_price', 0.0, None),
+    'electricityRate': ('electricity_rate', 0.0, None),
+    'utilization': ('utilization', 1.0, 100.0),
+    'pue': ('pue', 1.0, None),
+}
+
+# (response key, output column, decimals)
+MONTE_CARLO_OUTPUTS = (
+    ('totalCapex', 'total_capex', None),
+    ('annualOpex', 'annual_opex', None),
+    ('costPerHour', 'cost_per_hour', 4),
+    ('tco10year', 'tco_10year', None),
+)
+
+_monte_carlo_pool = None
+
+def parse_distribution(name, spec, base_value):
+    """Validate a distribution spec, filling its centre from the base configuration
+
+    Supported: {"type": "normal", "mean", "std"}, {"type": "uniform", "low", "high"},
+    {"type": "triangular", "low", "mode", "high"}.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f'{name} distribution must be an object')
+
+    kind = spec.get('type', 'normal')
+    try:
+        if kind == 'normal':
+            dist = {'type': kind, 'mean': float(spec.get('mean', base_value)), 'std': float(spec['std'])}
+        elif kind == 'uniform':
+            dist = {'type': kind, 'low': float(spec['low']), 'high': float(spec['high'])}
+        elif kind == 'triangular':
+            dist = {'type': kind, 'low': float(spec['low']),
+                    'mode': float(spec.get('mode', base_value)), 'high': float(spec['high'])}
+        else:
+            raise ValueError(f'{name} distribution type must be normal, uniform or triangular')
+    except (KeyError, TypeError):
+        raise ValueError(f'{name} distribution is missing numeric parameters')
+
+    if not all(math.isfinite(value) for key, value in dist.items() if key != 'type'):
+        raise ValueError(f'{name} distribution parameters must be finite numbers')
+    if kind == 'normal' and dist['std'] < 0:
+        raise ValueError(f'{name} std must be >= 0')
+    if kind == 'uniform' and dist['high'] < dist['low']:
+        raise ValueError(f'{name} high must be >= low')
+    if kind == 'triangular' and (not dist['low'] <= dist['mode'] <= dist['high'] or dist['low'] == dist['high']):
+        raise ValueError(f'{name} needs low <= mode <= high with low < high')
+
+    return dist
+
+def parse_distributions(params, specs):
+    """Validate a {input: spec} mapping against a normalized base configuration
+
+    Raises:
+        ValueError: If specs is empty, names an unknown input, or a spec is invalid
+    """
+    if not isinstance(specs, dict) or not specs:
+        raise ValueError('distributions must be a non-empty object')
+
+    base_cols = build_calculation_columns([params])
+    distributions = {}
+    for name, spec in specs.items():
+        if name not in MONTE_CARLO_INPUTS:
+            raise ValueError(f'Unknown distribution {name}; expected one of: {", ".join(MONTE_CARLO_INPUTS)}')
+        base_value = base_cols[MONTE_CARLO_INPUTS[name][0]][0].item()
+        distributions[name] = parse_distribution(name, spec, base_value)
+    return distributions
+
+def parse_monte_carlo_request(data):
+    """Validate a Monte Carlo request body
+
+    Returns:
+        (params, distributions, samples, seed)
+
+    Raises:
+        ValueError: If the configuration, distributions, samples or seed are invalid
+    """
+    params = normalize_calculation_params(data.get('config') or {})
+    distributions = parse_distributions(params, data.get('distributions'))
+
+    try:
+        samples = int(data.get('samples', MONTE_CARLO_DEFAULT_SAMPLES))
+        seed = data.get('seed')
+        if seed is None:
+            seed = new_monte_carlo_seed()
+        elif isinstance(seed, bool) or int(seed) != seed:
+            raise ValueError
+        else:
+            seed = int(seed)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError('samples and seed must be integers')
+    if samples < 1 or samples > MONTE_CARLO_MAX_SAMPLES:
+        raise ValueError(f'samples must be between 1 and {MONTE_CARLO_MAX_SAMPLES}')
+    if seed < 0:
+        raise ValueError('seed must be >= 0')
+    return params, distributions, samples, seed
+
+def new_monte_carlo_seed():
+    """Fresh entropy for runs that did not request a seed"""
+    return np.random.SeedSequence().entropy
+
+def sample_distribution(rng, dist, n):
+    """Draw n samples for a distribution returned by parse_distribution()"""
+    if dist['type'] == 'normal':
+        return rng.normal(dist['mean'], dist['std'], n)
+    if dist['type'] == 'uniform':
+        return rng.uniform(dist['low'], dist['high'], n)
+    return rng.triangular(dist['low'], dist['mode'], dist['high'], n)
+
+def run_monte_carlo_chunk(base_cols, distributions, seed, n):
+    """Sample one chunk and return its output columns for MONTE_CARLO_OUTPUTS"""
+    rng = np.random.default_rng(seed)
+    cols = dict(base_cols)
+    for name, dist in distributions.items():
+        column, low, high = MONTE_CARLO_INPUTS[name]
+        cols[column] = np.clip(sample_distribution(rng, dist, n), low, high)
+
+    outputs = calculate_tco_columns(cols)
+    return {column: np.broadcast_to(outputs[column], (n,)) for _, column, _ in MONTE_CARLO_OUTPUTS}
+
+def get_monte_carlo_pool():
+    """Lazily create the shared process pool for large Monte Carlo runs"""
+    global _monte_carlo_pool
+    if _monte_carlo_pool is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        _monte_carlo_pool = ProcessPoolExecutor(max_workers=MONTE_CARLO_WORKERS,
+                                                mp_context=multiprocessing.get_context('forkserver'))
+    return _monte_carlo_pool
+
+def run_monte_carlo(params, distributions, samples, seed, parallel=None, progress=None):
+    """Run a Monte Carlo TCO analysis and summarize the output percentiles
+
+    parallel=None uses the process pool for runs of MONTE_CARLO_PARALLEL_THRESHOLD
+    samples or more; False always runs inline. progress(samples done, samples,
+    chunk output columns) is called after each chunk, in order, when given.
+    """
+    base_cols = build_calculation_columns([params])
+    chunk_sizes = [min(MONTE_CARLO_CHUNK, samples - start) for start in range(0, samples, MONTE_CARLO_CHUNK)]
+    chunk_seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+    if parallel is None:
+        parallel = samples >= MONTE_CARLO_PARALLEL_THRESHOLD and MONTE_CARLO_WORKERS > 1
+    if parallel:
+        pool = get_monte_carlo_pool()
+        futures = [pool.submit(run_monte_carlo_chunk, base_cols, distributions, s, n)
+                   for s, n in zip(chunk_seeds, chunk_sizes)]
+        results = (future.result() for future in futures)
+    else:
+        results = (run_monte_carlo_chunk(base_cols, distributions, s, n) for s, n in zip(chunk_seeds, chunk_sizes))
+
+    chunks = []
+    for chunk in results:
+        chunks.append(chunk)
+        if progress is not None:
+            progress(sum(chunk_sizes[:len(chunks)]), samples, chunk)
+
+    summary = {}
+    for key, column, decimals in MONTE_CARLO_OUTPUTS:
+        values = np.concatenate([chunk[column] for chunk in chunks])
+        p10, p50, p90 = np.percentile(values, [10, 50, 90]).tolist()
+        stats = {'p10': p10, 'p50': p50, 'p90': p90,
+                 'mean': float(values.mean()), 'std': float(values.std())}
+        summary[key] = {k: round(v, decimals) if decimals else round(v) for k, v in stats.items()}
+
+    return summary, parallel
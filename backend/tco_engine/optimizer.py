@@ -0,0 +1,206 @@
+"""
+Configuration Optimizer
+Top-k cheapest cluster configurations under power, bandwidth, budget and region constraints
+"""
+
+import heapq
+import math
+
+from .pricing import get_pricing_catalog
+from .model import normalize_calculation_params, calculate_storage_costs, calculate_network_costs
+from .vectorized import (build_calculation_columns, calculate_tco_columns, format_calculation_results,
+                         energy_hours_vectorized)
+from .price_curves import LOAD_PROFILES, location_rate
+from .cooling import cooling_index, location_pue
+
+# With numGPUs, utilization, depreciation and storage sizing fixed, cost per
+# GPU hour splits into independent terms:
+#
+#   cph * gpu_hours = gpu(model) + it_power(model) * energy_price(cooling, region)
+#                     + storage(vendor) + network(fabric, ratio)
+#
+# energy_price covers PUE, which depends on both the site's climate and the
+# cooling type, so each (model, cooling) branch carries its own location list.
+# Each term list is sorted once. A best-first search then pops configurations
+# in exact ascending cost order: a node's cost is a lower bound for everything
+# reachable by advancing one of its indices. Only about top_k * 4 nodes are
+# touched instead of the full cartesian product.
+OPTIMIZER_DEFAULT_TOP_K = 10
+OPTIMIZER_MAX_TOP_K = 100
+OPTIMIZER_DEFAULT_OVERSUBSCRIPTION = ['1:1', '2:1', '3:1', '4:1']
+OPTIMIZER_CONSTRAINTS = ('allowedGpuModels', 'allowedCoolingTypes', 'allowedRegions', 'allowedStorageVendors',
+                         'allowedFabrics', 'oversubscriptionOptions', 'maxPowerMW', 'minBandwidthTbps', 'maxBudget')
+
+def optimizer_choices(constraints, field, catalog, default=None):
+    """Allowed values for one search dimension, validated against its catalog"""
+    allowed = constraints.get(field)
+    if allowed is None:
+        return list(default if default is not None else catalog)
+    if not isinstance(allowed, list) or not allowed:
+        raise ValueError(f'{field} must be a non-empty list')
+    unknown = [value for value in allowed if not isinstance(value, str) or value not in catalog]
+    if unknown:
+        raise ValueError(f'Unknown {field} entries: {", ".join(map(str, unknown))}')
+    return list(dict.fromkeys(allowed))
+
+def optional_limit(constraints, field):
+    """Read an optional non-negative numeric constraint"""
+    if constraints.get(field) is None:
+        return None
+    try:
+        value = float(constraints[field])
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f'{field} must be a number')
+    if not math.isfinite(value) or value < 0:
+        raise ValueError(f'{field} must be a finite number >= 0')
+    return value
+
+def optimize_configurations(params, constraints, top_k=OPTIMIZER_DEFAULT_TOP_K):
+    """Return the top_k cheapest cost-per-GPU-hour configurations meeting the constraints
+
+    Raises:
+        ValueError: If a constraint is unknown or invalid
+    """
+    unknown = set(constraints) - set(OPTIMIZER_CONSTRAINTS)
+    if unknown:
+        raise ValueError(f'Unknown constraint {sorted(unknown)[0]}')
+
+    catalog = get_pricing_catalog()
+    all_locations = set(catalog.electricity_rates) | set(catalog.region_rates)
+    default_locations = [loc for loc in catalog.electricity_rates if loc not in catalog.legacy_location_keys]
+
+    gpu_models = optimizer_choices(constraints, 'allowedGpuModels', catalog.gpu_specs)
+    cooling_types = optimizer_choices(constraints, 'allowedCoolingTypes', ('air', 'liquid'))
+    regions = optimizer_choices(constraints, 'allowedRegions', all_locations, default_locations)
+    vendors = optimizer_choices(constraints, 'allowedStorageVendors', catalog.storage_vendors)
+    fabrics = optimizer_choices(constraints, 'allowedFabrics', catalog.network_costs)
+    oversubscriptions = constraints.get('oversubscriptionOptions')
+    if oversubscriptions is None:
+        oversubscriptions = OPTIMIZER_DEFAULT_OVERSUBSCRIPTION
+    elif (not isinstance(oversubscriptions, list) or not oversubscriptions
+          or not all(isinstance(option, str) for option in oversubscriptions)):
+        raise ValueError('oversubscriptionOptions must be a non-empty list of strings')
+    for option in oversubscriptions:
+        normalize_calculation_params({'oversubscription': option})
+
+    max_power_mw = optional_limit(constraints, 'maxPowerMW')
+    min_bandwidth = optional_limit(constraints, 'minBandwidthTbps')
+    max_budget = optional_limit(constraints, 'maxBudget')
+
+    num_gpus = params['numGPUs']
+    capex_weight = 1 / params['depreciation'] + 0.03  # depreciation + 3% maintenance
+
+    # Storage term per vendor; storage capex does not depend on the vendor
+    vendor_terms = []
+    for vendor in vendors:
+        storage = calculate_storage_costs(
+            params['storageCapacity'], vendor,
+            params['hotPercent'], params['warmPercent'], params['coldPercent'], params['archivePercent'],
+            catalog
+        )
+        vendor_terms.append((storage['opex'] + capex_weight * storage['capex'], vendor))
+        storage_capex = storage['capex']
+    vendor_terms.sort()
+
+    # Network term per (fabric, ratio), pre-filtered by bandwidth
+    network_terms = []
+    for fabric in fabrics:
+        if min_bandwidth is not None and num_gpus * catalog.network_costs[fabric]['per_gpu_bandwidth'] / 1000 < min_bandwidth:
+            continue
+        for oversubscription in oversubscriptions:
+            network = calculate_network_costs(num_gpus, fabric, oversubscription, catalog)
+            term = (capex_weight + 0.05) * network['capex']
+            network_terms.append((term, network['capex'], fabric, oversubscription))
+    network_terms.sort()
+
+    # Annual $ per kW of IT load for each cooling type and location: annual PUE
+    # times the location's rate times its load-weighted energy hours
+    rates = [location_rate(region, catalog.electricity_rate(region)) for region in regions]
+    region_terms = {}
+    for cooling_type in cooling_types:
+        pues = [location_pue(region, cooling_type) for region in regions]
+        energy_hours = energy_hours_vectorized(
+            [row for _, row in rates], params['utilization'], LOAD_PROFILES.index(params['loadProfile']),
+            [climate for _, _, climate in pues], cooling_index(cooling_type))
+        region_terms[cooling_type] = sorted(
+            (pue * rate * hours, peak, region)
+            for (rate, _), (pue, peak, _), hours, region in zip(rates, pues, energy_hours.tolist(), regions))
+
+    # One branch per (GPU model, cooling); the power envelope applies to the
+    # hottest hour's draw, so it drops the locations too warm to stay under it
+    branches = []
+    for gpu_model in gpu_models:
+        spec = catalog.gpu_specs[gpu_model]
+        for cooling_type in spec['cooling_options']:
+            if cooling_type not in cooling_types:
+                continue
+            it_power_mw = spec['power'] * num_gpus / 1_000_000
+            locations = [(term, region) for term, peak, region in region_terms[cooling_type]
+                         if max_power_mw is None or it_power_mw * peak <= max_power_mw]
+            if not locations:
+                continue
+
+            gpu_capex = spec['price'] * num_gpus * 1.15  # GPUs plus infrastructure
+            networks = [n for n in network_terms
+                        if max_budget is None or gpu_capex + storage_capex + n[1] <= max_budget]
+            if networks:
+                branches.append({
+                    'gpuModel': gpu_model,
+                    'coolingType': cooling_type,
+                    'fixed': capex_weight * gpu_capex,
+                    'power': it_power_mw * 1000,
+                    'networks': networks,
+                    'regions': locations,
+                })
+
+    search_space = sum(len(b['networks']) * len(b['regions']) for b in branches) * len(vendor_terms)
+
+    heap = []
+    seen = set()
+
+    def push(b, n, v, r):
+        if (b, n, v, r) in seen:
+            return
+        seen.add((b, n, v, r))
+        branch = branches[b]
+        cost = (branch['fixed'] + branch['networks'][n][0] +
+                vendor_terms[v][0] + branch['power'] * branch['regions'][r][0])
+        heapq.heappush(heap, (cost, b, n, v, r))
+
+    if vendor_terms:
+        for b in range(len(branches)):
+            push(b, 0, 0, 0)
+
+    chosen = []
+    while heap and len(chosen) < top_k:
+        _, b, n, v, r = heapq.heappop(heap)
+        branch = branches[b]
+        _, _, fabric, oversubscription = branch['networks'][n]
+        chosen.append({
+            **params,
+            'gpuModel': branch['gpuModel'],
+            'coolingType': branch['coolingType'],
+            'region': branch['regions'][r][1],
+            'storageVendor': vendor_terms[v][1],
+            'fabricType': fabric,
+            'oversubscription': oversubscription,
+        })
+        if n + 1 < len(branch['networks']):
+            push(b, n + 1, v, r)
+        if v + 1 < len(vendor_terms):
+            push(b, n, v + 1, r)
+        if r + 1 < len(branch['regions']):
+            push(b, n, v, r + 1)
+
+    # Price the winners with the full model so reported numbers match /api/calculate
+    results = []
+    if chosen:
+        formatted = format_calculation_results(calculate_tco_columns(build_calculation_columns(chosen)))
+        for config, result in zip(chosen, formatted):
+            results.append({
+                'config': {key: config[key] for key in
+                           ('gpuModel', 'coolingType', 'region', 'storageVendor', 'fabricType', 'oversubscription')},
+                'results': result
+            })
+
+    return results, {'searchSpace': search_space, 'nodesExpanded': len(seen)}
@@ -0,0 +1,216 @@
+"""
+Planning Models
+Request normalization, result caching and batches for the dashboard's planning math
+"""
+
+import math
+import threading
+
+from .cache import ResultCache, calculation_cache_key
+from .jsmath import json_safe
+from .service_tiers import DEFAULT_SERVICE_TIERS, ENHANCED_GPU_SPECS, plan_service_tiers
+from .storage_planning import PRODUCTION_VENDORS, ENTERPRISE_VENDORS, calculate_enhanced_storage
+from .service_mix import SERVICE_MIX_GPU_SPECS, FABRIC_BANDWIDTH, STORAGE_SECTIONS, derive_service_mix
+
+# The service-tier, storage and service-mix models used to run in every
+# browser tab on every render. Here each request is normalized to the fields
+# its model reads (so cosmetic differences share a cache entry), evaluated
+# once and cached on the canonical hash of (model, parameters). The models
+# price from fixed tables in code, so entries only age out by TTL and LRU.
+#
+# Results are returned as JSON.stringify would write the TypeScript's:
+# non-finite numbers (a margin with zero revenue, say) become null.
+PLANNING_MAX_BATCH = 1000
+PLANNING_CACHE_MAX_ENTRIES = 4096
+PLANNING_CACHE_TTL_SECONDS = 3600
+PLANNING_MAX_GPUS = 200000
+PLANNING_MAX_SERVICE_TIERS = 16
+
+BUDGETS = ('unlimited', 'optimized', 'cost-conscious')
+STORAGE_UNITS = ('TB', 'PB')
+TCO_OVERRIDES = ('gpuPriceOverride', 'powerPriceOverride', 'staffCostOverride', 'maintenancePercentOverride')
+
+def _object(data, name):
+    if not isinstance(data, dict):
+        raise ValueError(f'{name} must be an object')
+    return data
+
+def _number(data, field, default=None, low=None, high=None):
+    """A finite JSON number from data[field], kept as int or float like a JS number"""
+    value = data.get(field, default)
+    if value is None:
+        raise ValueError(f'{field} is required')
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f'{field} must be a number')
+    if high is None and low is not None and value < low:
+        raise ValueError(f'{field} must be at least {low}')
+    if high is not None and not low <= value <= high:
+        raise ValueError(f'{field} must be between {low} and {high}')
+    return value
+
+def _string(data, field, default=None, choices=None):
+    value = data.get(field, default)
+    if not isinstance(value, str):
+        raise ValueError(f'{field} must be a string')
+    if choices is not None and value not in choices:
+        raise ValueError(f'{field} must be one of: {", ".join(choices)}')
+    return value
+
+def normalize_service_tier(tier):
+    tier = _object(tier, 'Each service tier')
+    tier_id = _string(tier, 'id')
+    training = _number(tier, 'trainingPercent', low=0, high=100)
+    return {
+        'id': tier_id,
+        'name': _string(tier, 'name', tier_id),
+        'type': _string(tier, 'type'),
+        'clusterPercent': _number(tier, 'clusterPercent', low=0, high=100),
+        'trainingPercent': training,
+        'inferencePercent': _number(tier, 'inferencePercent', 100 - training, low=0, high=100),
+    }
+
+def normalize_service_tier_config(data):
+    """Typed service-tier planning parameters; serviceTiers defaults to the dashboard's four tiers
+
+    Raises ValueError with a client-safe message when the input is invalid.
+    """
+    data = _object(data, 'Configuration')
+
+    tiers = data.get('serviceTiers', DEFAULT_SERVICE_TIERS)
+    if not isinstance(tiers, (list, tuple)) or not tiers:
+        raise ValueError('serviceTiers must be a non-empty list')
+    if len(tiers) > PLANNING_MAX_SERVICE_TIERS:
+        raise ValueError(f'serviceTiers limited to {PLANNING_MAX_SERVICE_TIERS} tiers')
+
+    overrides = _object(data.get('tcoOverrides') or {}, 'tcoOverrides')
+    unknown = set(overrides) - set(TCO_OVERRIDES)
+    if unknown:
+        raise ValueError(f'Unknown tcoOverrides field {sorted(unknown)[0]}')
+
+    return {
+        'gpuModel': _string(data, 'gpuModel', 'h100-sxm', ENHANCED_GPU_SPECS),
+        'numGPUs': _number(data, 'numGPUs', 1000, low=1, high=PLANNING_MAX_GPUS),
+        'coolingType': _string(data, 'coolingType', 'air', ('air', 'liquid')),
+        'electricityRate': _number(data, 'electricityRate', 0.10, low=0),
+        'utilization': _number(data, 'utilization', 90, low=0, high=100),
+        'serviceTiers': [normalize_service_tier(tier) for tier in tiers],
+        'tcoOverrides': {field: _number(overrides, field, low=0)
+                         for field in TCO_OVERRIDES if overrides.get(field) is not None},
+    }
+
+def normalize_storage_config(data):
+    """Typed storage planning parameters
+
+    Raises ValueError with a client-safe message when the input is invalid.
+    """
+    data = _object(data, 'Configuration')
+    workload = _object(data.get('workloadMix', {}), 'workloadMix')
+    tenants = _object(data.get('tenantMix', {}), 'tenantMix')
+    vendors = ('auto', *PRODUCTION_VENDORS, *ENTERPRISE_VENDORS)
+
+    return {
+        'gpuCount': _number(data, 'gpuCount', 1000, low=1, high=PLANNING_MAX_GPUS),
+        'workloadMix': {field: _number(workload, field, 0, low=0, high=100)
+                        for field in ('training', 'inference', 'finetuning')},
+        'tenantMix': {field: _number(tenants, field, 0, low=0, high=100)
+                      for field in ('whale', 'medium', 'small')},
+        'budget': _string(data, 'budget', 'optimized', BUDGETS),
+        'storageVendor': _string(data, 'storageVendor', 'auto', vendors),
+    }
+
+def normalize_infrastructure_config(data):
+    """Typed infrastructure for service-mix derivation
+
+    Raises ValueError with a client-safe message when the input is invalid.
+    """
+    data = _object(data, 'Configuration')
+    compute = _object(data.get('compute'), 'compute')
+    networking = _object(data.get('networking'), 'networking')
+    storage = _object(data.get('storage'), 'storage')
+    power = _object(data.get('power'), 'power')
+
+    sections = {}
+    for name in STORAGE_SECTIONS:
+        section = _object(storage.get(name), f'storage.{name}')
+        sections[name] = {
+            'capacity': _number(section, 'capacity', low=0),
+            'unit': _string(section, 'unit', choices=STORAGE_UNITS),
+        }
+
+    return {
+        'compute': {
+            'gpuModel': _string(compute, 'gpuModel', choices=SERVICE_MIX_GPU_SPECS),
+            'totalGPUs': _number(compute, 'totalGPUs', low=1, high=PLANNING_MAX_GPUS),
+        },
+        'networking': {
+            'fabricType': _string(networking, 'fabricType', choices=FABRIC_BANDWIDTH),
+            'topologyType': _string(networking, 'topologyType'),
+        },
+        'storage': sections,
+        'power': {
+            'totalPowerCapacity': _number(power, 'totalPowerCapacity', low=0),
+            'coolingType': _string(power, 'coolingType'),
+            'pue': _number(power, 'pue', low=1),
+        },
+    }
+
+# model name -> (normalize, evaluate)
+PLANNING_MODELS = {
+    'service-tiers': (normalize_service_tier_config, plan_service_tiers),
+    'storage': (normalize_storage_config, calculate_enhanced_storage),
+    'service-mix': (normalize_infrastructure_config, derive_service_mix),
+}
+
+class PlanningCalculator:
+    """Cached, batched evaluation of the planning models"""
+
+    def __init__(self, max_results=PLANNING_CACHE_MAX_ENTRIES, ttl_seconds=PLANNING_CACHE_TTL_SECONDS):
+        self.cache = ResultCache(max_results, ttl_seconds)
+        self._lock = threading.Lock()
+        self.evaluations = dict.fromkeys(PLANNING_MODELS, 0)
+
+    def evaluate(self, model, config):
+        """Evaluate one raw configuration
+
+        Returns:
+            (results, True if served from the cache)
+
+        Raises:
+            ValueError: If the model is unknown or the configuration invalid
+        """
+        if model not in PLANNING_MODELS:
+            raise ValueError(f'model must be one of: {", ".join(PLANNING_MODELS)}')
+        normalize, calculate = PLANNING_MODELS[model]
+        params = normalize(config)
+
+        key = calculation_cache_key([model, params])
+        results = self.cache.get(key)
+        if results is not None:
+            return results, True
+
+        results = json_safe(calculate(params))
+        self.cache.put(key, results)
+        with self._lock:
+            self.evaluations[model] += 1
+        return results, False
+
+    def evaluate_batch(self, model, configs):
+        """Evaluate raw configurations, returning one entry per input in order
+
+        Invalid rows are reported individually and never fail the rest of the batch.
+        """
+        entries = []
+        for i, config in enumerate(configs):
+            try:
+                results, cached = self.evaluate(model, config)
+            except ValueError as e:
+                entries.append({'index': i, 'success': False, 'error': str(e)})
+                continue
+            entries.append({'index': i, 'success': True, 'cached': cached, 'results': results})
+        return entries
+
+    def stats(self):
+        stats = self.cache.stats()
+        with self._lock:
+            stats['evaluations'] = dict(self.evaluations)
+        return stats
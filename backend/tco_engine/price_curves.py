@@ -0,0 +1,200 @@
+"""
+Hourly Price Curves
+Memory-mapped 8760-hour electricity price curves and load-weighted energy hours
+"""
+
+import json
+import os
+import threading
+
+# A curve set is a directory holding index.json ({"hours": 8760, "locations":
+# [...]}) and curves.f32, the little-endian float32 matrix of $/kWh prices with
+# one row per listed location. The matrix is memory-mapped, never parsed.
+#
+# Power cost is power_kw * rate * energy_hours. For a location with a curve the
+# rate is the curve's mean price and energy_hours = sum(load[h] * price[h]) / rate;
+# without one the pricing catalog's flat rate applies and prices are constant.
+# Under the default 'full' load profile energy_hours is exactly 8760 either way,
+# so curves only change results through their level unless a utilization-derived
+# profile is requested. NumPy is imported only once a curve set is in use.
+HOURS_PER_YEAR = 8760
+PRICE_CURVE_DIR = os.environ.get('PRICE_CURVE_DIR', '/app/data/price_curves')
+PRICE_CURVE_INDEX = 'index.json'
+PRICE_CURVE_DATA = 'curves.f32'
+PRICE_CURVE_BLOCK = 256  # utilizations per matrix product, bounding memory
+
+# Load profiles: 'full' draws nameplate power every hour (the flat-rate model);
+# 'utilization' draws IDLE_POWER_FRACTION plus the utilized share of the rest
+# every hour; 'price-aware' runs the utilized share of hours at full power in
+# the cheapest hours of the location's curve and idles through the rest.
+LOAD_PROFILES = ('full', 'utilization', 'price-aware')
+IDLE_POWER_FRACTION = 0.3
+
+class PriceCurveSet:
+    """Hourly price curves for a set of locations, backed by a memory map"""
+
+    def __init__(self, directory):
+        """Read the curve index; the price matrix is mapped on first use
+
+        Raises:
+            ValueError: If the index is malformed
+        """
+        self.directory = directory
+        with open(os.path.join(directory, PRICE_CURVE_INDEX)) as f:
+            index = json.load(f)
+
+        locations = index.get('locations')
+        if index.get('hours', HOURS_PER_YEAR) != HOURS_PER_YEAR or not isinstance(locations, list):
+            raise ValueError(f'{PRICE_CURVE_INDEX} must list locations for {HOURS_PER_YEAR}-hour curves')
+
+        self.version = str(index.get('version', ''))
+        self.rows = {name: row for row, name in enumerate(locations)}
+        self._lock = threading.Lock()
+        self._prices = None
+        self._means = None
+        self._sorted = None
+
+    @property
+    def prices(self):
+        """(locations, 8760) float32 memory map of hourly $/kWh"""
+        if self._prices is None:
+            import numpy as np
+
+            path = os.path.join(self.directory, PRICE_CURVE_DATA)
+            expected = len(self.rows) * HOURS_PER_YEAR * 4
+            if os.path.getsize(path) != expected:
+                raise ValueError(f'{PRICE_CURVE_DATA} must hold {expected} bytes for {len(self.rows)} curves')
+            self._prices = np.memmap(path, dtype='<f4', mode='r', shape=(len(self.rows), HOURS_PER_YEAR))
+        return self._prices
+
+    @property
+    def means(self):
+        """Mean price per curve (float64), the effective flat rate of each location"""
+        if self._means is None:
+            self._means = self.prices.mean(axis=1, dtype='f8')
+        return self._means
+
+    @property
+    def sorted_prices(self):
+        """Each curve sorted ascending in float64, for price-aware scheduling
+
+        Summing in float64 keeps results independent of how many rows share a
+        matrix product, so scalar and batch calculations agree to the dollar.
+        """
+        with self._lock:
+            if self._sorted is None:
+                import numpy as np
+                self._sorted = np.sort(self.prices.astype(np.float64), axis=1)
+        return self._sorted
+
+    def row(self, location):
+        """Curve row for a location, or -1 when it has no curve"""
+        return self.rows.get(location, -1)
+
+    def mean_price(self, row):
+        return float(self.means[row])
+
+    def price_aware_energy_hours(self, utilization):
+        """(len(utilization), locations) energy hours when busy hours are the cheapest ones"""
+        return step_load_energy_hours(self.sorted_prices, self.means, utilization)
+
+def step_load_energy_hours(sorted_curves, means, utilization):
+    """Energy hours of price-aware load over ascending-sorted hourly curves
+
+    The load profile over each curve's sorted hours is a step: full power for
+    the first utilization * 8760 hours (the last one partial),
+    IDLE_POWER_FRACTION after that, so one matrix product per PRICE_CURVE_BLOCK
+    utilizations covers every curve.
+
+    Args:
+        sorted_curves: (curves, 8760) hourly prices, each row sorted ascending
+        means: Per-curve normalizer; the curve mean gives hours at the mean price
+        utilization: Utilization percentages
+
+    Returns:
+        (len(utilization), curves) float64 array
+    """
+    import numpy as np
+
+    busy = np.clip(np.asarray(utilization, dtype=np.float64) / 100, 0, 1) * HOURS_PER_YEAR
+    hours = np.arange(HOURS_PER_YEAR)
+    out = np.empty((len(busy), len(sorted_curves)))
+    for start in range(0, len(busy), PRICE_CURVE_BLOCK):
+        busy_share = np.clip(busy[start:start + PRICE_CURVE_BLOCK, None] - hours[None, :], 0, 1)
+        profiles = IDLE_POWER_FRACTION + (1 - IDLE_POWER_FRACTION) * busy_share
+        out[start:start + len(profiles)] = profiles @ sorted_curves.T
+    return out / np.asarray(means)[None, :]
+
+def flat_energy_hours(utilization, load_profile):
+    """Energy hours for constant prices, where price-aware and utilization profiles coincide"""
+    if load_profile == 'full':
+        return HOURS_PER_YEAR
+    share = min(max(utilization / 100, 0.0), 1.0)
+    return HOURS_PER_YEAR * (IDLE_POWER_FRACTION + (1 - IDLE_POWER_FRACTION) * share)
+
+def load_price_curves(directory=PRICE_CURVE_DIR):
+    """Open the curve set in directory, or return None when there is none"""
+    if not os.path.exists(os.path.join(directory, PRICE_CURVE_INDEX)):
+        return None
+    return PriceCurveSet(directory)
+
+_price_curves = None
+_price_curves_loaded = False
+_price_curves_lock = threading.Lock()
+
+def get_price_curves():
+    """The process-wide curve set from PRICE_CURVE_DIR (None if absent)"""
+    global _price_curves, _price_curves_loaded
+    if not _price_curves_loaded:
+        with _price_curves_lock:
+            if not _price_curves_loaded:
+                _price_curves = load_price_curves()
+                _price_curves_loaded = True
+    return _price_curves
+
+def set_price_curves(curves):
+    """Replace the process-wide curve set (None disables curves)"""
+    global _price_curves, _price_curves_loaded
+    with _price_curves_lock:
+        _price_curves = curves
+        _price_curves_loaded = True
+
+def price_curves_fingerprint():
+    """Identity of the active curve set, folded into the pricing fingerprint"""
+    curves = get_price_curves()
+    if curves is None:
+        return None
+    return (curves.directory, curves.version, id(curves))
+
+def location_rate(region, flat_rate):
+    """(effective $/kWh, curve row or -1) for a location"""
+    curves = get_price_curves()
+    row = curves.row(region) if curves is not None else -1
+    return (curves.mean_price(row), row) if row >= 0 else (flat_rate, -1)
+
+def location_energy_hours(row, utilization, load_profile):
+    """Energy hours for one location and utilization (scalar path)"""
+    if row < 0 or load_profile != 'price-aware':
+        return flat_energy_hours(utilization, load_profile)
+    return float(get_price_curves().price_aware_energy_hours([utilization])[0, row])
+
+def write_price_curves(directory, curves, version=None):
+    """Write {location: 8760 hourly $/kWh} as a curve set readable by PriceCurveSet
+
+    Files are written under temporary names and renamed into place, index last.
+    """
+    import numpy as np
+
+    names = list(curves)
+    matrix = np.asarray([np.asarray(curves[name], dtype='<f4') for name in names], dtype='<f4')
+    if matrix.ndim != 2 or matrix.shape[1] != HOURS_PER_YEAR:
+        raise ValueError(f'Every curve needs {HOURS_PER_YEAR} hourly prices')
+
+    os.makedirs(directory, exist_ok=True)
+    data_path = os.path.join(directory, PRICE_CURVE_DATA)
+    index_path = os.path.join(directory, PRICE_CURVE_INDEX)
+    matrix.tofile(data_path + '.tmp')
+    with open(index_path + '.tmp', 'w') as f:
+        json.dump({'version': version or '', 'hours': HOURS_PER_YEAR, 'locations': names}, f)
+    os.replace(data_path + '.tmp', data_path)
+    os.replace(index_path + '.tmp', index_path)
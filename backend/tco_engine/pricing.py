@@ -0,0 +1,276 @@
+"""
+Pricing Tables
+GPU, electricity, storage and network prices used by the TCO model
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from .price_curves import price_curves_fingerprint
+from .cooling import COOLING_TYPES, cooling_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Prices live in a versioned JSON catalog instead of code, so a price update is
+# a file change rather than a redeploy. The file is parsed and validated into a
+# PricingCatalog snapshot, and a reload publishes a complete new snapshot with
+# one reference assignment: requests never take a lock and never see a
+# half-updated table. Snapshots are read-only by convention, and a calculation
+# reads get_pricing_catalog() once and prices everything from that snapshot.
+#
+# Everything derived from prices (result caches, the incremental store, the
+# location cost index) is versioned on pricing_tables_fingerprint(), which
+# includes the catalog digest. Reload listeners run right after a swap so those
+# are dropped or rebuilt immediately rather than on their next version check.
+PRICING_CATALOG_PATH = os.environ.get(
+    'PRICING_CATALOG_PATH', os.path.join(os.path.dirname(__file__), 'pricing_catalog.json'))
+PRICING_RELOAD_INTERVAL = float(os.environ.get('PRICING_RELOAD_INTERVAL', 5))  # seconds between file checks
+
+GPU_SPEC_FIELDS = ('power', 'price', 'network_ports', 'memory')
+STORAGE_RATE_FIELDS = ('hot_per_gb', 'warm_per_gb', 'cold_per_gb', 'archive_per_gb')
+NETWORK_COST_FIELDS = ('switch', 'cable', 'transceiver', 'per_gpu_bandwidth', 'radix', 'rails')
+
+# Legacy module attribute -> PricingCatalog attribute
+CATALOG_TABLES = {
+    'GPU_SPECS': 'gpu_specs',
+    'REGION_RATES': 'region_rates',
+    'ELECTRICITY_RATES': 'electricity_rates',
+    'LEGACY_LOCATION_KEYS': 'legacy_location_keys',
+    'STORAGE_HARDWARE_PER_GB': 'storage_hardware_per_gb',
+    'STORAGE_VENDORS': 'storage_vendors',
+    'NETWORK_COSTS': 'network_costs',
+}
+
+def _number(value, name, minimum=0.0):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value >= minimum:
+        raise ValueError(f'{name} must be a number >= {minimum}')
+    return value
+
+def _table(data, name):
+    table = data.get(name)
+    if not isinstance(table, dict) or not table:
+        raise ValueError(f'{name} must be a non-empty object')
+    return table
+
+class PricingCatalog:
+    """One validated version of every pricing table"""
+
+    def __init__(self, data, source=None, stamp=None):
+        """Validate a parsed catalog document
+
+        Args:
+            data: Catalog dict (see pricing_catalog.json)
+            source: Path the catalog was read from
+            stamp: (mtime_ns, size) of the file, used to detect changes
+
+        Raises:
+            ValueError: If a table is missing or malformed
+        """
+        if not isinstance(data, dict):
+            raise ValueError('Pricing catalog must be an object')
+        version = data.get('version')
+        if not isinstance(version, str) or not version:
+            raise ValueError('version must be a non-empty string')
+
+        gpu_specs = _table(data, 'gpu_specs')
+        for model, spec in gpu_specs.items():
+            if not isinstance(spec, dict):
+                raise ValueError(f'gpu_specs.{model} must be an object')
+            for field in GPU_SPEC_FIELDS:
+                _number(spec.get(field), f'gpu_specs.{model}.{field}')
+            options = spec.get('cooling_options')
+            if not isinstance(options, list) or not options or not set(options) <= set(COOLING_TYPES):
+                raise ValueError(f'gpu_specs.{model}.cooling_options must list cooling types from: '
+                                 f'{", ".join(COOLING_TYPES)}')
+
+        region_rates = _table(data, 'region_rates')
+        for region, entry in region_rates.items():
+            if not isinstance(entry, dict) or not isinstance(entry.get('name'), str):
+                raise ValueError(f'region_rates.{region} needs a name and a rate')
+            _number(entry.get('rate'), f'region_rates.{region}.rate')
+
+        electricity_rates = _table(data, 'electricity_rates')
+        for location, rate in electricity_rates.items():
+            _number(rate, f'electricity_rates.{location}')
+
+        legacy_keys = data.get('legacy_location_keys', [])
+        if not isinstance(legacy_keys, list) or not set(legacy_keys) <= set(electricity_rates):
+            raise ValueError('legacy_location_keys must list electricity_rates locations')
+
+        storage_vendors = _table(data, 'storage_vendors')
+        for vendor, rates in storage_vendors.items():
+            if not isinstance(rates, dict):
+                raise ValueError(f'storage_vendors.{vendor} must be an object')
+            for field in STORAGE_RATE_FIELDS:
+                _number(rates.get(field), f'storage_vendors.{vendor}.{field}')
+
+        network_costs = _table(data, 'network_costs')
+        for fabric, costs in network_costs.items():
+            if not isinstance(costs, dict):
+                raise ValueError(f'network_costs.{fabric} must be an object')
+            for field in NETWORK_COST_FIELDS:
+                _number(costs.get(field), f'network_costs.{fabric}.{field}', minimum=1 if field in ('radix', 'rails') else 0)
+
+        # Unknown vendors and fabrics fall back to these
+        if 'vast' not in storage_vendors:
+            raise ValueError('storage_vendors must include vast')
+        if 'infiniband' not in network_costs:
+            raise ValueError('network_costs must include infiniband')
+
+        self.version = version
+        self.source = source
+        self.stamp = stamp
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        self.gpu_specs = gpu_specs
+        self.region_rates = region_rates
+        self.electricity_rates = electricity_rates
+        self.legacy_location_keys = tuple(legacy_keys)
+        self.default_electricity_rate = _number(data.get('default_electricity_rate', 0.1047),
+                                                'default_electricity_rate')
+        self.storage_hardware_per_gb = _number(data.get('storage_hardware_per_gb'), 'storage_hardware_per_gb')
+        self.storage_vendors = storage_vendors
+        self.network_costs = network_costs
+
+        tables = {name: data[name] for name in data if name not in ('version', 'notes')}
+        canonical = json.dumps(tables, sort_keys=True, separators=(',', ':'))
+        self.digest = hashlib.sha256(canonical.encode()).hexdigest()
+
+    def electricity_rate(self, location):
+        """Flat $/kWh for a location, falling back to legacy regions, then the default rate"""
+        if location in self.electricity_rates:
+            return self.electricity_rates[location]
+        if location in self.region_rates:
+            return self.region_rates[location]['rate']
+        return self.default_electricity_rate
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'digest': self.digest,
+            'loadedAt': self.loaded_at,
+            'source': self.source,
+        }
+
+def load_pricing_catalog(path=PRICING_CATALOG_PATH):
+    """Read and validate the catalog file at path
+
+    Raises:
+        ValueError: If the file cannot be read or fails validation
+    """
+    try:
+        stat = os.stat(path)
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f'Cannot read pricing catalog {path}: {e}')
+    return PricingCatalog(data, source=path, stamp=(stat.st_mtime_ns, stat.st_size))
+
+_catalog = None
+_catalog_lock = threading.Lock()
+_reload_listeners = []
+_watcher = None
+
+def get_pricing_catalog():
+    """The active catalog snapshot, loaded from PRICING_CATALOG_PATH on first use"""
+    catalog = _catalog
+    if catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _publish(load_pricing_catalog())
+            catalog = _catalog
+    return catalog
+
+def _publish(catalog):
+    """Swap in a new snapshot (caller holds _catalog_lock) and notify listeners"""
+    global _catalog
+    previous = _catalog
+    _catalog = catalog
+    if previous is None:
+        return
+    logger.info(f'Pricing catalog {previous.version} -> {catalog.version}')
+    for listener in list(_reload_listeners):
+        try:
+            listener(catalog)
+        except Exception as e:
+            logger.error(f'Pricing reload listener failed: {e}')
+
+def set_pricing_catalog(catalog):
+    """Replace the active catalog with a PricingCatalog"""
+    with _catalog_lock:
+        _publish(catalog)
+
+def reload_pricing_catalog(path=None, force=False):
+    """Reload the catalog file if it changed since it was loaded (always with force)
+
+    Returns:
+        True if a new catalog was swapped in
+
+    Raises:
+        ValueError: If the file cannot be read or fails validation; the
+            active catalog is kept
+    """
+    with _catalog_lock:
+        current = _catalog
+        path = path or (current.source if current is not None and current.source else PRICING_CATALOG_PATH)
+        if not force and current is not None and current.source == path:
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                raise ValueError(f'Cannot read pricing catalog {path}: {e}')
+            if (stat.st_mtime_ns, stat.st_size) == current.stamp:
+                return False
+
+        catalog = load_pricing_catalog(path)
+        if current is not None and catalog.digest == current.digest:
+            current.stamp = catalog.stamp
+            return False
+        if current is not None and catalog.version == current.version:
+            logger.warning(f'Pricing catalog changed without a version bump ({catalog.version})')
+        _publish(catalog)
+        return True
+
+def add_pricing_reload_listener(listener):
+    """Call listener(catalog) after every catalog swap"""
+    _reload_listeners.append(listener)
+
+def watch_pricing_catalog(interval=PRICING_RELOAD_INTERVAL):
+    """Start a daemon thread reloading the catalog file whenever it changes (idempotent)"""
+    global _watcher
+
+    def watch():
+        while True:
+            time.sleep(interval)
+            try:
+                reload_pricing_catalog()
+            except ValueError as e:
+                logger.error(f'Pricing catalog reload rejected, keeping the active catalog: {e}')
+
+    with _catalog_lock:
+        if _watcher is None:
+            _watcher = threading.Thread(target=watch, name='pricing-catalog-watcher', daemon=True)
+            _watcher.start()
+    return _watcher
+
+def get_electricity_rate(location):
+    """Get electricity rate for a location, with fallback to legacy regions"""
+    return get_pricing_catalog().electricity_rate(location)
+
+def pricing_tables_fingerprint():
+    """Digest of every pricing table (plus price curves and cooling model) that feeds the TCO model"""
+    tables = (get_pricing_catalog().digest, price_curves_fingerprint(), cooling_fingerprint())
+    return hashlib.blake2b(repr(tables).encode(), digest_size=16).hexdigest()
+
+def __getattr__(name):
+    """Legacy table names (GPU_SPECS, ...) resolve to the active catalog when accessed
+
+    A name bound with `from .pricing import GPU_SPECS` is a snapshot of the
+    catalog active at import time; engine code reads get_pricing_catalog().
+    """
+    if name in CATALOG_TABLES:
+        return getattr(get_pricing_catalog(), CATALOG_TABLES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,124 @@
+"""
+Sensitivity Analysis
+Tornado swings and partial derivatives of cost per GPU hour and 10-year TCO
+"""
+
+import numpy as np
+
+from .vectorized import build_calculation_columns, calculate_tco_columns, energy_hours_slope
+
+# Every input is nudged down and up by deltaPercent in a single stacked
+# evaluation. Smooth inputs also get closed-form partial derivatives; inputs
+# that pass through the switch-count rounding use central finite differences
+# taken from the same stacked rows.
+SENSITIVITY_DEFAULT_DELTA = 10.0
+
+# Reported input -> (input column, derivative method)
+SENSITIVITY_INPUTS = {
+    'gpuPrice': ('gpu_price', 'analytic'),
+    'gpuPower': ('gpu_power', 'analytic'),
+    'pue': ('pue', 'analytic'),
+    'electricityRate': ('electricity_rate', 'analytic'),
+    'utilization': ('utilization', 'analytic'),
+    'depreciation': ('depreciation', 'analytic'),
+    'storageCapacity': ('storage_capacity', 'analytic'),
+    'hotPercent': ('hot_pct', 'analytic'),
+    'warmPercent': ('warm_pct', 'analytic'),
+    'coldPercent': ('cold_pct', 'analytic'),
+    'archivePercent': ('archive_pct', 'analytic'),
+    'numGPUs': ('num_gpus', 'finite_difference'),
+    'oversubscriptionRatio': ('oversubscription_ratio', 'finite_difference'),
+}
+
+def analytic_partials(cols, outputs):
+    """Closed-form d(costPerHour)/dx and d(tco10year)/dx for the smooth inputs"""
+    num_gpus = cols['num_gpus']
+    depreciation = cols['depreciation']
+    annual_gpu_hours = num_gpus * 8760 * (cols['utilization'] / 100)
+    energy_kw = 1000 * outputs['energy_hours'] / 1_000_000  # MW->kW, load-weighted hours, W->MW
+    power_kw = outputs['power_mw'] * 1000
+    d_power_utilization = power_kw * cols['electricity_rate'] * energy_hours_slope(
+        cols['price_curve'], cols['utilization'], cols['load_profile'], cols['climate'], cols['cooling'])
+
+    def rollup(d_capex, d_opex):
+        return ((d_capex / depreciation + d_opex) / annual_gpu_hours,
+                d_capex + 10 * d_opex)
+
+    zero = np.zeros_like(num_gpus)
+    d_capex_price = 1.15 * num_gpus  # GPU capex plus 15% infrastructure
+    d_capex_storage = 1_000_000 * cols['storage_hardware_per_gb']
+    tier_opex_per_pb = 12 * 1_000_000 * (
+        cols['hot_pct'] / 100 * cols['hot_per_gb'] +
+        cols['warm_pct'] / 100 * cols['warm_per_gb'] +
+        cols['cold_pct'] / 100 * cols['cold_per_gb'] +
+        cols['archive_pct'] / 100 * cols['archive_per_gb']
+    )
+
+    partials = {
+        'gpu_price': rollup(d_capex_price, 0.03 * d_capex_price),
+        'gpu_power': rollup(zero, num_gpus * cols['pue'] * cols['electricity_rate'] * energy_kw),
+        'pue': rollup(zero, cols['gpu_power'] * num_gpus * cols['electricity_rate'] * energy_kw),
+        'electricity_rate': rollup(zero, power_kw * outputs['energy_hours']),
+        'storage_capacity': rollup(d_capex_storage + zero, tier_opex_per_pb + 0.03 * d_capex_storage),
+        'utilization': (-outputs['cost_per_hour'] / cols['utilization'] + d_power_utilization / annual_gpu_hours,
+                        10 * d_power_utilization),
+        'depreciation': (-outputs['total_capex'] / (depreciation ** 2 * annual_gpu_hours), zero),
+    }
+    for tier in ('hot', 'warm', 'cold', 'archive'):
+        d_opex = 12 * cols['storage_capacity'] * 1_000_000 / 100 * cols[f'{tier}_per_gb']
+        partials[f'{tier}_pct'] = rollup(zero, d_opex)
+
+    return partials
+
+def run_sensitivity(params, delta_percent):
+    """Tornado swings and derivatives of costPerHour and tco10year for every input"""
+    base_cols = build_calculation_columns([params])
+    names = list(SENSITIVITY_INPUTS)
+
+    # Rows: 0 = baseline, then (low, high) per input
+    stacked = {key: np.repeat(values, 1 + 2 * len(names)) for key, values in base_cols.items()}
+    factor = delta_percent / 100
+    for i, name in enumerate(names):
+        column = SENSITIVITY_INPUTS[name][0]
+        stacked[column][1 + 2 * i] *= 1 - factor
+        stacked[column][2 + 2 * i] *= 1 + factor
+
+    outputs = calculate_tco_columns(stacked)
+    cph = outputs['cost_per_hour']
+    tco = outputs['tco_10year']
+    partials = analytic_partials(base_cols, calculate_tco_columns(base_cols))
+
+    sensitivities = []
+    for i, name in enumerate(names):
+        column, method = SENSITIVITY_INPUTS[name]
+        value = base_cols[column][0].item()
+        low, high = 1 + 2 * i, 2 + 2 * i
+
+        if method == 'analytic':
+            d_cph = partials[column][0][0].item()
+            d_tco = partials[column][1][0].item()
+        else:
+            step = 2 * value * factor
+            d_cph = ((cph[high] - cph[low]) / step).item() if step else 0.0
+            d_tco = ((tco[high] - tco[low]) / step).item() if step else 0.0
+
+        sensitivities.append({
+            'input': name,
+            'value': value,
+            'method': method,
+            'derivative': {'costPerHour': d_cph, 'tco10year': d_tco},
+            'elasticity': {
+                'costPerHour': round(d_cph * value / cph[0].item(), 4),
+                'tco10year': round(d_tco * value / tco[0].item(), 4)
+            },
+            'low': {'costPerHour': round(cph[low].item(), 4), 'tco10year': round(tco[low].item())},
+            'high': {'costPerHour': round(cph[high].item(), 4), 'tco10year': round(tco[high].item())},
+            'swing': {
+                'costPerHour': round(abs(cph[high] - cph[low]).item(), 4),
+                'tco10year': round(abs(tco[high] - tco[low]).item())
+            }
+        })
+
+    sensitivities.sort(key=lambda s: (s['swing']['costPerHour'], s['swing']['tco10year']), reverse=True)
+    baseline = {'costPerHour': round(cph[0].item(), 4), 'tco10year': round(tco[0].item())}
+    return baseline, sensitivities
@@ -0,0 +1,230 @@
+"""
+Service Mix Derivation
+Recommended service-tier mix, workload split and constraints for a given infrastructure, ported from the dashboard
+"""
+
+from .jsmath import js_round
+
+# Python port of serviceMixDerivation.ts in the nullsector dashboard, kept to
+# the same outputs by scripts/testing/test-planning-parity.py. The input is the
+# dashboard's InfrastructureConfig (compute, networking, storage and power
+# sections, storage capacities with a 'TB' or 'PB' unit).
+
+# TDP W, training and inference suitability and generation per dashboard GPU name
+SERVICE_MIX_GPU_SPECS = {
+    'H100 SXM': {'tdp': 700, 'trainingOptimized': True, 'inferenceOptimized': False, 'generation': 'H100'},
+    'H100 PCIe': {'tdp': 350, 'trainingOptimized': True, 'inferenceOptimized': True, 'generation': 'H100'},
+    'H200': {'tdp': 700, 'trainingOptimized': True, 'inferenceOptimized': False, 'generation': 'H200'},
+    'A100 80GB': {'tdp': 400, 'trainingOptimized': True, 'inferenceOptimized': False, 'generation': 'A100'},
+    'A100 40GB': {'tdp': 250, 'trainingOptimized': True, 'inferenceOptimized': True, 'generation': 'A100'},
+    'L40S': {'tdp': 350, 'trainingOptimized': False, 'inferenceOptimized': True, 'generation': 'L40S'},
+}
+DEFAULT_GPU_TDP = 400
+
+# Effective Gb/s per fabric (RoCE after overhead)
+FABRIC_BANDWIDTH = {
+    'InfiniBand NDR 400Gb (Training optimized)': 400,
+    'InfiniBand HDR 200Gb (Balanced)': 200,
+    'Ethernet 400GbE RoCEv2 (Cost optimized)': 320,
+    'Ethernet 200GbE (Legacy)': 160,
+}
+
+STORAGE_SECTIONS = ('ultraHighPerf', 'highPerf', 'mediumPerf', 'capacityTier', 'objectStore')
+SERVICE_MIX_TIERS = ('tier1_bareMetalWhale', 'tier2_orchestratedK8s', 'tier3_managedMLOps', 'tier4_inferenceService')
+
+def capacity_tb(section):
+    return section['capacity'] * (1 if section['unit'] == 'TB' else 1000)
+
+def total_storage_capacity(storage):
+    """Capacity of every storage section, object store included, in TB"""
+    total = 0
+    for name in STORAGE_SECTIONS:
+        total += capacity_tb(storage[name])
+    return total
+
+def gpu_power_consumption(gpu_model):
+    """TDP in W of a dashboard GPU name, 400 W if unknown"""
+    spec = SERVICE_MIX_GPU_SPECS.get(gpu_model)
+    return spec['tdp'] if spec else DEFAULT_GPU_TDP
+
+def analyze_infrastructure_capabilities(infrastructure):
+    """Training, network, storage and power capabilities of an infrastructure"""
+    compute = infrastructure['compute']
+    networking = infrastructure['networking']
+    storage = infrastructure['storage']
+    power = infrastructure['power']
+
+    gpu_spec = SERVICE_MIX_GPU_SPECS[compute['gpuModel']]
+    network_bandwidth = FABRIC_BANDWIDTH[networking['fabricType']]
+
+    high_perf = capacity_tb(storage['ultraHighPerf']) + capacity_tb(storage['highPerf'])
+    total = high_perf + capacity_tb(storage['mediumPerf']) + capacity_tb(storage['capacityTier'])
+
+    # Simplified: raw capacity figures scaled per section regardless of unit
+    storage_bandwidth = (storage['ultraHighPerf']['capacity'] * 2.5 +
+                         storage['highPerf']['capacity'] * 100 +
+                         storage['mediumPerf']['capacity'] * 1 +
+                         storage['capacityTier']['capacity'] * 10)
+
+    return {
+        'totalGPUs': compute['totalGPUs'],
+        'gpuGeneration': gpu_spec['generation'],
+        'isTrainingOptimized': gpu_spec['trainingOptimized'],
+        'isInferenceOptimized': gpu_spec['inferenceOptimized'],
+        'hasHighBandwidth': network_bandwidth >= 300,
+        'supportsLargeScaleTraining': 'Non-blocking' in networking['topologyType'],
+        'networkBandwidthGBps': network_bandwidth,
+        'storageProfile': {
+            'highPerfRatio': high_perf / total if total > 0 else 0,
+            'totalBandwidthGBps': storage_bandwidth,
+            'hasObjectStorage': storage['objectStore']['capacity'] > 0,
+            'supportsMLoPs': storage['objectStore']['capacity'] >= 2,  # 2 PB for MLOps
+        },
+        'canSupportDenseTraining': 'Liquid' in power['coolingType'] and power['totalPowerCapacity'] > 20,
+        'efficiency': power['pue'],
+    }
+
+def derive_optimal_service_mix(capabilities):
+    """Whole-percent split of the cluster across the four service tiers, summing to 100"""
+    mix = dict.fromkeys(SERVICE_MIX_TIERS, 0)
+    total_gpus = capabilities['totalGPUs']
+    storage = capabilities['storageProfile']
+
+    # Whales need scale, bandwidth, non-blocking fabric, dense power and fast storage
+    if (total_gpus >= 5000 and capabilities['hasHighBandwidth'] and
+            capabilities['supportsLargeScaleTraining'] and capabilities['canSupportDenseTraining'] and
+            storage['highPerfRatio'] > 0.4):
+        mix['tier1_bareMetalWhale'] = min(30, (total_gpus // 1000) * 5)
+
+    if capabilities['isTrainingOptimized'] and storage['highPerfRatio'] > 0.2:
+        training_capacity = min(60, storage['highPerfRatio'] * 80)
+        if storage['supportsMLoPs'] and total_gpus >= 1000:
+            mlops_share, k8s_share = 0.65, 0.35
+        elif total_gpus >= 2000:
+            mlops_share, k8s_share = 0.3, 0.7
+        elif storage['supportsMLoPs']:
+            mlops_share, k8s_share = 0.8, 0.2
+        else:
+            mlops_share, k8s_share = None, 1
+        if mlops_share is not None:
+            mix['tier3_managedMLOps'] = js_round(training_capacity * mlops_share)
+            mix['tier2_orchestratedK8s'] = js_round(training_capacity * k8s_share)
+        else:
+            mix['tier2_orchestratedK8s'] = js_round(training_capacity)
+
+    remaining = 100 - (mix['tier1_bareMetalWhale'] + mix['tier2_orchestratedK8s'] + mix['tier3_managedMLOps'])
+    if capabilities['isInferenceOptimized'] or remaining > 20:
+        mix['tier4_inferenceService'] = min(50, remaining)
+
+    allocated = sum(mix.values())
+    if allocated < 100:
+        remaining = 100 - allocated
+        if storage['supportsMLoPs']:
+            mix['tier3_managedMLOps'] += js_round(remaining * 0.6)
+            mix['tier4_inferenceService'] += js_round(remaining * 0.4)
+        else:
+            mix['tier2_orchestratedK8s'] += js_round(remaining * 0.5)
+            mix['tier4_inferenceService'] += js_round(remaining * 0.5)
+
+    total = sum(mix.values())
+    if total != 100:
+        for key in SERVICE_MIX_TIERS:
+            mix[key] = js_round((mix[key] / total) * 100)
+        difference = 100 - sum(mix.values())
+        if difference:
+            largest = SERVICE_MIX_TIERS[0]
+            for key in SERVICE_MIX_TIERS[1:]:
+                if not mix[largest] > mix[key]:
+                    largest = key
+            mix[largest] += difference
+
+    return mix
+
+def identify_service_constraints(capabilities):
+    """Network, storage, compute, scale and power limits on the service mix"""
+    storage = capabilities['storageProfile']
+    total_gpus = capabilities['totalGPUs']
+    checks = (
+        (not capabilities['hasHighBandwidth'], 'network', 'warning',
+         'Limited network bandwidth restricts large-scale distributed training',
+         'Reduce Tier 1 (Whale) allocation to <10% or upgrade to NDR InfiniBand'),
+        (not capabilities['supportsLargeScaleTraining'], 'network', 'warning',
+         'Oversubscribed network topology may limit training scale',
+         'Consider non-blocking topology for whale customers'),
+        (storage['highPerfRatio'] < 0.2, 'storage', 'critical',
+         'Insufficient high-performance storage for training workloads',
+         'Focus on inference workloads (Tier 4) or upgrade storage to 20%+ high-performance'),
+        (not storage['supportsMLoPs'], 'storage', 'info',
+         'Limited object storage capacity restricts MLOps platform features',
+         'Consider adding 2PB+ object storage for Tier 3 (MLOps) services'),
+        (capabilities['isInferenceOptimized'] and not capabilities['isTrainingOptimized'], 'compute', 'info',
+         'GPU selection optimized for inference workloads',
+         'Recommended focus on Tier 4 (Inference) and Tier 3 (MLOps inference)'),
+        (total_gpus < 500, 'scale', 'info',
+         'Sub-scale deployment for enterprise customers',
+         'Focus on Tier 2-4 services for better unit economics'),
+        (total_gpus > 20000 and not capabilities['hasHighBandwidth'], 'scale', 'critical',
+         'Large scale deployment requires high-bandwidth networking',
+         'Upgrade to NDR InfiniBand or limit scale to <10k GPUs'),
+        (not capabilities['canSupportDenseTraining'] and total_gpus > 5000, 'power', 'warning',
+         'Air cooling limits density for large-scale training',
+         'Consider liquid cooling for better density and efficiency'),
+        (capabilities['efficiency'] > 1.4, 'power', 'warning',
+         'High PUE increases operational costs significantly',
+         'Improve cooling efficiency to reduce OpEx by 20-30%'),
+    )
+    return [{'type': kind, 'severity': severity, 'message': message, 'impact': impact}
+            for applies, kind, severity, message, impact in checks if applies]
+
+def infer_workload_distribution(infrastructure, service_mix):
+    """Training/inference percent of each allocated service tier on this infrastructure"""
+    capabilities = analyze_infrastructure_capabilities(infrastructure)
+    storage = capabilities['storageProfile']
+    distribution = {}
+
+    for tier, allocation in service_mix.items():
+        if allocation == 0:
+            continue
+        if tier == 'tier1_bareMetalWhale':
+            if capabilities['hasHighBandwidth'] and storage['highPerfRatio'] > 0.5:
+                training = 80
+            elif capabilities['hasHighBandwidth']:
+                training = 70
+            else:
+                training = 60
+        elif tier == 'tier2_orchestratedK8s':
+            if capabilities['isTrainingOptimized'] and storage['highPerfRatio'] > 0.3:
+                training = 65
+            elif capabilities['isTrainingOptimized']:
+                training = 55
+            else:
+                training = 40
+        elif tier == 'tier3_managedMLOps':
+            if capabilities['gpuGeneration'] == 'H100' and storage['supportsMLoPs']:
+                training = 55
+            elif capabilities['isInferenceOptimized']:
+                training = 30
+            elif storage['supportsMLoPs']:
+                training = 50
+            else:
+                training = 40
+        elif tier == 'tier4_inferenceService':
+            training = 10
+        else:
+            continue
+        distribution[tier] = {'training': training, 'inference': 100 - training}
+
+    return distribution
+
+def derive_service_mix(infrastructure):
+    """The dashboard's infrastructure-first pipeline: capabilities, mix, workload split, constraints"""
+    capabilities = analyze_infrastructure_capabilities(infrastructure)
+    service_mix = derive_optimal_service_mix(capabilities)
+
+    return {
+        'capabilities': capabilities,
+        'serviceMix': service_mix,
+        'workloadDistribution': infer_workload_distribution(infrastructure, service_mix),
+        'constraints': identify_service_constraints(capabilities),
+        'totalStorageCapacityTB': total_storage_capacity(infrastructure['storage']),
+    }
@@ -0,0 +1,461 @@
+"""
+Service Tier Planning
+Storage, infrastructure and enhanced TCO for a service-tier mix, ported from the dashboard
+"""
+
+import math
+
+from .jsmath import js_div, js_to_fixed
+
+# Python port of workloadPerformanceCalculations.ts and enhancedTCOCalculations.ts
+# in the nullsector dashboard. Tables, field names and every expression's order
+# of operations follow the TypeScript so both produce the same doubles;
+# scripts/testing/test-planning-parity.py checks this against outputs recorded
+# from the TypeScript. Change the two together.
+#
+# These models price from their own tables, not the pricing catalog, exactly
+# as the dashboard does.
+
+# Storage profile per 100 GPUs by service tier type: bandwidth GB/s, IOPS,
+# capacity TB, latency ms
+PERFORMANCE_FACTORS = {
+    'bareMetalWhale': {
+        'training': {'bandwidth': 300, 'iops': 50000, 'capacity': 600, 'latency': 5},
+        'inference': {'bandwidth': 60, 'iops': 150000, 'capacity': 120, 'latency': 10},
+    },
+    'orchestratedK8s': {
+        'training': {'bandwidth': 220, 'iops': 75000, 'capacity': 450, 'latency': 10},
+        'inference': {'bandwidth': 50, 'iops': 200000, 'capacity': 100, 'latency': 15},
+    },
+    'managedMLOps': {
+        'training': {'bandwidth': 180, 'iops': 100000, 'capacity': 400, 'latency': 15},
+        'inference': {'bandwidth': 70, 'iops': 250000, 'capacity': 150, 'latency': 12},
+    },
+    'inferenceService': {
+        'training': {'bandwidth': 40, 'iops': 30000, 'capacity': 50, 'latency': 20},
+        'inference': {'bandwidth': 80, 'iops': 300000, 'capacity': 200, 'latency': 5},
+    },
+}
+
+DEFAULT_SERVICE_TIERS = (
+    {
+        'id': 'tier1_whale',
+        'name': 'Tier 1: Bare Metal GPU Access',
+        'description': 'Direct hardware access for whale customers',
+        'type': 'bareMetalWhale',
+        'clusterPercent': 20,
+        'trainingPercent': 80,
+        'inferencePercent': 20,
+        'typicalCustomers': 'OpenAI, Anthropic, Cohere, Meta AI',
+        'slaRequirement': '99.9% uptime, dedicated partitions',
+        'serviceCategory': 'IaaS',
+    },
+    {
+        'id': 'tier2_orchestrated',
+        'name': 'Tier 2: Orchestrated Kubernetes',
+        'description': 'Managed Kubernetes with GPU scheduling',
+        'type': 'orchestratedK8s',
+        'clusterPercent': 30,
+        'trainingPercent': 65,
+        'inferencePercent': 35,
+        'typicalCustomers': 'Fortune 500 ML teams, Fintech companies',
+        'slaRequirement': '99.5% uptime, shared with QoS',
+        'serviceCategory': 'PaaS',
+    },
+    {
+        'id': 'tier3_mlops',
+        'name': 'Tier 3: Managed MLOps Platform',
+        'description': 'Full MLOps stack with experiment tracking, model registry, and pipeline orchestration',
+        'type': 'managedMLOps',
+        'clusterPercent': 35,
+        'trainingPercent': 55,
+        'inferencePercent': 45,
+        'typicalCustomers': 'Mid-market enterprises, Healthcare AI, Retail analytics teams',
+        'slaRequirement': '99.0% uptime, managed platform SLA',
+        'serviceCategory': 'PaaS',
+    },
+    {
+        'id': 'tier4_inference',
+        'name': 'Tier 4: Inference-as-a-Service',
+        'description': 'API-based inference services with serverless scaling',
+        'type': 'inferenceService',
+        'clusterPercent': 15,
+        'trainingPercent': 10,
+        'inferencePercent': 90,
+        'typicalCustomers': 'SaaS providers, API services, Chatbot companies',
+        'slaRequirement': '99.0% uptime, best effort',
+        'serviceCategory': 'SaaS',
+    },
+)
+
+# Dashboard GPU table: list price USD, power W, memory GB
+ENHANCED_GPU_SPECS = {
+    'gb200': {'price': 70000, 'power': 2700, 'memory': 192},
+    'gb300': {'price': 85000, 'power': 3200, 'memory': 288},
+    'h100-sxm': {'price': 40000, 'power': 700, 'memory': 80},
+    'h100-pcie': {'price': 32000, 'power': 350, 'memory': 80},
+    'h200': {'price': 45000, 'power': 700, 'memory': 141},
+    'mi300x': {'price': 15000, 'power': 750, 'memory': 192},
+}
+
+# Per-PB CAPEX and annual OPEX of each recommended storage tier
+STORAGE_TIER_COSTS = {
+    'VAST Universal': {'capex': 650000, 'opex': 130000, 'total5Year': 1300000},
+    'WEKA Parallel': {'capex': 475000, 'opex': 95000, 'total5Year': 950000},
+    'DDN EXAScaler': {'capex': 1000000, 'opex': 200000, 'total5Year': 2000000},
+    'Pure FlashBlade': {'capex': 700000, 'opex': 140000, 'total5Year': 1400000},
+    'NetApp AFF': {'capex': 700000, 'opex': 140000, 'total5Year': 1400000},
+    'Ceph All-NVMe': {'capex': 350000, 'opex': 70000, 'total5Year': 700000},
+    'Ceph HDD Cache': {'capex': 100000, 'opex': 20000, 'total5Year': 200000},
+    'Dell PowerScale': {'capex': 400000, 'opex': 80000, 'total5Year': 800000},
+}
+
+# Annual revenue per GPU by service tier id; other ids earn the default
+SERVICE_TIER_REVENUE = {
+    'tier1_whale': 50000,
+    'tier2_orchestrated': 35000,
+    'tier3_mlops': 45000,
+    'tier4_inference': 25000,
+}
+DEFAULT_TIER_REVENUE = 30000
+
+# Managed MLOps platform: software USD per 100 GPUs per year, staff FTEs per 1000 GPUs
+MLOPS_SOFTWARE_COSTS = {
+    'kubeflow': 50000,
+    'mlflow': 30000,
+    'wandb': 45000,
+    'dataVersioning': 25000,
+    'featureStore': 35000,
+    'monitoring': 20000,
+}
+MLOPS_STAFF_FTES = {
+    'platformEngineers': 2,
+    'dataEngineers': 1.5,
+    'mlEngineers': 1,
+    'supportStaff': 2,
+}
+
+ROI_DISCOUNT_RATE = 0.10
+
+def mlops_overhead(gpus_in_tier, training_percent):
+    """Artifact, dataset and metadata storage of a managed MLOps tier"""
+    experiments = gpus_in_tier * 2  # 2 experiments per GPU per month
+    training_ratio = training_percent / 100
+
+    return {
+        'artifactStorage': experiments * 0.5 * training_ratio,
+        'datasetStorage': gpus_in_tier * 2 * training_ratio,
+        'metadataStorage': experiments * 0.01,
+        'metadataIOPS': experiments * 100,
+        'featureStore': gpus_in_tier * 0.5,
+        'artifactBandwidth': min(50, gpus_in_tier * 0.5),
+    }
+
+def calculate_storage_requirements(service_tiers, total_gpus):
+    """Bandwidth (GB/s), IOPS, capacity (TB) and performance tier split of a tier mix"""
+    totals = {'totalBandwidth': 0, 'totalIOPS': 0, 'totalCapacity': 0}
+    distribution = {'extreme': 0, 'high': 0, 'balanced': 0, 'cost': 0}
+
+    for tier in service_tiers:
+        gpus_in_tier = (tier['clusterPercent'] / 100) * total_gpus
+        training_gpus = gpus_in_tier * (tier['trainingPercent'] / 100)
+        inference_gpus = gpus_in_tier * (tier['inferencePercent'] / 100)
+
+        factors = PERFORMANCE_FACTORS.get(tier['type'], PERFORMANCE_FACTORS['orchestratedK8s'])
+        for total, factor in (('totalBandwidth', 'bandwidth'), ('totalIOPS', 'iops'),
+                              ('totalCapacity', 'capacity')):
+            totals[total] += ((training_gpus / 100) * factors['training'][factor] +
+                              (inference_gpus / 100) * factors['inference'][factor])
+
+        if tier['type'] == 'managedMLOps':
+            overhead = mlops_overhead(gpus_in_tier, tier['trainingPercent'])
+            totals['totalCapacity'] += (overhead['artifactStorage'] + overhead['datasetStorage'] +
+                                        overhead['metadataStorage'])
+            totals['totalIOPS'] += overhead['metadataIOPS']
+            totals['totalBandwidth'] += overhead['artifactBandwidth']
+
+        percent = tier['clusterPercent']
+        training = tier['trainingPercent']
+        if tier['type'] == 'bareMetalWhale':
+            distribution['extreme'] += percent * 0.6
+            distribution['high'] += percent * 0.4
+        elif tier['type'] == 'orchestratedK8s':
+            if training > 70:
+                distribution['extreme'] += percent * 0.4
+                distribution['high'] += percent * 0.6
+            else:
+                distribution['high'] += percent * 0.7
+                distribution['balanced'] += percent * 0.3
+        elif tier['type'] == 'managedMLOps':
+            distribution['high'] += percent * 0.3
+            distribution['balanced'] += percent * 0.5
+            distribution['cost'] += percent * 0.2
+        elif tier['type'] == 'inferenceService':
+            if training > 20:
+                distribution['balanced'] += percent * 0.6
+                distribution['cost'] += percent * 0.4
+            else:
+                distribution['balanced'] += percent * 0.3
+                distribution['cost'] += percent * 0.7
+        elif training > 70:
+            distribution['extreme'] += percent
+        elif training > 40:
+            distribution['high'] += percent
+        elif training > 15:
+            distribution['balanced'] += percent
+        else:
+            distribution['cost'] += percent
+
+    # Extreme tiers replicate 3x, high RAID-6 equivalent, the rest 8+3 erasure coding
+    raw_multiplier = ((distribution['extreme'] / 100) * 3.0 +
+                      (distribution['high'] / 100) * 2.0 +
+                      (distribution['balanced'] / 100) * 1.375 +
+                      (distribution['cost'] / 100) * 1.375)
+
+    return {
+        **totals,
+        'performanceTierDistribution': distribution,
+        'rawStorageMultiplier': raw_multiplier,
+    }
+
+def calculate_infrastructure_requirements(storage_reqs, total_gpus):
+    """Network, power and software needed to serve calculate_storage_requirements()"""
+    capacity = storage_reqs['totalCapacity']
+    storage_power_kw = capacity * 0.5  # 0.5 kW per TB
+    vast_capacity_pb = ((storage_reqs['performanceTierDistribution']['extreme'] / 100) *
+                        (capacity / 1000))
+
+    return {
+        'network': {
+            'minimumBandwidth': storage_reqs['totalBandwidth'] / 1000,  # Tb/s
+            'infinibandSwitches': math.ceil(total_gpus / 2000),
+            'storageNetworkPorts': math.ceil(capacity / 100),
+        },
+        'power': {
+            'storagePowerKW': storage_power_kw,
+            'coolingTons': storage_power_kw * 0.3,
+            'additionalRacks': math.ceil(capacity / 500),
+        },
+        'software': {
+            'vastLicense': vast_capacity_pb * 50000,
+            'kubernetesLicense': total_gpus * 100,
+            'monitoringStack': total_gpus * 50,
+        },
+    }
+
+def validate_service_tiers(service_tiers):
+    """Warnings for a tier mix that does not add up or skews training-heavy or -light"""
+    warnings = []
+
+    total_cluster_percent = sum(tier['clusterPercent'] for tier in service_tiers)
+    if abs(total_cluster_percent - 100) > 0.1:
+        warnings.append('Service tier percentages must sum to 100% '
+                        f'(currently {js_to_fixed(total_cluster_percent, 1)}%)')
+
+    for tier in service_tiers:
+        split = tier['trainingPercent'] + tier['inferencePercent']
+        if abs(split - 100) > 0.1:
+            warnings.append(f"{tier['name']}: Training + Inference must sum to 100% "
+                            f'(currently {js_to_fixed(split, 1)}%)')
+
+    total_training_percent = 0
+    for tier in service_tiers:
+        total_training_percent += (tier['clusterPercent'] / 100) * (tier['trainingPercent'] / 100)
+    total_training_percent *= 100
+
+    if total_training_percent > 80:
+        warnings.append('High training workload (>80%) will require significant high-performance storage investment')
+    if total_training_percent < 20:
+        warnings.append('Low training workload (<20%) may indicate over-provisioned storage performance tiers')
+
+    return warnings
+
+# (performance tier, storage product, rationale suffix)
+ARCHITECTURE_TIERS = (
+    ('extreme', 'VAST Universal', 'training-heavy workloads require <100μs latency'),
+    ('high', 'Pure FlashBlade', 'mixed workloads need <1ms latency'),
+    ('balanced', 'Ceph All-NVMe', 'inference-heavy workloads acceptable with <5ms latency'),
+    ('cost', 'Ceph HDD Cache', 'pure inference workloads can use cost-optimized storage'),
+)
+
+def recommended_storage_architecture(storage_reqs):
+    """Storage products and capacities (PB) covering each performance tier in use"""
+    total_capacity_pb = storage_reqs['totalCapacity'] / 1000
+    distribution = storage_reqs['performanceTierDistribution']
+
+    return [
+        {
+            'tier': product,
+            'capacityPB': total_capacity_pb * (distribution[key] / 100),
+            'rationale': f'{js_to_fixed(distribution[key], 1)}% {rationale}',
+        }
+        for key, product, rationale in ARCHITECTURE_TIERS if distribution[key] > 0
+    ]
+
+def calculate_enhanced_tco(config):
+    """Five-year TCO, revenue model and storage breakdown of a service-tier configuration
+
+    config carries gpuModel, numGPUs, coolingType, electricityRate, utilization,
+    serviceTiers, storageRequirements, infrastructureRequirements and optional
+    tcoOverrides, as in the dashboard's EnhancedTCOConfig.
+
+    Raises:
+        ValueError: If the GPU model is unknown
+    """
+    num_gpus = config['numGPUs']
+    service_tiers = config['serviceTiers']
+    storage_reqs = config['storageRequirements']
+    infra = config['infrastructureRequirements']
+    overrides = config.get('tcoOverrides') or {}
+
+    gpu_spec = ENHANCED_GPU_SPECS.get(config['gpuModel'])
+    if gpu_spec is None:
+        raise ValueError(f"Unknown GPU model: {config['gpuModel']}")
+
+    # CAPEX
+    gpu_systems_capex = (overrides.get('gpuPriceOverride') or gpu_spec['price']) * num_gpus
+
+    recommended = recommended_storage_architecture(storage_reqs)
+    storage_by_tier = []
+    storage_capex = 0
+    storage_opex = 0
+    for arch in recommended:
+        tier_cost = STORAGE_TIER_COSTS.get(arch['tier'], {})
+        capex = arch['capacityPB'] * (tier_cost.get('capex') or 0)
+        opex = arch['capacityPB'] * (tier_cost.get('opex') or 0)
+        storage_capex += capex
+        storage_opex += opex
+        storage_by_tier.append({
+            'tier': arch['tier'],
+            'capacityPB': arch['capacityPB'],
+            'capex': capex,
+            'opex': opex,
+            'rationale': arch['rationale'],
+        })
+
+    network_capex = (infra['network']['infinibandSwitches'] * 150000 +
+                     infra['network']['storageNetworkPorts'] * 2000)
+    power_cooling_capex = (infra['power']['storagePowerKW'] * 1500 +
+                           infra['power']['additionalRacks'] * 25000)
+    total_capex = gpu_systems_capex + storage_capex + network_capex + power_cooling_capex
+
+    # OPEX
+    pue = 1.1 if config['coolingType'] == 'liquid' else 1.5
+    total_power_kw = ((gpu_spec['power'] * num_gpus * (config['utilization'] / 100) * pue) / 1000 +
+                      infra['power']['storagePowerKW'])
+    annual_power_cost = total_power_kw * 8760 * (overrides.get('powerPriceOverride') or config['electricityRate'])
+    annual_cooling_cost = annual_power_cost * 0.15
+
+    mlops_percent = next((tier['clusterPercent'] for tier in service_tiers
+                          if tier['id'] == 'tier3_mlops'), None) or 0
+
+    complexity = len(service_tiers) + (2 if storage_reqs['performanceTierDistribution']['extreme'] > 0 else 0)
+    annual_staff_cost = (overrides.get('staffCostOverride') or 150000) * math.ceil(num_gpus / 5000) * complexity
+    if mlops_percent > 0:
+        mlops_staff_units = ((mlops_percent / 100) * num_gpus) / 1000
+        annual_staff_cost += mlops_staff_units * 150000 * (
+            MLOPS_STAFF_FTES['platformEngineers'] + MLOPS_STAFF_FTES['dataEngineers'] +
+            MLOPS_STAFF_FTES['mlEngineers'] + MLOPS_STAFF_FTES['supportStaff'])
+
+    maintenance_percent = overrides.get('maintenancePercentOverride') or 0.08
+    annual_maintenance_cost = (gpu_systems_capex + storage_capex) * maintenance_percent
+
+    # The VAST license is amortized over five years
+    annual_software_cost = (infra['software']['kubernetesLicense'] + infra['software']['monitoringStack'] +
+                            (infra['software']['vastLicense'] / 5))
+    if mlops_percent > 0:
+        mlops_units = ((mlops_percent / 100) * num_gpus) / 100
+        annual_software_cost += mlops_units * (
+            MLOPS_SOFTWARE_COSTS['kubeflow'] + MLOPS_SOFTWARE_COSTS['mlflow'] +
+            MLOPS_SOFTWARE_COSTS['wandb'] + MLOPS_SOFTWARE_COSTS['dataVersioning'] +
+            MLOPS_SOFTWARE_COSTS['featureStore'] + MLOPS_SOFTWARE_COSTS['monitoring'])
+
+    total_annual_opex = (annual_power_cost + annual_cooling_cost + annual_staff_cost +
+                         annual_maintenance_cost + annual_software_cost + storage_opex)
+    five_year_opex = total_annual_opex * 5
+
+    five_year_tco = total_capex + five_year_opex
+
+    per_service_tier = {}
+    revenue = 0
+    for tier in service_tiers:
+        tier_gpus = (tier['clusterPercent'] / 100) * num_gpus
+        per_service_tier[tier['id']] = (tier_gpus / num_gpus) * five_year_tco
+        revenue += tier_gpus * SERVICE_TIER_REVENUE.get(tier['id'], DEFAULT_TIER_REVENUE)
+
+    return {
+        'capex': {
+            'gpuSystems': gpu_systems_capex,
+            'calculatedStorage': storage_capex,
+            'networkingInfrastructure': network_capex,
+            'powerCoolingInfrastructure': power_cooling_capex,
+            'total': total_capex,
+        },
+        'opex': {
+            'annual': {
+                'power': annual_power_cost,
+                'cooling': annual_cooling_cost,
+                'staff': annual_staff_cost,
+                'maintenance': annual_maintenance_cost,
+                'softwareLicensing': annual_software_cost,
+                'storageOperations': storage_opex,
+                'total': total_annual_opex,
+            },
+            'fiveYear': five_year_opex,
+        },
+        'tco': {
+            'fiveYear': five_year_tco,
+            'perGPU': five_year_tco / num_gpus,
+            'perServiceTier': per_service_tier,
+        },
+        'revenueModel': {
+            'estimatedAnnualRevenue': revenue,
+            'revenuePerGPU': revenue / num_gpus,
+            'grossMargin': js_div(revenue - total_annual_opex, revenue) * 100,
+            'paybackPeriod': js_div(total_capex, revenue - total_annual_opex),
+        },
+        'breakdown': {
+            'storageByTier': storage_by_tier,
+            'infrastructureDetails': {
+                'networkCapex': network_capex,
+                'powerCapex': infra['power']['storagePowerKW'] * 1500,
+                'softwareCapex': infra['software']['vastLicense'],
+            },
+        },
+    }
+
+def calculate_roi_metrics(tco_results):
+    """Five-year ROI, simple IRR, NPV at 10% and break-even months of calculate_enhanced_tco() output"""
+    capex = tco_results['capex']['total']
+    annual_profit = tco_results['revenueModel']['estimatedAnnualRevenue'] - tco_results['opex']['annual']['total']
+
+    npv = -capex
+    for year in range(1, 6):
+        npv += annual_profit / (1 + ROI_DISCOUNT_RATE) ** year
+
+    return {
+        'roi5Year': js_div(annual_profit * 5 - capex, capex) * 100,
+        'irr': js_div(annual_profit, capex) * 100,
+        'npv': npv,
+        'breakEvenMonths': js_div(capex, annual_profit / 12),
+    }
+
+def plan_service_tiers(config):
+    """The dashboard's service-tier pipeline: requirements, warnings, enhanced TCO and ROI
+
+    config is calculate_enhanced_tco() input without the two requirement
+    sections, which are derived from serviceTiers and numGPUs here.
+    """
+    storage_reqs = calculate_storage_requirements(config['serviceTiers'], config['numGPUs'])
+    infra = calculate_infrastructure_requirements(storage_reqs, config['numGPUs'])
+    tco = calculate_enhanced_tco({**config, 'storageRequirements': storage_reqs,
+                                  'infrastructureRequirements': infra})
+
+    return {
+        'storageRequirements': storage_reqs,
+        'infrastructureRequirements': infra,
+        'recommendedStorage': recommended_storage_architecture(storage_reqs),
+        'warnings': validate_service_tiers(config['serviceTiers']),
+        'tco': tco,
+        'roi': calculate_roi_metrics(tco),
+    }
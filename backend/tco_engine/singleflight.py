@@ -0,0 +1,101 @@
+"""
+Single Flight
+Coalescing of identical in-flight calculations
+"""
+
+import threading
+
+# When a pricing review starts, dozens of people open the same reference
+# configuration at once and every request misses the result cache together.
+# SingleFlight lets the first caller for a key run the calculation while the
+# others wait for its outcome: the value is handed to every waiter and an
+# exception is re-raised in each of them. A waiter gives up after its timeout
+# without affecting the leader or the other waiters, and a key is forgotten as
+# soon as its calculation finishes, so nothing is retained between flights.
+SINGLE_FLIGHT_TIMEOUT = 30.0  # seconds a caller waits for another caller's calculation
+
+class SingleFlight:
+    """Runs one calculation per key at a time and shares its outcome with concurrent callers"""
+
+    def __init__(self, timeout=SINGLE_FLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self._flights = {}  # key -> _Flight
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.shared = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def do(self, key, fn, timeout=None):
+        """Call fn(), or wait for the call already in flight for key
+
+        Returns:
+            (value, True if another caller's calculation produced it)
+
+        Raises:
+            TimeoutError: If the calculation in flight did not finish within timeout
+            Exception: Whatever fn raised, in the caller that ran it and in every waiter
+        """
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+            else:
+                flight.waiters += 1
+
+        if leader:
+            try:
+                flight.value = fn()
+            except BaseException as e:
+                # Waiters get the error itself; an interrupt stays with the thread it hit
+                flight.error = e if isinstance(e, Exception) else RuntimeError('Calculation was interrupted')
+                with self._lock:
+                    self.errors += 1
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+            return flight.value, False
+
+        finished = False
+        try:
+            finished = flight.done.wait(self.timeout if timeout is None else timeout)
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                if not finished:
+                    self.timeouts += 1
+                elif flight.error is None:
+                    self.shared += 1
+        if not finished:
+            raise TimeoutError('Timed out waiting for an identical calculation in progress')
+        if flight.error is not None:
+            raise flight.error
+        return flight.value, True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'inFlight': len(self._flights),
+                'waiting': sum(flight.waiters for flight in self._flights.values()),
+                'calls': self.calls,
+                'executions': self.executions,
+                'shared': self.shared,
+                'errors': self.errors,
+                'timeouts': self.timeouts,
+                'timeoutSeconds': self.timeout,
+            }
+
+class _Flight:
+    __slots__ = ('done', 'value', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
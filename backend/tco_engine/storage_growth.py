@@ -0,0 +1,192 @@
+"""
+Storage Growth Simulation
+Month-by-month tier capacities, step purchases and per-vendor opex as data grows
+"""
+
+import math
+
+import numpy as np
+
+from .pricing import get_pricing_catalog
+
+# Data is held in four tiers. Each month, existing data first migrates down the
+# tiers (a share of hot moves to warm, of warm to cold, of cold to archive, and
+# a share of archive expires). New data then lands on the configured
+# hot/warm/cold/archive split. Month 0 is the deployment with the configured
+# capacity; months 1..M are operating months.
+#
+# The recurrence is stepped month by month, but each step is one array
+# operation over every configuration and tier. Hardware is bought in whole
+# purchase increments to keep installed capacity above used capacity plus
+# headroom, and is never sold back. Every vendor is priced with a single
+# (configs x months x tiers) @ (tiers x vendors) product, since vendors differ
+# only in their per-tier $/GB-month rates.
+STORAGE_TIERS = ('hot', 'warm', 'cold', 'archive')
+STORAGE_GROWTH_MAX_MONTHS = 120
+
+# Request option -> (default, minimum, maximum); percentages are per month
+# unless noted. months defaults to the configuration's depreciation period.
+STORAGE_GROWTH_OPTIONS = {
+    'months': (None, 1, STORAGE_GROWTH_MAX_MONTHS),
+    'monthlyGrowth': (5.0, 0.0, 100.0),
+    'monthlyIngestPB': (0.0, 0.0, 10_000.0),
+    'hotToWarm': (20.0, 0.0, 100.0),
+    'warmToCold': (10.0, 0.0, 100.0),
+    'coldToArchive': (5.0, 0.0, 100.0),
+    'archiveExpiry': (0.0, 0.0, 100.0),
+    'headroom': (0.0, 0.0, 200.0),
+    'purchaseIncrementPB': (1.0, 0.001, 10_000.0),
+    'hardwarePriceChange': (0.0, -90.0, 100.0),  # percent per year
+}
+
+def parse_storage_growth_options(options, params):
+    """Validate storage growth options, filling defaults from normalized params
+
+    Options: months, monthlyGrowth (percent of stored data added per month),
+    monthlyIngestPB, the tier migration shares hotToWarm, warmToCold,
+    coldToArchive and archiveExpiry, headroom (percent of used capacity kept
+    installed), purchaseIncrementPB, hardwarePriceChange (percent per year) and
+    vendors (a subset of the catalog's storage vendors; all by default).
+
+    Raises:
+        ValueError: If an option is unknown, non-numeric or out of range
+    """
+    if options is None:
+        options = {}
+    if not isinstance(options, dict):
+        raise ValueError('storage must be an object')
+
+    unknown = set(options) - set(STORAGE_GROWTH_OPTIONS) - {'vendors'}
+    if unknown:
+        raise ValueError(f'Unknown storage option {sorted(unknown)[0]}')
+
+    parsed = {}
+    for name, (default, low, high) in STORAGE_GROWTH_OPTIONS.items():
+        if default is None:
+            default = min(params['depreciation'] * 12, STORAGE_GROWTH_MAX_MONTHS)
+        try:
+            value = int(options.get(name, default)) if name == 'months' else float(options.get(name, default))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f'{name} must be a number')
+        if not math.isfinite(value) or value < low or value > high:
+            raise ValueError(f'{name} must be between {low} and {high}')
+        parsed[name] = value
+
+    storage_vendors = get_pricing_catalog().storage_vendors
+    vendors = options.get('vendors', list(storage_vendors))
+    if not isinstance(vendors, list) or not vendors:
+        raise ValueError('vendors must be a non-empty list')
+    unknown = [vendor for vendor in vendors if not isinstance(vendor, str) or vendor not in storage_vendors]
+    if unknown:
+        raise ValueError(f'Unknown vendors entries: {", ".join(map(str, unknown))}')
+    parsed['vendors'] = list(dict.fromkeys(vendors))
+
+    return parsed
+
+def simulate_storage_growth(capacity_pb, split_pct, options):
+    """Simulate tier capacities, purchases and per-vendor costs for n configurations
+
+    Args:
+        capacity_pb: (n,) initial stored capacity in PB
+        split_pct: (n, 4) hot/warm/cold/archive percentages of the initial
+            capacity; new data lands in the same proportions
+        options: parse_storage_growth_options() output
+
+    Returns:
+        Dict of arrays: tiers (n, M + 1, 4) PB, used, installed and
+        purchases (n, M + 1) PB, capex (n, M + 1) $, and per-vendor opex,
+        cost and cumulative (n, V, M + 1) $ with vendors in options['vendors']
+        order. Opex is 0 in month 0.
+    """
+    catalog = get_pricing_catalog()
+    capacity_pb = np.atleast_1d(np.asarray(capacity_pb, dtype=np.float64))
+    split = np.atleast_2d(np.asarray(split_pct, dtype=np.float64)) / 100
+    months = options['months']
+
+    # Monthly outflow share per tier; what leaves a tier lands in the next one
+    # down, except archive expiry, which is deleted
+    outflow = np.array([options['hotToWarm'], options['warmToCold'],
+                        options['coldToArchive'], options['archiveExpiry']]) / 100
+    split_total = split.sum(axis=1, keepdims=True)
+    landing = np.divide(split, split_total, out=np.zeros_like(split), where=split_total > 0)
+
+    # Stepped in a month-major buffer so each month's state is contiguous
+    by_month = np.empty((months + 1, len(capacity_pb), len(STORAGE_TIERS)))
+    by_month[0] = capacity_pb[:, None] * split
+    for month in range(1, months + 1):
+        previous = by_month[month - 1]
+        moved = previous * outflow
+        new_data = previous.sum(axis=1) * options['monthlyGrowth'] / 100 + options['monthlyIngestPB']
+        current = by_month[month]
+        np.subtract(previous, moved, out=current)
+        current += new_data[:, None] * landing
+        current[:, 1:] += moved[:, :-1]
+    tiers = by_month.transpose(1, 0, 2)
+
+    used = tiers.sum(axis=2)
+    increment = options['purchaseIncrementPB']
+    required = np.ceil(used * (1 + options['headroom'] / 100) / increment - 1e-9) * increment
+    installed = np.maximum.accumulate(required, axis=1)
+    purchases = np.diff(installed, axis=1, prepend=0.0)
+
+    price_per_pb = catalog.storage_hardware_per_gb * 1_000_000 * (
+        1 + options['hardwarePriceChange'] / 100) ** (np.arange(months + 1) / 12)
+    capex = purchases * price_per_pb
+
+    rates = np.array([[catalog.storage_vendors[vendor][f'{tier}_per_gb'] for tier in STORAGE_TIERS]
+                      for vendor in options['vendors']])
+    opex = (tiers @ (rates.T * 1_000_000)).transpose(0, 2, 1)
+    opex[:, :, 0] = 0.0
+    cost = capex[:, None, :] + opex
+
+    return {
+        'tiers': tiers,
+        'used': used,
+        'installed': installed,
+        'purchases': purchases,
+        'capex': capex,
+        'opex': opex,
+        'cost': cost,
+        'cumulative': np.cumsum(cost, axis=2),
+    }
+
+def format_storage_growth(simulation, options, i=0):
+    """Response dict for row i: tier series, purchases and vendors ranked by total cost"""
+    def series(values, decimals=3):
+        return np.round(values, decimals).tolist()
+
+    months = options['months']
+    used_months = simulation['used'][i, 1:].sum().item()
+
+    vendors = []
+    for v, vendor in enumerate(options['vendors']):
+        total_opex = simulation['opex'][i, v].sum().item()
+        vendors.append({
+            'vendor': vendor,
+            'totalCapex': round(simulation['capex'][i].sum().item()),
+            'totalOpex': round(total_opex),
+            'totalCost': round(simulation['cumulative'][i, v, -1].item()),
+            'averageGbMonth': round(total_opex / (used_months * 1_000_000), 6) if used_months > 0 else 0,
+            'opex': np.rint(simulation['opex'][i, v]).astype(np.int64).tolist(),
+            'cumulative': np.rint(simulation['cumulative'][i, v]).astype(np.int64).tolist(),
+        })
+    vendors.sort(key=lambda entry: entry['totalCost'])
+    for rank, entry in enumerate(vendors):
+        entry['rank'] = rank + 1
+
+    return {
+        'months': list(range(months + 1)),
+        'tiersPB': {tier: series(simulation['tiers'][i, :, t]) for t, tier in enumerate(STORAGE_TIERS)},
+        'usedPB': series(simulation['used'][i]),
+        'installedPB': series(simulation['installed'][i]),
+        'purchasesPB': series(simulation['purchases'][i]),
+        'capex': np.rint(simulation['capex'][i]).astype(np.int64).tolist(),
+        'finalUsedPB': round(simulation['used'][i, -1].item(), 3),
+        'vendors': vendors,
+    }
+
+def run_storage_growth(params, options):
+    """Simulate storage growth for one normalized configuration"""
+    split = [params['hotPercent'], params['warmPercent'], params['coldPercent'], params['archivePercent']]
+    simulation = simulate_storage_growth([params['storageCapacity']], [split], options)
+    return format_storage_growth(simulation, options)
@@ -0,0 +1,305 @@
+"""
+Storage Planning
+Capacity, bandwidth, vendor choice and cost of cluster storage, ported from the dashboard
+"""
+
+import math
+
+from .jsmath import js_parse_float, js_parse_int
+
+# Python port of storageCalculationsEnhanced.ts (with the parts of
+# data/storageVendorsEnhanced.ts it reads) in the nullsector dashboard. As in
+# service_tiers, expressions keep the TypeScript's operation order and
+# scripts/testing/test-planning-parity.py holds the two to the same outputs.
+#
+# Vendor performance figures are the dashboard's display strings; the IOPS and
+# throughput numbers are recovered from them the way the TypeScript does
+# (digits only for IOPS, digits and dots for throughput).
+
+# Vendor name, performance strings and all-in cost per PB
+PRODUCTION_VENDORS = {
+    'weka': {
+        'name': 'WEKA',
+        'performance': {'throughput': '720 GB/s per cluster', 'iops': '18.3M IOPS', 'latency': '<100 microseconds'},
+        'costPerPB': 475000,
+    },
+    'vastdata': {
+        'name': 'VAST Data',
+        'performance': {'throughput': 'TB/s class', 'latency': '<50 microseconds'},
+        'costPerPB': 650000,
+    },
+    'ddn': {
+        'name': 'DDN EXAScaler/Infinia',
+        'performance': {'throughput': '1.1+ TB/s (Infinia), 120 GB/s (EXAScaler)',
+                        'iops': '3M read, 1M write', 'latency': '<100 microseconds'},
+        'costPerPB': 1000000,
+    },
+    'purestorage': {
+        'name': 'Pure Storage FlashBlade',
+        'performance': {'throughput': '3.4 TB/s per rack (current), 10+ TB/s (EXA 2025)',
+                        'latency': '<500 microseconds'},
+        'costPerPB': 800000,
+    },
+}
+ENTERPRISE_VENDORS = {
+    'netapp': {
+        'name': 'NetApp AFF',
+        'performance': {'throughput': '351 GiB/s for 4-system cluster', 'latency': '<1 millisecond'},
+        'costPerPB': 700000,
+    },
+    'dell': {
+        'name': 'Dell PowerScale',
+        'performance': {'throughput': '2.5+ TB/s per cluster', 'latency': '<1 millisecond'},
+        'costPerPB': 600000,
+    },
+    'ceph': {
+        'name': 'Ceph (Open Source)',
+        'performance': {'throughput': 'Variable based on hardware', 'latency': '<5 milliseconds'},
+        'costPerPB': 150000,
+    },
+}
+
+# Share of capacity per distribution type, kW per PB and minimum cost per PB
+STORAGE_TIER_PROFILES = {
+    'tier0': {'percentage': {'trainingHeavy': 0.20, 'balanced': 0.15, 'costOptimized': 0.10},
+              'powerPerPB': 5, 'minCostPerPB': 2000000},
+    'hotTier': {'percentage': {'trainingHeavy': 0.35, 'balanced': 0.25, 'costOptimized': 0.15},
+                'powerPerPB': 30, 'minCostPerPB': 800000},
+    'warmTier': {'percentage': {'trainingHeavy': 0.25, 'balanced': 0.30, 'costOptimized': 0.25},
+                 'powerPerPB': 25, 'minCostPerPB': 300000},
+    'coldTier': {'percentage': {'trainingHeavy': 0.15, 'balanced': 0.25, 'costOptimized': 0.40},
+                 'powerPerPB': 50, 'minCostPerPB': 100000},
+    'archiveTier': {'percentage': {'trainingHeavy': 0.05, 'balanced': 0.05, 'costOptimized': 0.10},
+                    'powerPerPB': 60, 'minCostPerPB': 50000},
+}
+
+# TB per GPU by tenant size
+TENANT_CAPACITY_PER_GPU = {'whale': 10, 'medium': 5, 'small': 1}
+
+# (GPU count at which the warning applies, warning), in reporting order
+SCALE_WARNINGS = (
+    (32768, 'Network architecture must transition to 3-layer fat-tree'),
+    (10000, 'Metadata operations become critical'),
+    (200000, 'Checkpoints required every 45 seconds'),
+    (100000, 'Consider multiple independent clusters'),
+)
+
+STORAGE_POWER_COST_PER_KW_MONTH = 350
+CHECKPOINT_FAILURE_RATE = 0.0065  # failures per thousand node-days
+
+def find_vendor(key):
+    return PRODUCTION_VENDORS.get(key) or ENTERPRISE_VENDORS.get(key)
+
+def base_capacity(config):
+    """Tenant and workload driven capacity in TB, including 500 GB per GPU of datasets"""
+    gpu_count = config['gpuCount']
+    workload = config['workloadMix']
+    tenants = config['tenantMix']
+
+    base = 0
+    for tenant in ('whale', 'medium', 'small'):
+        base += TENANT_CAPACITY_PER_GPU[tenant] * (tenants[tenant] / 100) * gpu_count
+
+    workload_factor = ((workload['training'] / 100) * 1.5 +
+                       (workload['inference'] / 100) * 0.8 +
+                       (workload['finetuning'] / 100) * 1.2)
+
+    return base * workload_factor + gpu_count * 0.5
+
+def checkpoint_storage(config):
+    """Checkpoint model size (TB), failure-driven frequency (minutes), retention and storage (TB)"""
+    gpu_count = config['gpuCount']
+
+    model_size = 0.1
+    if gpu_count >= 100000:
+        model_size = 15  # 1T parameters
+    elif gpu_count >= 50000:
+        model_size = 5.29  # 405B parameters
+    elif gpu_count >= 10000:
+        model_size = 0.912  # 70B parameters
+    elif gpu_count >= 5000:
+        model_size = 0.105  # 8B parameters
+
+    node_count = math.ceil(gpu_count / 8)
+    frequency_hours = 1 / (node_count * CHECKPOINT_FAILURE_RATE * 24)
+
+    retention = 20
+    if gpu_count >= 50000:
+        retention = 100
+    elif gpu_count >= 10000:
+        retention = 50
+
+    return {
+        'modelSize': model_size,
+        'frequency': max(frequency_hours * 60, 1.5),
+        'retention': retention,
+        'storageRequired': model_size * retention * 3,  # 3x replication
+    }
+
+def select_vendors(config):
+    """Primary and secondary storage vendor with the reason for the choice"""
+    gpu_count = config['gpuCount']
+    vendor_key = config['storageVendor']
+
+    if vendor_key != 'auto':
+        vendor = find_vendor(vendor_key)
+        return {
+            'primary': vendor_key,
+            'secondary': 'ceph',
+            'rationale': f"User selected {vendor['name'] if vendor else vendor_key}",
+        }
+
+    if gpu_count >= 100000:
+        if config['budget'] == 'unlimited':
+            return {'primary': 'vastdata', 'secondary': 'ddn',
+                    'rationale': 'Mega-scale deployment requires proven vendors with 100k+ GPU validation'}
+        return {'primary': 'weka', 'secondary': 'ceph',
+                'rationale': 'Cost-optimized mega-scale with software-defined primary storage'}
+    if gpu_count >= 25000:
+        if config['workloadMix']['training'] > 70:
+            return {'primary': 'ddn', 'secondary': 'purestorage',
+                    'rationale': 'Training-heavy workload requires parallel filesystem performance'}
+        return {'primary': 'purestorage', 'secondary': 'netapp',
+                'rationale': 'Mixed workload benefits from enterprise NAS/SAN architecture'}
+    if gpu_count >= 5000:
+        return {'primary': 'weka', 'secondary': 'ceph',
+                'rationale': 'Medium scale deployment with software-defined storage'}
+    return {'primary': 'dell', 'secondary': 'ceph',
+            'rationale': 'Small scale deployment with traditional enterprise storage'}
+
+def tier_distribution(config, total_capacity_tb):
+    """Capacity per storage tier in PB"""
+    kind = 'balanced'
+    if config['workloadMix']['training'] > 60:
+        kind = 'trainingHeavy'
+    elif config['budget'] == 'cost-conscious':
+        kind = 'costOptimized'
+
+    return {key: (total_capacity_tb * tier['percentage'][kind]) / 1000
+            for key, tier in STORAGE_TIER_PROFILES.items()}
+
+def bandwidth_requirements(config):
+    """Sustained, burst and required storage bandwidth in TB/s"""
+    gpu_count = config['gpuCount']
+    workload = config['workloadMix']
+
+    # GiB/s per GPU by workload
+    per_gpu = ((workload['training'] / 100) * 2.7 +
+               (workload['inference'] / 100) * 0.3 +
+               (workload['finetuning'] / 100) * 2.0)
+
+    sustained = (gpu_count * per_gpu * 1.074) / 1000
+    overhead = sustained * 0.3
+
+    return {
+        'requiredTBps': sustained + overhead,
+        'sustainedTBps': sustained,
+        'burstTBps': sustained * (10 if gpu_count > 50000 else 5),
+        'networkOverhead': overhead,
+    }
+
+def power_consumption(distribution):
+    """Storage power in kW, total and by tier"""
+    by_tier = {}
+    total_kw = 0
+    for key, capacity_pb in distribution.items():
+        by_tier[key] = capacity_pb * STORAGE_TIER_PROFILES[key]['powerPerPB']
+        total_kw += by_tier[key]
+
+    return {
+        'totalKW': total_kw,
+        'byTier': by_tier,
+        'percentOfDatacenter': 0,
+    }
+
+def detailed_costs(config, distribution, vendors):
+    """CAPEX by tier, annual OPEX and five-year storage TCO"""
+    primary = find_vendor(vendors['primary'])
+    by_tier = {}
+    total_capex = 0
+    for key, capacity_pb in distribution.items():
+        tier = STORAGE_TIER_PROFILES[key]
+        if key == 'tier0':
+            cost_per_pb = tier['minCostPerPB']  # Local NVMe
+        else:
+            cost_per_pb = (primary['costPerPB'] if primary else 0) or tier['minCostPerPB']
+        by_tier[key] = capacity_pb * cost_per_pb
+        total_capex += by_tier[key]
+
+    power_cost = power_consumption(distribution)['totalKW'] * STORAGE_POWER_COST_PER_KW_MONTH * 12
+    support_cost = total_capex * 0.20
+    admin_cost = math.ceil(config['gpuCount'] / 5000) * 150000
+
+    annual_opex = power_cost + support_cost + admin_cost
+    tco_5_year = total_capex + annual_opex * 5
+
+    return {
+        'capex': {
+            'total': total_capex,
+            'byTier': by_tier,
+            'byVendor': {},
+        },
+        'opex': {
+            'annual': annual_opex,
+            'power': power_cost,
+            'support': support_cost,
+            'admin': admin_cost,
+        },
+        'tco5Year': tco_5_year,
+        'costPerGPU': tco_5_year / config['gpuCount'],
+        'costPerTB': total_capex / (sum(distribution.values()) * 1000),
+    }
+
+def performance_metrics(vendors):
+    """Latency, IOPS and throughput of the primary vendor, with dashboard defaults"""
+    performance = (find_vendor(vendors['primary']) or {}).get('performance', {})
+    iops = js_parse_int(''.join(filter(str.isdigit, performance.get('iops', ''))) or '1000000')
+    throughput = js_parse_float(''.join(c for c in performance.get('throughput', '')
+                                        if c.isdigit() or c == '.') or '100')
+
+    return {
+        'latency': {
+            'tier0': '<100μs',
+            'hotTier': performance.get('latency') or '<500μs',
+            'warmTier': '<1ms',
+            'coldTier': '<5ms',
+            'archiveTier': 'Minutes',
+        },
+        'iops': {
+            'total': iops,
+            'read': iops * 0.7,
+            'write': iops * 0.3,
+        },
+        'throughput': {
+            'sustained': throughput,
+            'burst': throughput * 2,
+        },
+    }
+
+def calculate_enhanced_storage(config):
+    """Storage capacity, bandwidth, vendors, costs, performance, checkpoints and power
+
+    config follows the dashboard's StorageConfig: gpuCount, workloadMix
+    (training/inference/finetuning %), tenantMix (whale/medium/small %), budget
+    and storageVendor ('auto' or a vendor key).
+    """
+    capacity = base_capacity(config)
+    checkpoints = checkpoint_storage(config)
+    vendors = select_vendors(config)
+    distribution = tier_distribution(config, capacity + checkpoints['storageRequired'])
+
+    warnings = [warning for gpu_count, warning in SCALE_WARNINGS if config['gpuCount'] >= gpu_count]
+
+    return {
+        'totalCapacity': {
+            'totalPB': (capacity + checkpoints['storageRequired']) / 1000,
+            'tierBreakdown': distribution,
+        },
+        'bandwidth': bandwidth_requirements(config),
+        'vendors': vendors,
+        'costs': detailed_costs(config, distribution, vendors),
+        'performance': performance_metrics(vendors),
+        'checkpoints': checkpoints,
+        'warnings': warnings,
+        'powerConsumption': power_consumption(distribution),
+    }
@@ -0,0 +1,211 @@
+"""
+Parameter Sweeps
+Lazily expanded cartesian-product sweeps, priced and serialized chunk by chunk
+"""
+
+import json
+import math
+
+import numpy as np
+
+from .pricing import get_pricing_catalog
+from .model import INTEGER_PARAMS, normalize_calculation_params
+from .vectorized import build_calculation_columns, calculate_tco_columns, pue_columns
+from .price_curves import LOAD_PROFILES
+from .cashflow import calculate_cashflow_columns, cashflow_chunk_rows, format_cashflow_summary
+
+# A sweep is the cartesian product of a few axes over a base configuration. The
+# grid is never materialized: flat indices are unravelled chunk by chunk and
+# each chunk is priced with calculate_tco_columns().
+SWEEP_MAX_POINTS = 10_000_000
+SWEEP_DEFAULT_CHUNK = 4096
+SWEEP_MAX_CHUNK = 65536
+
+# Input columns driven by each sweepable request field
+SWEEP_AXIS_COLUMNS = {
+    'gpuModel': ('gpu_price', 'gpu_power'),
+    'numGPUs': ('num_gpus',),
+    'coolingType': ('cooling', 'pue', 'peak_pue'),
+    'region': ('electricity_rate', 'price_curve', 'climate', 'pue', 'peak_pue'),
+    'utilization': ('utilization',),
+    'depreciation': ('depreciation',),
+    'storageCapacity': ('storage_capacity',),
+    'hotPercent': ('hot_pct',),
+    'warmPercent': ('warm_pct',),
+    'coldPercent': ('cold_pct',),
+    'archivePercent': ('archive_pct',),
+    'storageVendor': ('hot_per_gb', 'warm_per_gb', 'cold_per_gb', 'archive_per_gb'),
+    'fabricType': ('switch_price', 'cable_price', 'transceiver_price', 'per_gpu_bandwidth',
+                   'switch_radix', 'rails'),
+    'oversubscription': ('oversubscription_ratio',),
+    'loadProfile': ('load_profile',),
+}
+
+# Numeric fields whose value is the input column itself, so ranges skip per-value lookups
+SWEEP_NUMERIC_COLUMNS = {
+    'numGPUs': 'num_gpus',
+    'utilization': 'utilization',
+    'depreciation': 'depreciation',
+    'storageCapacity': 'storage_capacity',
+    'hotPercent': 'hot_pct',
+    'warmPercent': 'warm_pct',
+    'coldPercent': 'cold_pct',
+    'archivePercent': 'archive_pct',
+}
+
+# (row key, output column, decimals) streamed for every grid point
+SWEEP_RESULT_FIELDS = (
+    ('totalCapex', 'total_capex', None),
+    ('annualOpex', 'annual_opex', None),
+    ('annualPowerCost', 'annual_power_cost', None),
+    ('costPerHour', 'cost_per_hour', 2),
+    ('totalPowerMW', 'power_mw', 1),
+    ('peakPowerMW', 'peak_power_mw', 1),
+    ('pueValue', 'pue', 3),
+    ('tco10year', 'tco_10year', None),
+)
+
+def sweep_axis_catalog(field):
+    """Every known value for a categorical field, used when an axis is "all" """
+    pricing = get_pricing_catalog()
+    catalogs = {
+        'gpuModel': list(pricing.gpu_specs),
+        'coolingType': ['air', 'liquid'],
+        'region': [loc for loc in pricing.electricity_rates if loc not in pricing.legacy_location_keys],
+        'storageVendor': list(pricing.storage_vendors),
+        'fabricType': list(pricing.network_costs),
+        'loadProfile': list(LOAD_PROFILES),
+    }
+    if field not in catalogs:
+        raise ValueError(f'Axis {field} has no catalog; pass a list of values')
+    return catalogs[field]
+
+def build_sweep_axis(field, spec, base):
+    """Resolve one axis definition into its labels and input columns
+
+    spec is a list of values, "all" for categorical fields, or a
+    {"start", "stop", "step"} range (stop inclusive) for numeric fields.
+    """
+    if field not in SWEEP_AXIS_COLUMNS:
+        raise ValueError(f'{field} cannot be swept')
+
+    if isinstance(spec, dict):
+        if field not in SWEEP_NUMERIC_COLUMNS:
+            raise ValueError(f'{field} does not support ranges')
+        try:
+            start, stop = float(spec['start']), float(spec['stop'])
+            step = float(spec.get('step', 1))
+        except (KeyError, TypeError, ValueError, OverflowError):
+            raise ValueError(f'{field} range needs numeric start, stop and step')
+        if not all(math.isfinite(value) for value in (start, stop, step)):
+            raise ValueError(f'{field} range start, stop and step must be finite')
+        if step <= 0 or stop < start:
+            raise ValueError(f'{field} range must have step > 0 and stop >= start')
+
+        # A tiny step can overflow the quotient, so bound it before taking int()
+        intervals = (stop - start) / step + 1e-9
+        if not math.isfinite(intervals) or intervals >= SWEEP_MAX_POINTS:
+            raise ValueError(f'{field} range has more than {SWEEP_MAX_POINTS} points')
+        count = int(np.floor(intervals)) + 1
+        values = start + step * np.arange(count, dtype=np.float64)
+        if field in dict(INTEGER_PARAMS):
+            values = np.trunc(values)
+
+        # Validation rules are all bounds, so checking the endpoints covers the range
+        for endpoint in (values[0], values[-1]):
+            normalize_calculation_params({**base, field: endpoint.item()})
+
+        return {
+            'field': field,
+            'labels': values.astype(np.int64) if field in dict(INTEGER_PARAMS) else values,
+            'columns': {SWEEP_NUMERIC_COLUMNS[field]: values},
+        }
+
+    if spec == 'all':
+        spec = sweep_axis_catalog(field)
+    if not isinstance(spec, list) or not spec:
+        raise ValueError(f'{field} axis must be a non-empty list, "all" or a range')
+
+    params_list = [normalize_calculation_params({**base, field: value}) for value in spec]
+    cols = build_calculation_columns(params_list)
+
+    return {
+        'field': field,
+        'labels': np.array([p[field] for p in params_list], dtype=object),
+        'columns': {key: cols[key] for key in SWEEP_AXIS_COLUMNS[field]},
+    }
+
+def plan_sweep(data):
+    """Validate a sweep request and return (base params, axes, total points)"""
+    base = data.get('base') or {}
+    axes_spec = data.get('axes')
+    if not isinstance(base, dict):
+        raise ValueError('base must be an object')
+    if not isinstance(axes_spec, dict) or not axes_spec:
+        raise ValueError('axes must be a non-empty object')
+
+    base_params = normalize_calculation_params(base)
+    axes = [build_sweep_axis(field, spec, base) for field, spec in axes_spec.items()]
+
+    total = 1
+    for axis in axes:
+        total *= len(axis['labels'])
+    if total > SWEEP_MAX_POINTS:
+        raise ValueError(f'Sweep grid has {total} points; limit is {SWEEP_MAX_POINTS}')
+
+    return base_params, axes, total
+
+def iter_sweep_chunks(base_params, axes, total, chunk_size=SWEEP_DEFAULT_CHUNK, cashflow=None):
+    """Yield (labels, outputs) column dicts for consecutive chunks of the grid
+
+    With parse_cashflow_options() output as cashflow, outputs also carries the
+    chunk's calculate_cashflow_columns() result under 'cashflow'.
+    """
+    base_cols = build_calculation_columns([base_params])
+    if cashflow is not None:
+        chunk_size = min(chunk_size, cashflow_chunk_rows(cashflow))
+    shape = tuple(len(axis['labels']) for axis in axes)
+
+    # PUE depends on both location and cooling, so with both swept it is looked
+    # up per grid point instead of taken from either axis
+    swept = {axis['field'] for axis in axes}
+    coupled_pue = {'region', 'coolingType'} <= swept
+
+    for start in range(0, total, chunk_size):
+        flat = np.arange(start, min(start + chunk_size, total))
+        indices = np.unravel_index(flat, shape)
+
+        cols = dict(base_cols)
+        labels = {}
+        for axis, index in zip(axes, indices):
+            for key, values in axis['columns'].items():
+                cols[key] = values[index]
+            labels[axis['field']] = axis['labels'][index]
+        if coupled_pue:
+            cols.update(pue_columns(cols['climate'], cols['cooling']))
+
+        outputs = calculate_tco_columns(cols)
+        if cashflow is not None:
+            outputs['cashflow'] = calculate_cashflow_columns(cols, outputs, cashflow)
+        yield labels, outputs
+
+def sweep_chunk_to_ndjson(labels, outputs):
+    """Serialize one computed chunk as newline-delimited JSON rows"""
+    n = len(next(iter(labels.values())))
+    label_lists = {field: values.tolist() for field, values in labels.items()}
+    output_lists = [(key, np.broadcast_to(outputs[column], (n,)).tolist(), decimals)
+                    for key, column, decimals in SWEEP_RESULT_FIELDS]
+
+    cashflow = outputs.get('cashflow')
+    if cashflow is not None:
+        cumulative = np.rint(cashflow['cumulative']).astype(np.int64).tolist()
+
+    lines = []
+    for i in range(n):
+        row = {field: values[i] for field, values in label_lists.items()}
+        for key, values, decimals in output_lists:
+            row[key] = round(values[i], decimals) if decimals else round(values[i])
+        if cashflow is not None:
+            row['cashflow'] = {**format_cashflow_summary(cashflow, i), 'cumulative': cumulative[i]}
+        lines.append(json.dumps(row))
+    return '\n'.join(lines) + '\n'
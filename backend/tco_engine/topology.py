@@ -0,0 +1,107 @@
+"""
+Fabric Topology
+Multi-tier Clos (fat-tree) sizing: per-tier switch, link and optic counts
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from math import ceil
+from typing import Tuple
+
+# Rail-optimized fat tree. Each GPU has one fabric port; GPU i of every node
+# lands on rail i, and each rail gets its own set of leaf switches. Leaves split
+# their radix into GPU-facing and uplink ports by the oversubscription ratio;
+# every tier above the leaves is non-blocking, with middle tiers using half
+# their ports down and half up and the top tier using all ports down. The
+# smallest number of tiers whose capacity covers the leaves is used.
+#
+# Sizing depends only on (GPU count, radix, ratio, rails), and sweeps and
+# batches revisit the same few combinations constantly, so results are memoized.
+TOPOLOGY_CACHE_SIZE = 65536
+TOPOLOGY_TIER_NAMES = ('leaf', 'spine', 'super-spine', 'core')
+TRANSCEIVERS_PER_LINK = 2
+
+@dataclass(frozen=True)
+class FatTreeTopology:
+    """Switch and link counts per tier, leaf first
+
+    links[0] counts GPU-to-leaf links; links[i] counts links from tier i - 1
+    up into tier i. Every link uses one cable and two transceivers.
+    """
+    tiers: int
+    switches: Tuple[int, ...]
+    links: Tuple[int, ...]
+    gpu_ports_per_leaf: int
+    uplinks_per_leaf: int
+
+    @property
+    def total_switches(self) -> int:
+        return sum(self.switches)
+
+    @property
+    def total_links(self) -> int:
+        return sum(self.links)
+
+    @property
+    def total_transceivers(self) -> int:
+        return self.total_links * TRANSCEIVERS_PER_LINK
+
+    def to_dict(self):
+        """Per-tier breakdown for API responses"""
+        names = [TOPOLOGY_TIER_NAMES[i] if i < len(TOPOLOGY_TIER_NAMES) else f'tier{i + 1}'
+                 for i in range(self.tiers)]
+        return {
+            'tiers': [
+                {'name': name, 'switches': switches, 'links': links,
+                 'transceivers': links * TRANSCEIVERS_PER_LINK}
+                for name, switches, links in zip(names, self.switches, self.links)
+            ],
+            'gpuPortsPerLeaf': self.gpu_ports_per_leaf,
+            'uplinksPerLeaf': self.uplinks_per_leaf,
+            'totalSwitches': self.total_switches,
+            'totalLinks': self.total_links,
+            'totalTransceivers': self.total_transceivers,
+        }
+
+@lru_cache(maxsize=TOPOLOGY_CACHE_SIZE)
+def size_fat_tree(num_gpus, radix, ratio, rails):
+    """Size a rail-optimized fat tree
+
+    Args:
+        num_gpus: GPU (endpoint) count
+        radix: Ports per switch
+        ratio: Uplink-to-downlink ratio at the leaves, from parse_oversubscription()
+        rails: Rails per node; leaves are allocated per rail
+
+    Returns:
+        FatTreeTopology
+
+    Raises:
+        ValueError: If the inputs cannot form a fabric
+    """
+    num_gpus, radix, rails = int(num_gpus), int(radix), int(rails)
+    if num_gpus < 1 or radix < 4 or rails < 1 or not ratio > 0:
+        raise ValueError('Fabric needs at least one GPU, radix >= 4, rails >= 1 and a positive ratio')
+
+    if num_gpus <= radix:
+        return FatTreeTopology(1, (1,), (num_gpus,), num_gpus, 0)
+
+    down = max(1, min(radix - 1, int(radix / (1 + ratio))))
+    up = radix - down
+    half = radix // 2
+
+    leaves = rails * ceil(ceil(num_gpus / rails) / down)
+    tiers = 2
+    while leaves > radix * half ** (tiers - 2):
+        tiers += 1
+
+    uplinks = leaves * up
+    switches = [leaves] + [ceil(uplinks / half)] * (tiers - 2) + [ceil(uplinks / radix)]
+    links = [num_gpus] + [uplinks] * (tiers - 1)
+    return FatTreeTopology(tiers, tuple(switches), tuple(links), down, up)
+
+@lru_cache(maxsize=TOPOLOGY_CACHE_SIZE)
+def fat_tree_totals(num_gpus, radix, ratio, rails):
+    """(total switches, total links) of size_fat_tree(), memoized for the vectorized path"""
+    topology = size_fat_tree(num_gpus, radix, ratio, rails)
+    return topology.total_switches, topology.total_links
@@ -0,0 +1,312 @@
+"""
+Vectorized TCO Model
+The same formulas as model.calculate_results(), evaluated as NumPy column
+operations so whole batches of configurations are priced in a few array passes
+"""
+
+import numpy as np
+
+from .pricing import get_pricing_catalog
+from .model import parse_oversubscription
+from .topology import TRANSCEIVERS_PER_LINK, fat_tree_totals
+from .price_curves import (
+    HOURS_PER_YEAR, IDLE_POWER_FRACTION, LOAD_PROFILES, get_price_curves, location_rate
+)
+from .cooling import COOLING_TYPES, LEGACY_PUE, cooling_index, get_cooling_table, location_pue
+
+def build_calculation_columns(params_list):
+    """Turn a list of normalized parameter dicts into float64 input columns"""
+    def column(values):
+        return np.fromiter(values, dtype=np.float64, count=len(params_list))
+
+    catalog = get_pricing_catalog()
+    specs = [catalog.gpu_specs[p['gpuModel']] for p in params_list]
+    vendors = [catalog.storage_vendors.get(p['storageVendor'], catalog.storage_vendors['vast'])
+               for p in params_list]
+    fabrics = [catalog.network_costs.get(p['fabricType'], catalog.network_costs['infiniband'])
+               for p in params_list]
+    rates = [location_rate(p['region'], catalog.electricity_rate(p['region'])) for p in params_list]
+    cooling = [location_pue(p['region'], p['coolingType']) for p in params_list]
+
+    return {
+        'num_gpus': column(p['numGPUs'] for p in params_list),
+        'gpu_price': column(spec['price'] for spec in specs),
+        'gpu_power': column(spec['power'] for spec in specs),
+        'pue': column(pue for pue, _, _ in cooling),
+        'peak_pue': column(peak for _, peak, _ in cooling),
+        'climate': column(climate for _, _, climate in cooling),
+        'cooling': column(cooling_index(p['coolingType']) for p in params_list),
+        'electricity_rate': column(rate for rate, _ in rates),
+        'price_curve': column(row for _, row in rates),
+        'load_profile': column(LOAD_PROFILES.index(p['loadProfile']) for p in params_list),
+        'utilization': column(p['utilization'] for p in params_list),
+        'depreciation': column(p['depreciation'] for p in params_list),
+        'storage_capacity': column(p['storageCapacity'] for p in params_list),
+        'hot_pct': column(p['hotPercent'] for p in params_list),
+        'warm_pct': column(p['warmPercent'] for p in params_list),
+        'cold_pct': column(p['coldPercent'] for p in params_list),
+        'archive_pct': column(p['archivePercent'] for p in params_list),
+        'hot_per_gb': column(v['hot_per_gb'] for v in vendors),
+        'warm_per_gb': column(v['warm_per_gb'] for v in vendors),
+        'cold_per_gb': column(v['cold_per_gb'] for v in vendors),
+        'archive_per_gb': column(v['archive_per_gb'] for v in vendors),
+        'storage_hardware_per_gb': np.full(len(params_list), float(catalog.storage_hardware_per_gb)),
+        'switch_price': column(f['switch'] for f in fabrics),
+        'cable_price': column(f['cable'] for f in fabrics),
+        'transceiver_price': column(f['transceiver'] for f in fabrics),
+        'per_gpu_bandwidth': column(f['per_gpu_bandwidth'] for f in fabrics),
+        'switch_radix': column(f['radix'] for f in fabrics),
+        'rails': column(f['rails'] for f in fabrics),
+        'oversubscription_ratio': column(parse_oversubscription(p['oversubscription']) for p in params_list),
+    }
+
+def pue_columns(climate, cooling):
+    """Annual and peak PUE columns for climate rows (-1 = no climate) and cooling indices"""
+    climate, cooling = np.broadcast_arrays(*(np.asarray(c, dtype=np.float64) for c in (climate, cooling)))
+    legacy = np.where(cooling == COOLING_TYPES.index('liquid'), LEGACY_PUE['liquid'], LEGACY_PUE['air'])
+
+    site = climate >= 0
+    if not site.any():
+        return {'pue': legacy, 'peak_pue': legacy}
+
+    table = get_cooling_table()
+    rows = np.where(site, climate, 0).astype(np.int64)
+    cooling = cooling.astype(np.int64)
+    return {
+        'pue': np.where(site, table.mean[rows, cooling], legacy),
+        'peak_pue': np.where(site, table.peak[rows, cooling], legacy),
+    }
+
+def _cooling_pairs(climate, cooling):
+    """Location-major cooling table rows; meaningful only where climate >= 0"""
+    return (np.where(climate >= 0, climate, 0) * len(COOLING_TYPES) + cooling).astype(np.int64)
+
+def energy_hours_vectorized(price_curve, utilization, load_profile, climate=-1, cooling=0):
+    """Load-weighted energy hours per year over broadcastable columns
+
+    price_curve holds curve rows (-1 for flat-rate locations), load_profile
+    indices into LOAD_PROFILES, and climate and cooling the cooling table
+    position (climate -1 for a constant PUE). Price-aware rows are priced with
+    one matrix product per distinct utilization set.
+    """
+    curve, utilization, profile, climate, cooling = np.broadcast_arrays(
+        *(np.asarray(c, dtype=np.float64) for c in (price_curve, utilization, load_profile, climate, cooling)))
+
+    share = np.clip(utilization / 100, 0, 1)
+    flat = HOURS_PER_YEAR * (IDLE_POWER_FRACTION + (1 - IDLE_POWER_FRACTION) * share)
+    hours = np.where(profile == LOAD_PROFILES.index('full'), float(HOURS_PER_YEAR), flat)
+
+    site = climate >= 0
+    if site.any():
+        table = get_cooling_table()
+        pairs = _cooling_pairs(climate, cooling)
+        hours *= np.where(site, table.coincidence.reshape(-1)[pairs], 1.0)
+
+    price_aware = profile == LOAD_PROFILES.index('price-aware')
+    aware = price_aware & ~site & (curve >= 0)
+    if aware.any():
+        distinct, inverse = np.unique(utilization[aware], return_inverse=True)
+        table = get_price_curves().price_aware_energy_hours(distinct)
+        hours[aware] = table[inverse, curve[aware].astype(np.int64)]
+
+    aware = price_aware & site
+    if aware.any():
+        distinct, inverse = np.unique(utilization[aware], return_inverse=True)
+        pair_values, pair_inverse = np.unique(pairs[aware], return_inverse=True)
+        table = get_cooling_table().price_aware_energy_hours(pair_values, distinct)
+        hours[aware] = table[inverse, pair_inverse]
+    return hours
+
+def energy_hours_slope(price_curve, utilization, load_profile, climate=-1, cooling=0):
+    """d(energy hours)/d(utilization percent), the marginal busy hour's weight"""
+    curve, utilization, profile, climate, cooling = np.broadcast_arrays(
+        *(np.asarray(c, dtype=np.float64) for c in (price_curve, utilization, load_profile, climate, cooling)))
+
+    per_percent = HOURS_PER_YEAR * (1 - IDLE_POWER_FRACTION) / 100
+    active = (profile != LOAD_PROFILES.index('full')) & (utilization < 100)
+    slope = np.where(active, per_percent, 0.0)
+
+    site = climate >= 0
+    if site.any():
+        table = get_cooling_table()
+        pairs = _cooling_pairs(climate, cooling)
+        slope *= np.where(site, table.coincidence.reshape(-1)[pairs], 1.0)
+
+    price_aware = active & (profile == LOAD_PROFILES.index('price-aware'))
+    hour = np.minimum((utilization / 100 * HOURS_PER_YEAR).astype(np.int64), HOURS_PER_YEAR - 1)
+
+    aware = price_aware & ~site & (curve >= 0)
+    if aware.any():
+        curves = get_price_curves()
+        rows = curve[aware].astype(np.int64)
+        slope[aware] = per_percent * curves.sorted_prices[rows, hour[aware]] / curves.means[rows]
+
+    aware = price_aware & site
+    if aware.any():
+        rows = pairs[aware]
+        slope[aware] = per_percent * table.sorted_effective[rows, hour[aware]] / table.mean.reshape(-1)[rows]
+    return slope
+
+def calculate_storage_costs_vectorized(capacity_pb, hot_pct, warm_pct, cold_pct, archive_pct,
+                                       hot_per_gb, warm_per_gb, cold_per_gb, archive_per_gb,
+                                       hardware_per_gb=None):
+    """Array version of calculate_storage_costs() over broadcastable columns"""
+    if hardware_per_gb is None:
+        hardware_per_gb = get_pricing_catalog().storage_hardware_per_gb
+    capacity_gb = capacity_pb * 1_000_000
+
+    monthly_cost = (
+        capacity_gb * (hot_pct / 100) * hot_per_gb +
+        capacity_gb * (warm_pct / 100) * warm_per_gb +
+        capacity_gb * (cold_pct / 100) * cold_per_gb +
+        capacity_gb * (archive_pct / 100) * archive_per_gb
+    )
+
+    gb_month = np.divide(
+        monthly_cost, capacity_gb,
+        out=np.zeros(np.broadcast(monthly_cost, capacity_gb).shape),
+        where=capacity_gb > 0
+    )
+
+    return {
+        'capex': capacity_gb * hardware_per_gb,
+        'opex': monthly_cost * 12,
+        'gb_month': gb_month
+    }
+
+def fat_tree_counts_vectorized(num_gpus, radix, ratio, rails):
+    """Switch and link totals over broadcastable columns
+
+    Rows are grouped by distinct (num_gpus, radix, ratio, rails) combination and
+    each combination is sized once through the memoized size_fat_tree(), so a
+    grid costs one cache lookup per unique combination rather than per row.
+
+    Returns:
+        Dict of float64 'switches' and 'links' arrays
+    """
+    columns = np.broadcast_arrays(*(np.asarray(c, dtype=np.float64) for c in (num_gpus, radix, ratio, rails)))
+    shape = columns[0].shape
+
+    # Factorize each column, then combine the codes into one integer key per row
+    code = np.zeros(columns[0].size, dtype=np.int64)
+    values = []
+    for column in columns:
+        distinct, inverse = np.unique(column.ravel(), return_inverse=True)
+        code = code * len(distinct) + inverse
+        values.append((distinct, inverse))
+    keys, first, inverse = np.unique(code, return_index=True, return_inverse=True)
+
+    rows = zip(*(distinct[index[first]].tolist() for distinct, index in values))
+    totals = np.array([fat_tree_totals(*row) for row in rows], dtype=np.float64).reshape(-1, 2)
+
+    counts = totals[inverse]
+    return {
+        'switches': counts[:, 0].reshape(shape),
+        'links': counts[:, 1].reshape(shape),
+    }
+
+def calculate_network_costs_vectorized(num_gpus, ratio, switch_price, cable_price,
+                                       transceiver_price, per_gpu_bandwidth, radix, rails):
+    """Array version of calculate_network_costs() over broadcastable columns"""
+    counts = fat_tree_counts_vectorized(num_gpus, radix, ratio, rails)
+
+    total_capex = (
+        counts['switches'] * switch_price +
+        counts['links'] * cable_price +
+        counts['links'] * TRANSCEIVERS_PER_LINK * transceiver_price
+    )
+
+    return {
+        'capex': total_capex,
+        'opex': total_capex * 0.05,
+        'bandwidth': (num_gpus * per_gpu_bandwidth) / 1000
+    }
+
+def calculate_tco_columns(cols):
+    """Evaluate the TCO model over input columns from build_calculation_columns()"""
+    num_gpus = cols['num_gpus']
+
+    gpu_capex = cols['gpu_price'] * num_gpus
+    total_power_mw = (cols['gpu_power'] * num_gpus * cols['pue']) / 1_000_000
+    peak_power_mw = (cols['gpu_power'] * num_gpus * cols['peak_pue']) / 1_000_000
+
+    storage = calculate_storage_costs_vectorized(
+        cols['storage_capacity'],
+        cols['hot_pct'], cols['warm_pct'], cols['cold_pct'], cols['archive_pct'],
+        cols['hot_per_gb'], cols['warm_per_gb'], cols['cold_per_gb'], cols['archive_per_gb'],
+        cols['storage_hardware_per_gb']
+    )
+    network = calculate_network_costs_vectorized(
+        num_gpus,
+        cols['oversubscription_ratio'],
+        cols['switch_price'], cols['cable_price'],
+        cols['transceiver_price'], cols['per_gpu_bandwidth'],
+        cols['switch_radix'], cols['rails']
+    )
+
+    infrastructure_capex = gpu_capex * 0.15
+    total_capex = gpu_capex + storage['capex'] + network['capex'] + infrastructure_capex
+
+    energy_hours = energy_hours_vectorized(cols['price_curve'], cols['utilization'], cols['load_profile'],
+                                           cols['climate'], cols['cooling'])
+    annual_power_cost = total_power_mw * 1000 * cols['electricity_rate'] * energy_hours
+    maintenance_opex = total_capex * 0.03
+    annual_opex = annual_power_cost + storage['opex'] + network['opex'] + maintenance_opex
+
+    annual_gpu_hours = num_gpus * 8760 * (cols['utilization'] / 100)
+    cost_per_hour = (total_capex / cols['depreciation'] + annual_opex) / annual_gpu_hours
+
+    return {
+        'gpu_capex': gpu_capex,
+        'storage_capex': storage['capex'],
+        'network_capex': network['capex'],
+        'infrastructure_capex': infrastructure_capex,
+        'total_capex': total_capex,
+        'power_mw': total_power_mw,
+        'peak_power_mw': peak_power_mw,
+        'pue': cols['pue'],
+        'energy_hours': energy_hours,
+        'annual_power_cost': annual_power_cost,
+        'storage_opex': storage['opex'],
+        'network_opex': network['opex'],
+        'maintenance_opex': maintenance_opex,
+        'annual_opex': annual_opex,
+        'storage_gb_month': storage['gb_month'],
+        'network_bandwidth': network['bandwidth'],
+        'cost_per_hour': cost_per_hour,
+        'tco_10year': total_capex + annual_opex * 10
+    }
+
+def format_calculation_results(outputs):
+    """Convert output columns into per-row dicts shaped like calculate_results() output"""
+    rows = {key: np.broadcast_to(value, outputs['total_capex'].shape).tolist()
+            for key, value in outputs.items()}
+
+    results = []
+    for i in range(len(rows['total_capex'])):
+        results.append({
+            'totalCapex': round(rows['total_capex'][i]),
+            'annualOpex': round(rows['annual_opex'][i]),
+            'costPerHour': round(rows['cost_per_hour'][i], 2),
+            'totalPowerMW': round(rows['power_mw'][i], 1),
+            'peakPowerMW': round(rows['peak_power_mw'][i], 1),
+            'pueValue': round(rows['pue'][i], 3),
+            'storageGbMonth': round(rows['storage_gb_month'][i], 4),
+            'networkBandwidth': round(rows['network_bandwidth'][i], 1),
+            'tco10year': round(rows['tco_10year'][i]),
+            'breakdown': {
+                'capex': {
+                    'gpu': rows['gpu_capex'][i],
+                    'storage': rows['storage_capex'][i],
+                    'network': rows['network_capex'][i],
+                    'infrastructure': rows['infrastructure_capex'][i]
+                },
+                'opex': {
+                    'power': rows['annual_power_cost'][i],
+                    'storage': rows['storage_opex'][i],
+                    'network': rows['network_opex'][i],
+                    'maintenance': rows['maintenance_opex'][i]
+                }
+            }
+        })
+    return results
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/login throughput and latency at increasing concurrency
+Logs a throwaway user in from many clients at once and reports successful
+logins per second, latency and 503s, along with /api/health latency as a
+measure of what the login load costs everyone else
+
+By default the API is started under gunicorn with one worker and enough
+threads to take every client at once, like the threaded server in the Docker
+image; pass --url to benchmark a running API instead (it must share
+JWT_SECRET with this script's environment).
+
+    python scripts/testing/benchmark-login-throughput.py [--workers 1] [--threads 256] [--concurrency 1 4 16 64 128] [--duration 10]
+"""
+
+import argparse
+import json
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+JWT_SECRET = os.environ.get('JWT_SECRET', 'jwt-secret-key-change-in-production')
+
+def request_json(url, payload=None, method='POST', headers=None, timeout=30):
+    """Send a JSON request; returns (status, elapsed seconds, decoded body)"""
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method,
+                                     headers={'Content-Type': 'application/json', **(headers or {})})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            return response.status, time.perf_counter() - started, json.loads(body or b'null')
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code, time.perf_counter() - started, None
+    except (urllib.error.URLError, OSError):
+        return None, time.perf_counter() - started, None
+
+def start_api(workers, threads):
+    """Run the API under gunicorn on a free port; returns (process, base url)"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    # Logs land in a scratch directory rather than the source tree
+    workdir = tempfile.mkdtemp(prefix='login-bench-')
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(
+        os.path.join(project_root, 'backend', path) for path in ('api', 'database', ''))}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(workers), '--threads', str(threads),
+         '-b', f'127.0.0.1:{port}', '--chdir', workdir, '--log-level', 'warning', 'calculator-api:app'],
+        env=env
+    )
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f'{url}/api/health', timeout=2):
+                return process, url
+        except (urllib.error.URLError, OSError):
+            if process.poll() is not None:
+                break
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError('API did not start')
+
+def client_address():
+    # /api/login allows 10 requests a minute per address; the API trusts
+    # X-Real-IP from a local proxy, which this script stands in for
+    return {'X-Real-IP': f'10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}'}
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else float('nan')
+
+def run_level(url, username, password, concurrency, duration):
+    """Log in from `concurrency` clients for `duration` seconds while probing /api/health"""
+    stop = threading.Event()
+    logins, probes, lock = [], [], threading.Lock()
+
+    def client():
+        while not stop.is_set():
+            status, elapsed, _ = request_json(f'{url}/api/login', {'username': username, 'password': password},
+                                              headers=client_address())
+            if stop.is_set():
+                break  # finished after the round ended
+            with lock:
+                logins.append((status, elapsed))
+            if status == 503:
+                stop.wait(1)  # Retry-After
+
+    def probe():
+        while not stop.is_set():
+            status, elapsed, _ = request_json(f'{url}/api/health', method='GET')
+            with lock:
+                probes.append(elapsed)
+            stop.wait(0.2)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    threads.append(threading.Thread(target=probe, daemon=True))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    statuses = Counter(status for status, _ in logins)
+    succeeded = [elapsed for status, elapsed in logins if status == 200]
+    return {
+        'concurrency': concurrency,
+        'rate': len(succeeded) / duration,
+        'p50': percentile(succeeded, 0.5),
+        'p95': percentile(succeeded, 0.95),
+        'statuses': statuses,
+        'health_p95': percentile(probes, 0.95)
+    }
+
+def benchmark_login_throughput(url, levels, duration):
+    print("🧪 Benchmarking /api/login...")
+
+    token = jwt.encode({
+        'username': 'admin',
+        'role': 'admin',
+        'exp': datetime.now(timezone.utc) + timedelta(hours=1),
+        'iat': datetime.now(timezone.utc)
+    }, JWT_SECRET, algorithm='HS256')
+    auth = {'Authorization': f'Bearer {token}'}
+
+    username = f'bench_{secrets.token_hex(4)}'
+    password = secrets.token_urlsafe(12)
+    status, _, _ = request_json(f'{url}/api/users', {'username': username, 'password': password, 'role': 'user'},
+                                headers=auth)
+    if status != 200:
+        print(f"   ❌ Could not create benchmark user ({status})")
+        return False
+    print(f"   Created benchmark user {username}")
+
+    try:
+        print(f"\n   {'clients':>7} {'logins/s':>9} {'p50':>8} {'p95':>8} {'health p95':>11}  statuses")
+        for concurrency in levels:
+            result = run_level(url, username, password, concurrency, duration)
+            statuses = ', '.join(f'{status}: {count}' for status, count in sorted(result['statuses'].items(), key=str))
+            print(f"   {concurrency:>7} {result['rate']:>9.1f} {result['p50'] * 1000:>6.0f}ms "
+                  f"{result['p95'] * 1000:>6.0f}ms {result['health_p95'] * 1000:>9.0f}ms  {statuses}")
+
+        status, _, stats = request_json(f'{url}/api/database/stats', method='GET', headers=auth)
+        if status == 200 and stats.get('passwords'):
+            print(f"\n   Password hashing: {json.dumps(stats['passwords'])}")
+    finally:
+        request_json(f'{url}/api/users/{username}', method='DELETE', headers=auth)
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='Base URL of a running API (default: start one under gunicorn)')
+    parser.add_argument('--workers', type=int, default=1, help='gunicorn workers when starting the API')
+    parser.add_argument('--threads', type=int, default=256, help='Threads per gunicorn worker when starting the API')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64, 128],
+                        help='Concurrent login clients for each round')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per round')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Login Throughput Benchmark")
+    print("=" * 60)
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_api(args.workers, args.threads)
+        print(f"Started the API under gunicorn with {args.workers} workers x {args.threads} threads at {url}")
+    try:
+        completed = benchmark_login_throughput(url.rstrip('/'), args.concurrency, args.duration)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    sys.exit(0 if completed else 1)
@@ -0,0 +1,209 @@
+#!/usr/bin/env node
+/*
+ * Record golden outputs of the dashboard's planning math for the Python port
+ *
+ * Runs the TypeScript in frontend/nullsector-dashboard/src/utils (transpiled
+ * with the dashboard's own typescript package) over a fixed set of inputs and
+ * writes planning-golden.json next to this script. test-planning-parity.py
+ * then checks backend/tco_engine against it.
+ *
+ * Re-run after changing any of the ported files:
+ *   (cd frontend/nullsector-dashboard && npm install)
+ *   node scripts/testing/generate-planning-golden.js
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+const projectRoot = path.resolve(__dirname, '..', '..');
+const dashboardRoot = path.join(projectRoot, 'frontend', 'nullsector-dashboard');
+const ts = require(require.resolve('typescript', { paths: [dashboardRoot] }));
+
+const moduleCache = {};
+
+// Minimal CommonJS loader for the dashboard's .ts sources
+function loadModule(file) {
+  if (moduleCache[file]) return moduleCache[file].exports;
+  const source = fs.readFileSync(file, 'utf8');
+  const { outputText } = ts.transpileModule(source, {
+    compilerOptions: { module: ts.ModuleKind.CommonJS, target: ts.ScriptTarget.ES2019 },
+    fileName: file
+  });
+  const module = { exports: {} };
+  moduleCache[file] = module;
+  const localRequire = (request) => {
+    const base = path.resolve(path.dirname(file), request);
+    const resolved = ['.ts', '.tsx'].map(ext => base + ext).find(fs.existsSync);
+    if (!resolved) throw new Error(`Cannot resolve ${request} from ${file}`);
+    return loadModule(resolved);
+  };
+  new Function('require', 'module', 'exports', outputText)(localRequire, module, module.exports);
+  return module.exports;
+}
+
+const utils = path.join(dashboardRoot, 'src', 'utils');
+const workload = loadModule(path.join(utils, 'workloadPerformanceCalculations.ts'));
+const enhancedTCO = loadModule(path.join(utils, 'enhancedTCOCalculations.ts'));
+const storage = loadModule(path.join(utils, 'storageCalculationsEnhanced.ts'));
+const serviceMix = loadModule(path.join(utils, 'serviceMixDerivation.ts'));
+
+// Deterministic inputs (mulberry32)
+let seed = 20261017;
+function random() {
+  seed = (seed + 0x6D2B79F5) | 0;
+  let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+  t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+  return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+}
+const pick = (values) => values[Math.floor(random() * values.length)];
+const between = (low, high, decimals = 0) => {
+  const factor = Math.pow(10, decimals);
+  return Math.round((low + random() * (high - low)) * factor) / factor;
+};
+
+// Service tiers: the dashboard pipeline from ServiceTierConfiguration and CalculatorTabRedesigned
+function planServiceTiers(config) {
+  const storageRequirements = workload.calculateStorageRequirements(config.serviceTiers, config.numGPUs);
+  const infrastructureRequirements = workload.calculateInfrastructureRequirements(storageRequirements, config.numGPUs);
+  const tco = enhancedTCO.calculateEnhancedTCO({
+    ...config,
+    currency: 'USD',
+    depreciation: 4,
+    storageRequirements,
+    infrastructureRequirements
+  });
+  return {
+    storageRequirements,
+    infrastructureRequirements,
+    recommendedStorage: workload.getRecommendedStorageArchitecture(storageRequirements),
+    warnings: workload.validateServiceTiers(config.serviceTiers),
+    tco,
+    roi: enhancedTCO.calculateROIMetrics(tco)
+  };
+}
+
+const tierTypes = ['bareMetalWhale', 'orchestratedK8s', 'managedMLOps', 'inferenceService', 'custom'];
+const tierIds = ['tier1_whale', 'tier2_orchestrated', 'tier3_mlops', 'tier4_inference', 'tier5_research'];
+
+function randomServiceTiers() {
+  const count = 1 + Math.floor(random() * 5);
+  const tiers = [];
+  for (let i = 0; i < count; i++) {
+    const trainingPercent = between(0, 100, pick([0, 1]));
+    tiers.push({
+      id: tierIds[i],
+      name: `Tier ${i + 1}`,
+      type: pick(tierTypes),
+      clusterPercent: between(0, 60, pick([0, 1, 2])),
+      trainingPercent,
+      inferencePercent: random() < 0.8 ? 100 - trainingPercent : between(0, 100)
+    });
+  }
+  return tiers;
+}
+
+function serviceTierCases() {
+  const defaults = workload.DEFAULT_SERVICE_TIERS.map(({ id, name, type, clusterPercent, trainingPercent, inferencePercent }) =>
+    ({ id, name, type, clusterPercent, trainingPercent, inferencePercent }));
+  // The API fills these in for missing fields, so the first case sends none
+  const apiDefaults = { gpuModel: 'h100-sxm', numGPUs: 1000, coolingType: 'air', electricityRate: 0.10, utilization: 90, serviceTiers: defaults, tcoOverrides: {} };
+  const cases = [
+    {},
+    { gpuModel: 'gb200', numGPUs: 10000, coolingType: 'liquid', electricityRate: 0.12, utilization: 85, serviceTiers: defaults, tcoOverrides: {} },
+    { gpuModel: 'gb300', numGPUs: 200000, coolingType: 'liquid', electricityRate: 0.05, utilization: 100, serviceTiers: defaults,
+      tcoOverrides: { gpuPriceOverride: 80000, powerPriceOverride: 0.07, staffCostOverride: 180000, maintenancePercentOverride: 0.1 } },
+    { gpuModel: 'mi300x', numGPUs: 1, coolingType: 'air', electricityRate: 0, utilization: 50,
+      serviceTiers: [{ id: 'tier9_idle', name: 'Idle', type: 'inferenceService', clusterPercent: 0, trainingPercent: 0, inferencePercent: 100 }],
+      tcoOverrides: {} }
+  ];
+  for (let i = 0; i < 26; i++) {
+    cases.push({
+      gpuModel: pick(['gb200', 'gb300', 'h100-sxm', 'h100-pcie', 'h200', 'mi300x']),
+      numGPUs: pick([1000, 2500, 5000, 7919, 12000, 32768, 50000, 100000, 150000, 200000]),
+      coolingType: pick(['air', 'liquid']),
+      electricityRate: between(0.03, 0.3, 3),
+      utilization: between(40, 100),
+      serviceTiers: random() < 0.2 ? defaults : randomServiceTiers(),
+      tcoOverrides: random() < 0.3 ? { gpuPriceOverride: between(20000, 90000), maintenancePercentOverride: between(0.02, 0.15, 3) } : {}
+    });
+  }
+  return cases.map(input => ({ input, output: planServiceTiers({ ...apiDefaults, ...input }) }));
+}
+
+function storageCases() {
+  const cases = [];
+  const counts = [1, 500, 4999, 5000, 9999, 10000, 24999, 25000, 32768, 49999, 50000, 50001, 99999, 100000, 150000, 200000];
+  const vendors = ['auto', 'auto', 'auto', 'weka', 'vastdata', 'ddn', 'purestorage', 'netapp', 'dell', 'ceph'];
+  for (let i = 0; i < 40; i++) {
+    const training = between(0, 100);
+    const inference = between(0, 100 - training);
+    const whale = between(0, 100, 1);
+    const medium = between(0, 100 - whale, 1);
+    cases.push({
+      gpuCount: i < counts.length ? counts[i] : pick(counts),
+      workloadMix: { training, inference, finetuning: 100 - training - inference },
+      tenantMix: { whale, medium, small: Math.round((100 - whale - medium) * 10) / 10 },
+      budget: pick(['unlimited', 'optimized', 'cost-conscious']),
+      storageVendor: pick(vendors)
+    });
+  }
+  return cases.map(input => ({ input, output: storage.calculateEnhancedStorage({ gpuModel: 'h100-sxm', ...input }) }));
+}
+
+function serviceMixCases() {
+  const gpus = ['H100 SXM', 'H100 PCIe', 'H200', 'A100 80GB', 'A100 40GB', 'L40S'];
+  const fabrics = [
+    'InfiniBand NDR 400Gb (Training optimized)', 'InfiniBand HDR 200Gb (Balanced)',
+    'Ethernet 400GbE RoCEv2 (Cost optimized)', 'Ethernet 200GbE (Legacy)'
+  ];
+  const section = (max) => ({ capacity: random() < 0.15 ? 0 : between(0, max, 1), unit: pick(['TB', 'PB']) });
+  const cases = [{
+    compute: { gpuModel: 'H100 SXM', totalGPUs: 1000 },
+    networking: { fabricType: fabrics[0], topologyType: 'Fat Tree (Non-blocking)' },
+    storage: {
+      ultraHighPerf: { capacity: 0, unit: 'TB' }, highPerf: { capacity: 2, unit: 'PB' },
+      mediumPerf: { capacity: 500, unit: 'TB' }, capacityTier: { capacity: 20, unit: 'PB' },
+      objectStore: { capacity: 5, unit: 'PB' }
+    },
+    power: { totalPowerCapacity: 15, coolingType: 'Liquid Cooled (Direct chip)', pue: 1.2 }
+  }];
+  for (let i = 0; i < 49; i++) {
+    cases.push({
+      compute: { gpuModel: pick(gpus), totalGPUs: pick([100, 499, 500, 1000, 1999, 2000, 4999, 5000, 12000, 20001, 60000]) },
+      networking: { fabricType: pick(fabrics), topologyType: pick(['Fat Tree (Non-blocking)', 'Fat Tree (2:1 Oversubscribed)', 'Dragonfly+']) },
+      storage: {
+        ultraHighPerf: section(50), highPerf: section(50), mediumPerf: section(500),
+        capacityTier: section(100), objectStore: section(10)
+      },
+      power: {
+        totalPowerCapacity: between(5, 60, 1),
+        coolingType: pick(['Air Cooled (Standard)', 'Liquid Cooled (Direct chip)', 'Immersion Cooled (Maximum density)']),
+        pue: between(1.05, 1.8, 2)
+      }
+    });
+  }
+  return cases.map(input => {
+    const capabilities = serviceMix.analyzeInfrastructureCapabilities(input);
+    const mix = serviceMix.deriveOptimalServiceMix(capabilities);
+    return {
+      input,
+      output: {
+        capabilities,
+        serviceMix: mix,
+        workloadDistribution: serviceMix.inferWorkloadDistribution(input, mix),
+        constraints: serviceMix.identifyServiceConstraints(capabilities),
+        totalStorageCapacityTB: serviceMix.calculateTotalStorageCapacity(input.storage)
+      }
+    };
+  });
+}
+
+const golden = {
+  'service-tiers': serviceTierCases(),
+  'storage': storageCases(),
+  'service-mix': serviceMixCases()
+};
+
+const outputPath = path.join(__dirname, 'planning-golden.json');
+fs.writeFileSync(outputPath, JSON.stringify(golden) + '\n');
+console.log(`Wrote ${Object.values(golden).reduce((n, cases) => n + cases.length, 0)} cases to ${outputPath}`);
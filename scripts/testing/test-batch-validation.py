@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test that malformed batch rows are rejected one by one
+Prices a batch mixing valid configurations with rows of wrong types and
+non-finite numbers, and checks each bad row gets its own error while the
+valid rows are still priced
+"""
+
+import math
+import os
+import sys
+
+# Add the backend directory to the path so we can import tco_engine
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from tco_engine import evaluate_batch
+
+VALID_ROWS = [
+    {},
+    {'gpuModel': 'gb200', 'numGPUs': 50000, 'coolingType': 'liquid'},
+    {'gpuModel': 'h100-sxm', 'numGPUs': 10000, 'storageVendor': 'weka', 'hotPercent': 30},
+]
+
+# (row, expected error) as json.loads() would hand them to the API
+MALFORMED_ROWS = [
+    ({'gpuModel': [1]}, 'gpuModel must be a string'),
+    ({'coolingType': 5}, 'coolingType must be a string'),
+    ({'region': {'name': 'us-east'}}, 'region must be a string'),
+    ({'storageVendor': ['weka']}, 'storageVendor must be a string'),
+    ({'fabricType': {}}, 'fabricType must be a string'),
+    ({'loadProfile': None}, 'loadProfile must be a string'),
+    ({'hotPercent': float('nan')}, 'hotPercent must be a finite number'),
+    ({'warmPercent': 'inf'}, 'warmPercent must be a finite number'),
+    ({'depreciation': float('inf')}, 'depreciation must be an integer'),
+    ({'numGPUs': float('nan')}, 'numGPUs must be an integer'),
+    ({'oversubscription': '1:inf'}, 'oversubscription must look like "1:1"'),
+    ('not an object', 'Configuration must be an object'),
+]
+
+def test_batch_validation():
+    """Interleave valid and malformed rows and check every entry"""
+    print("🧪 Testing per-row validation in evaluate_batch...")
+
+    rows, expected = [], []
+    for i, (row, error) in enumerate(MALFORMED_ROWS):
+        rows.append(VALID_ROWS[i % len(VALID_ROWS)])
+        expected.append(None)
+        rows.append(row)
+        expected.append(error)
+
+    try:
+        entries = evaluate_batch(rows)
+    except Exception as e:
+        print(f"   ❌ The batch failed as a whole: {type(e).__name__}: {e}")
+        return False
+
+    failures = 0
+    for i, (entry, error) in enumerate(zip(entries, expected)):
+        if entry['index'] != i:
+            print(f"   ❌ Row {i}: entry reports index {entry['index']}")
+            failures += 1
+        elif error is None and not (entry['success'] and math.isfinite(entry['results']['tco10year'])):
+            print(f"   ❌ Row {i}: valid row was not priced: {entry.get('error')}")
+            failures += 1
+        elif error is not None and (entry['success'] or entry['error'] != error):
+            print(f"   ❌ Row {i}: expected {error!r}, got {entry.get('error')!r}")
+            failures += 1
+
+    priced = sum(1 for entry in entries if entry['success'])
+    print(f"   {'✅' if failures == 0 else '❌'} {priced} valid rows priced, "
+          f"{len(entries) - priced} malformed rows rejected individually")
+    return failures == 0
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Batch Validation Test")
+    print("=" * 60)
+
+    if test_batch_validation():
+        print("\n🎉 Malformed rows are rejected without failing the batch!")
+        sys.exit(0)
+    else:
+        print("\n💥 Malformed rows are not rejected individually")
+        sys.exit(1)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Load test: /api/calculate keeps serving while /api/login is under attack
+Floods /api/login with failed credentials from a fixed set of addresses,
+checks each of them is throttled with 429 and Retry-After, and measures
+/api/calculate latency for a legitimate client before and during the flood
+
+By default the API is started under gunicorn with a few sync workers, as in
+production; pass --url to test a running API instead (it must share
+JWT_SECRET and CALCULATOR_API_SECRET with this script's environment).
+
+    python scripts/testing/test-login-throttle-load.py [--workers 2] [--attackers 16] [--addresses 8] [--duration 20]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+JWT_SECRET = os.environ.get('JWT_SECRET', 'jwt-secret-key-change-in-production')
+API_SECRET = os.environ.get('CALCULATOR_API_SECRET', 'change-this-secret-key-in-production')
+
+# /api/calculate allows 10 requests a minute per client address, so the
+# legitimate client samples sparsely: a baseline, then evenly through the flood
+BASELINE_REQUESTS = 2
+ATTACK_REQUESTS = 6
+
+# /api/login also allows 10 requests a minute per client address
+RATE_LIMIT = 10
+
+def post(url, payload, headers=None, timeout=30):
+    """POST JSON; returns (status, elapsed seconds, headers)"""
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(), method='POST',
+                                     headers={'Content-Type': 'application/json', **(headers or {})})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status, time.perf_counter() - started, response.headers
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code, time.perf_counter() - started, e.headers
+    except (urllib.error.URLError, OSError):
+        return None, time.perf_counter() - started, {}
+
+def signed_calculation():
+    """A /api/calculate body signed the way the dashboard signs it"""
+    data = {'gpuModel': 'h100-sxm', 'numGPUs': random.randint(1000, 50000), 'coolingType': 'liquid'}
+    params = ''.join(str(data.get(k, '')) for k in sorted(data.keys()))
+    data['signature'] = hashlib.sha256((params + API_SECRET).encode()).hexdigest()
+    return data
+
+def start_api(workers):
+    """Run the API under gunicorn on a free port; returns (process, base url)"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    # Logs land in a scratch directory rather than the source tree
+    workdir = tempfile.mkdtemp(prefix='login-load-')
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(
+        os.path.join(project_root, 'backend', path) for path in ('api', 'database', ''))}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}',
+         '--chdir', workdir, '--log-level', 'warning', 'calculator-api:app'],
+        env=env
+    )
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f'{url}/api/health', timeout=2):
+                return process, url
+        except (urllib.error.URLError, OSError):
+            if process.poll() is not None:
+                break
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError('API did not start')
+
+def attacker(url, addresses, stop, results, lock):
+    """Credential stuffing: real and made-up usernames, wrong passwords, a few source addresses
+
+    The API sits behind a local proxy here, so X-Real-IP stands for the source
+    address. X-Forwarded-For is spoofed on every attempt and must not help.
+    """
+    usernames = ['admin', 'David', 'Thomas'] + [f'user{i}' for i in range(200)]
+    while not stop.is_set():
+        address = random.choice(addresses)
+        headers = {
+            'X-Real-IP': address,
+            'X-Forwarded-For': f'10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}'
+        }
+        status, elapsed, response_headers = post(f'{url}/api/login', {
+            'username': random.choice(usernames),
+            'password': f'guess-{random.random()}'
+        }, headers)
+        with lock:
+            results.append((address, status, elapsed, response_headers.get('Retry-After')))
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else float('nan')
+
+def test_login_throttle_load(url, attackers, address_count, duration):
+    print("🧪 Testing /api/calculate under a /api/login flood...")
+
+    token = jwt.encode({
+        'username': 'admin',
+        'role': 'admin',
+        'exp': datetime.now(timezone.utc) + timedelta(hours=1),
+        'iat': datetime.now(timezone.utc)
+    }, JWT_SECRET, algorithm='HS256')
+    auth = {'Authorization': f'Bearer {token}'}
+
+    print("1. Baseline /api/calculate latency...")
+    baseline = []
+    for _ in range(BASELINE_REQUESTS):
+        status, elapsed, _ = post(f'{url}/api/calculate', signed_calculation(), auth)
+        if status != 200:
+            print(f"   ❌ Baseline request returned {status}")
+            return False
+        baseline.append(elapsed)
+    print(f"   {' '.join(f'{t * 1000:.0f}ms' for t in baseline)}")
+
+    print(f"2. Flooding /api/login with {attackers} clients from {address_count} addresses for {duration:g}s...")
+    addresses = [f'203.0.113.{i + 1}' for i in range(address_count)]
+    stop = threading.Event()
+    logins, lock = [], threading.Lock()
+    threads = [threading.Thread(target=attacker, args=(url, addresses, stop, logins, lock), daemon=True)
+               for _ in range(attackers)]
+    for thread in threads:
+        thread.start()
+
+    under_attack = []
+    started = time.time()
+    for i in range(ATTACK_REQUESTS):
+        time.sleep(max(0.0, started + (i + 1) * duration / (ATTACK_REQUESTS + 1) - time.time()))
+        under_attack.append(post(f'{url}/api/calculate', signed_calculation(), auth)[:2])
+    time.sleep(max(0.0, started + duration - time.time()))
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    statuses = Counter(status for _, status, _, _ in logins)
+    login_times = [elapsed for _, _, elapsed, _ in logins]
+    throttled = {address for address, status, _, retry_after in logins if status == 429 and retry_after}
+    print(f"   {len(logins)} login attempts answered ({len(logins) / duration:.0f}/s): "
+          f"{', '.join(f'{status}: {count}' for status, count in sorted(statuses.items(), key=str))}")
+    print(f"   Login latency p50 {percentile(login_times, 0.5) * 1000:.0f}ms, "
+          f"p95 {percentile(login_times, 0.95) * 1000:.0f}ms")
+
+    print("3. /api/calculate during the flood...")
+    print(f"   {' '.join(f'{status}/{t * 1000:.0f}ms' for status, t in under_attack)}")
+
+    # Each failed login used to sleep for a second on its worker
+    limit = max(1.0, 5 * max(baseline))
+    checks = [
+        (throttled == set(addresses), f"All {len(addresses)} attacking addresses got 429 with Retry-After "
+                                      f"despite spoofed X-Forwarded-For ({len(throttled)} did)"),
+        (statuses[401] <= RATE_LIMIT * len(addresses) * math.ceil(duration / 60),
+         f"At most {RATE_LIMIT} attempts a minute per address reached the password check ({statuses[401]} did)"),
+        (all(status == 200 for status, _ in under_attack), "Every /api/calculate request succeeded"),
+        (max(t for _, t in under_attack) < limit,
+         f"Worst /api/calculate latency under {limit * 1000:.0f}ms"),
+        (percentile(login_times, 0.95) < 0.5, "Failed logins answered without holding a worker (p95 < 500ms)"),
+        (None not in statuses, "No login attempt was dropped"),
+    ]
+    for passed, description in checks:
+        print(f"   {'✅' if passed else '❌'} {description}")
+    return all(passed for passed, _ in checks)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='Base URL of a running API (default: start one under gunicorn)')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn sync workers when starting the API')
+    parser.add_argument('--attackers', type=int, default=16, help='Concurrent attacking clients')
+    parser.add_argument('--addresses', type=int, default=8, help='Source addresses the attackers share')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of login flood')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Login Throttle Load Test")
+    print("=" * 60)
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_api(args.workers)
+        print(f"Started the API under gunicorn with {args.workers} sync workers at {url}")
+    try:
+        passed = test_login_throttle_load(url.rstrip('/'), args.attackers, args.addresses, args.duration)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if passed:
+        print("\n🎉 The API kept serving while /api/login was under attack!")
+        sys.exit(0)
+    else:
+        print("\n💥 /api/login traffic degraded the rest of the API")
+        sys.exit(1)